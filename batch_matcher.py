@@ -0,0 +1,81 @@
+"""
+Batch matcher: match a whole cohort of scraped profiles against CMS at once.
+
+``match_batch(profiles, cms_source)`` runs the match engine (match_engine.py)
+with the ``phoenix`` preset: the profiles become key tables (licenses, names,
+PDL phones) and every tier is resolved with columnar joins against the CMS
+indexes instead of looping over people one at a time. The tiers are those
+of ``config.MATCH_PRESETS['phoenix']``:
+
+1. CONFIRMED - a Nursys license equals a CMS license (any of the 15 columns)
+2. HIGH      - name match whose practice/mailing phone equals a PDL phone
+3. MEDIUM    - name match only (exact first/last, multi-token names
+               decomposed, else "contains")
+4. MEDIUM    - a PDL phone alone equals a CMS practice/mailing phone
+5. LOW       - fuzzy name match in the profile's state (fuzzy_names.py)
+
+The returned records are the same ones ``compare_phoenix_nurses.find_matches``
+produces, so a new city cohort is one call:
+
+    from batch_matcher import match_batch
+    matches, no_matches = match_batch(profiles, 'nurses.csv')
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from cms_index import LicenseIndex, NameIndex, PhoneIndex
+from match_engine import MatchConfig, MatchEngine, ProfileKeys, build_match_records
+
+
+def load_cms_source(cms_source: Union[str, pd.DataFrame]) -> pd.DataFrame:
+    """Accept either a CMS DataFrame or the path to a nurses CSV."""
+    if isinstance(cms_source, pd.DataFrame):
+        return cms_source
+    print(f"📂 Loading CMS data from {cms_source}...")
+    cms_df = pd.read_csv(cms_source, low_memory=False)
+    print(f"✅ Loaded {len(cms_df):,} CMS records\n")
+    return cms_df
+
+
+def match_batch(
+    profiles: List[Dict],
+    cms_source: Union[str, pd.DataFrame],
+    license_index: Optional[LicenseIndex] = None,
+    name_index: Optional[NameIndex] = None,
+    phone_index: Optional[PhoneIndex] = None,
+    preset: str = 'phoenix',
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Match all profiles against the CMS data in one pass.
+
+    Args:
+        profiles: Scraped profiles (firstName, lastName, nursys.licenses,
+            peopleDataLabs, ...), as in phoenix_nurses.json
+        cms_source: CMS DataFrame or path to the filtered nurses CSV
+        license_index: Prebuilt LicenseIndex over the same DataFrame (optional)
+        name_index: Prebuilt NameIndex over the same DataFrame (optional)
+        phone_index: Prebuilt PhoneIndex over the same DataFrame (optional)
+        preset: Matching preset from config.MATCH_PRESETS
+
+    Returns:
+        (matches, no_matches) in profile order, with the same records as
+        ``compare_phoenix_nurses.find_matches``
+    """
+    cms_df = load_cms_source(cms_source)
+    config = MatchConfig.preset(preset)
+
+    print("🔍 Building license, name and phone indexes...")
+    # An empty index is falsy (len 0), so test for None rather than truth
+    license_index = LicenseIndex(cms_df) if license_index is None else license_index
+    name_index = NameIndex(cms_df) if name_index is None else name_index
+    phone_index = PhoneIndex(cms_df) if phone_index is None else phone_index
+
+    print(f"🔍 Matching {len(profiles):,} profiles in batch...")
+    keys = ProfileKeys.build(profiles, config.adapter)
+    resolved = MatchEngine(cms_df, config, license_index, name_index, phone_index=phone_index).resolve(keys)
+    matches, no_matches = build_match_records(profiles, resolved, cms_df, config.adapter)
+
+    print(f"✅ Batch matching complete: {len(matches):,} matches, {len(no_matches):,} without match\n")
+    return matches, no_matches
@@ -0,0 +1,3 @@
+"""
+Benchmarks for the hot paths of the nurse processor (see benchmarks/run.py).
+"""
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Timed benchmarks for the hot paths of the nurse processor.
+
+Generates (once, cached under ``--work-dir``) a synthetic NPPES CSV with
+benchmarks/synthetic.py, then times:
+
+- filter_nurses_polars / filter_nurses_pandas on the raw CSV
+- match_by_license / match_by_name (compare_phoenix_nurses) for a cohort of
+  synthetic profiles against the filtered nurses
+- match_profiles (match_engine, phoenix preset) for the whole cohort at once
+- FuzzyNameIndex.best_match (fuzzy_names) for misspelled cohort names, with
+  the per-profile latency
+- PhoneIndex (cms_index) build and lookups of the cohort's PDL phones
+- CandidateScorer.score (candidate_scoring) for the (profile, row) pairs
+  of every cohort profile against all nurses with its last name
+- match_chunk_against_nurses (compare_denver_nurses) over the raw CSV chunks
+- view_nurses.apply_filters for a few typical filter sets
+
+Each benchmark reports the best of ``--repeat`` runs. Results are written as
+JSON and can be compared against a stored baseline:
+
+    python -m benchmarks.run --rows 200000 --output bench.json
+    python -m benchmarks.run --rows 200000 --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import DEFAULT_SEED, generate_nppes_csv
+
+DEFAULT_ROWS = 100_000
+DEFAULT_REPEAT = 3
+DEFAULT_PROFILES = 500
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_WORK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data')
+
+
+def quiet(func: Callable, *args, **kwargs):
+    """Call ``func`` with its progress prints suppressed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def time_best(func: Callable, repeat: int, setup: Optional[Callable] = None) -> List[float]:
+    """Run ``func`` ``repeat`` times (after ``setup`` each time) and return the timings."""
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state) if setup else func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def make_profiles(cms_df: pd.DataFrame, count: int, seed: int) -> List[Dict]:
+    """
+    Build scraped-profile dicts (phoenix_nurses.json shape) from CMS rows.
+
+    A third carry one of the row's licenses, a third only the name plus a
+    PDL phone, and the rest are names that are not in the data at all.
+    """
+    rng = np.random.default_rng(seed)
+    rows = cms_df.iloc[rng.choice(len(cms_df), size=min(count, len(cms_df)), replace=False)]
+    profiles = []
+    for i, (_, row) in enumerate(rows.iterrows()):
+        kind = i % 3
+        first = row.get('Provider First Name')
+        last = row.get('Provider Last Name (Legal Name)')
+        profile = {
+            'id': f'bench-{i}',
+            'name': f'{first} {last}',
+            'firstName': first if kind < 2 else f'NOBODY{i}',
+            'lastName': last,
+            'state': row.get('Provider Business Practice Location Address State Name'),
+            'nursys': {'licenses': []},
+        }
+        if kind == 0 and pd.notna(row.get('Provider License Number_1')):
+            profile['nursys']['licenses'].append({'license': str(row['Provider License Number_1'])})
+        if kind == 1 and pd.notna(row.get('Provider Business Practice Location Address Telephone Number')):
+            profile['peopleDataLabs'] = {
+                'phone_numbers': [f"+1{row['Provider Business Practice Location Address Telephone Number']}"]
+            }
+        profiles.append(profile)
+    return profiles
+
+
+def misspell(name: str, rng: np.random.Generator) -> str:
+    """Swap two adjacent letters after the first one ('MARTINEZ' -> 'MARITNEZ')."""
+    if len(name) < 3:
+        return name
+    i = int(rng.integers(1, len(name) - 1))
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def prepare_data(rows: int, seed: int, work_dir: str) -> Dict[str, str]:
+    """Generate (or reuse) the synthetic CSV and the filtered nurses CSV."""
+    os.makedirs(work_dir, exist_ok=True)
+    csv_file = os.path.join(work_dir, f'nppes_{rows}_{seed}.csv')
+    nurses_file = os.path.join(work_dir, f'nurses_{rows}_{seed}.csv')
+
+    if not os.path.exists(csv_file):
+        print(f"Generating {rows:,} synthetic NPPES rows -> {csv_file}")
+        generate_nppes_csv(csv_file, rows, seed)
+    if not os.path.exists(nurses_file):
+        from process_nurses import filter_nurses_pandas
+        quiet(filter_nurses_pandas, csv_file, nurses_file, 50_000)
+    return {'csv': csv_file, 'nurses': nurses_file}
+
+
+def run_benchmarks(
+    rows: int,
+    seed: int,
+    repeat: int,
+    profiles_count: int,
+    work_dir: str,
+    only: Optional[List[str]] = None,
+) -> Dict:
+    """Run every benchmark (or those whose name contains one of ``only``)."""
+    import process_nurses
+    import compare_phoenix_nurses as phoenix
+    import compare_denver_nurses as denver
+    import view_nurses
+    from candidate_scoring import CandidateScorer
+    from cms_index import LicenseIndex, NameIndex, PhoneIndex, extract_phone_numbers, name_keys
+    from fuzzy_names import FuzzyNameIndex
+    from match_engine import MatchConfig, ProfileKeys, match_profiles
+
+    paths = prepare_data(rows, seed, work_dir)
+    output_file = os.path.join(work_dir, 'bench_output.csv')
+    cms_df = pd.read_csv(paths['nurses'], low_memory=False)
+    profiles = make_profiles(cms_df, profiles_count, seed)
+    results = {}
+
+    def wanted(name: str) -> bool:
+        return not only or any(part in name for part in only)
+
+    def record(name: str, timings: List[float], items: int, unit: str):
+        best = min(timings)
+        results[name] = {
+            'seconds': best,
+            'runs': timings,
+            'items': items,
+            'unit': unit,
+            'per_second': items / best if best > 0 else None,
+        }
+        print(f"  {name:40s} {best:9.4f}s  {items / max(best, 1e-12):>14,.0f} {unit}/s")
+
+    print(f"\nRunning benchmarks ({rows:,} rows, {len(cms_df):,} nurses, "
+          f"{len(profiles):,} profiles, best of {repeat})")
+
+    if wanted('filter_nurses_polars') and process_nurses.USE_POLARS:
+        timings = time_best(lambda: quiet(
+            process_nurses.filter_nurses_polars, paths['csv'], output_file, 50_000), repeat)
+        record('filter_nurses_polars', timings, rows, 'rows')
+
+    if wanted('filter_nurses_pandas'):
+        timings = time_best(lambda: quiet(
+            process_nurses.filter_nurses_pandas, paths['csv'], output_file, 50_000), repeat)
+        record('filter_nurses_pandas', timings, rows, 'rows')
+
+    if wanted('match_by_license'):
+        timings = time_best(lambda: LicenseIndex(cms_df), repeat)
+        record('match_by_license[index]', timings, len(cms_df), 'rows')
+        license_index = LicenseIndex(cms_df)
+        timings = time_best(
+            lambda: [phoenix.match_by_license(p, cms_df, license_index) for p in profiles], repeat)
+        record('match_by_license', timings, len(profiles), 'profiles')
+
+    if wanted('match_by_name'):
+        timings = time_best(lambda: NameIndex(cms_df), repeat)
+        record('match_by_name[index]', timings, len(cms_df), 'rows')
+        name_index = NameIndex(cms_df)
+        timings = time_best(
+            lambda: [phoenix.match_by_name(p, cms_df, name_index) for p in profiles], repeat)
+        record('match_by_name', timings, len(profiles), 'profiles')
+
+    if wanted('phone_index'):
+        timings = time_best(lambda: PhoneIndex(cms_df), repeat)
+        record('phone_index[index]', timings, len(cms_df), 'rows')
+        phone_index = PhoneIndex(cms_df)
+        phones = [phone for p in profiles for phone in extract_phone_numbers(p.get('peopleDataLabs'))]
+        timings = time_best(lambda: [phone_index.lookup(phone) for phone in phones], repeat)
+        record('phone_index', timings, len(phones), 'phones')
+
+    if wanted('match_profiles'):
+        config = MatchConfig.preset('phoenix')
+        timings = time_best(lambda: match_profiles(profiles, cms_df, config), repeat)
+        record('match_profiles', timings, len(profiles), 'profiles')
+
+    if wanted('fuzzy_name'):
+        timings = time_best(lambda: FuzzyNameIndex(cms_df), repeat)
+        record('fuzzy_name[index]', timings, len(cms_df), 'rows')
+        fuzzy_index = FuzzyNameIndex(cms_df)
+        rng = np.random.default_rng(seed)
+        names = [
+            (str(p['name']).split(' ')[0], misspell(str(p['lastName']), rng), p['state'])
+            for p in profiles if pd.notna(p['lastName']) and pd.notna(p['state'])
+        ]
+        timings = time_best(lambda: [fuzzy_index.best_match(*name) for name in names], repeat)
+        record('fuzzy_name', timings, len(names), 'profiles')
+        found = sum(fuzzy_index.best_match(*name) is not None for name in names)
+        print(f"  {'':40s} {min(timings) / max(len(names), 1) * 1000:9.3f}ms per profile, "
+              f"{found:,}/{len(names):,} found, largest block {fuzzy_index.block_sizes().max():,} rows")
+
+    if wanted('candidate_scoring'):
+        config = MatchConfig.preset('phoenix')
+        keys = ProfileKeys.build(profiles, config.adapter)
+        last_names = name_keys(cms_df)[1].rename_axis('row').reset_index(name='last')
+        pairs = keys.names[['profile', 'last']].merge(last_names, on='last')[['profile', 'row']]
+        scorer = CandidateScorer(cms_df)
+        timings = time_best(lambda: scorer.score(pairs, keys), repeat)
+        record('candidate_scoring', timings, len(pairs), 'candidates')
+
+    if wanted('match_chunk_against_nurses'):
+        chunks = list(pd.read_csv(paths['csv'], chunksize=50_000, low_memory=False))
+        keys = ProfileKeys.build(profiles, MatchConfig.preset('denver').adapter)
+
+        def match_all(denver_data):
+            for chunk in chunks:
+                denver.match_chunk_against_nurses(chunk, denver_data, keys)
+
+        timings = time_best(
+            match_all, repeat, setup=lambda: [denver.prepare_denver_nurse_data(p) for p in profiles])
+        record('match_chunk_against_nurses', timings, rows, 'rows')
+        del chunks
+
+    filter_sets = {
+        'state': {'state': 'AZ'},
+        'city+last_name': {'city': 'phoenix', 'last_name': 'son'},
+        'license_number': {'license_number': '12345'},
+        'different_addresses': {'different_addresses': True},
+        'recent_update': {'recent_update': True},
+    }
+    for label, filters in filter_sets.items():
+        name = f'apply_filters[{label}]'
+        if wanted(name):
+            timings = time_best(lambda: view_nurses.apply_filters(cms_df, filters), repeat)
+            record(name, timings, len(cms_df), 'rows')
+
+    if os.path.exists(output_file):
+        os.remove(output_file)
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'rows': rows,
+            'seed': seed,
+            'repeat': repeat,
+            'profiles': len(profiles),
+            'nurses': len(cms_df),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'polars': getattr(sys.modules.get('polars'), '__version__', None),
+        },
+        'benchmarks': results,
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Print current vs baseline timings.
+
+    Returns:
+        Names of the benchmarks that got slower by more than ``threshold``
+    """
+    regressions = []
+    if baseline['meta'].get('rows') != current['meta']['rows']:
+        print(f"\nWarning: baseline was run with {baseline['meta'].get('rows'):,} rows, "
+              f"current with {current['meta']['rows']:,}")
+
+    print(f"\n{'Benchmark':40s} {'Baseline':>10s} {'Current':>10s} {'Change':>9s}")
+    for name, result in current['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if base is None:
+            print(f"{name:40s} {'-':>10s} {result['seconds']:9.4f}s {'new':>9s}")
+            continue
+        change = result['seconds'] / base['seconds'] - 1 if base['seconds'] > 0 else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:40s} {base['seconds']:9.4f}s {result['seconds']:9.4f}s {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the nurse processor hot paths.')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                        help=f'Synthetic NPPES rows (default: {DEFAULT_ROWS:,})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f'Generator seed (default: {DEFAULT_SEED})')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'Runs per benchmark; the best is reported (default: {DEFAULT_REPEAT})')
+    parser.add_argument('--profiles', type=int, default=DEFAULT_PROFILES,
+                        help=f'Synthetic scraped profiles to match (default: {DEFAULT_PROFILES})')
+    parser.add_argument('--only', nargs='+', help='Only run benchmarks whose name contains one of these')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR,
+                        help='Directory for the generated data (default: benchmarks/.data)')
+    parser.add_argument('--output', '-o', help='Write the results as JSON')
+    parser.add_argument('--baseline', help='Compare against a stored results JSON')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Slowdown counted as a regression (default: {DEFAULT_THRESHOLD:.0%}%)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 when a benchmark regressed')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.rows, args.seed, args.repeat, args.profiles, args.work_dir, args.only)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            if args.fail_on_regression:
+                return 1
+        else:
+            print("\nNo regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
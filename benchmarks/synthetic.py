@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic NPPES-shaped CSV generator.
+
+Produces the 330 columns of the NPPES monthly dump (names, addresses,
+15 taxonomy/license/primary-switch groups, 50 "other identifier" groups,
+...), fully quoted like the real file, with realistic null density: most
+providers only fill the first taxonomy/license slot, organizations have no
+person name, and the identifier groups are mostly empty.
+
+The same ``rows`` and ``seed`` always produce a byte-identical file.
+
+Usage:
+    python -m benchmarks.synthetic synthetic.csv --rows 100000 --seed 42
+"""
+
+import argparse
+import csv
+import os
+import sys
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+NPI_START = 1000000000
+DEFAULT_SEED = 42
+BLOCK_SIZE = 50_000
+
+NPPES_COLUMNS: List[str] = [
+    'NPI',
+    'Entity Type Code',
+    'Replacement NPI',
+    'Employer Identification Number (EIN)',
+    'Provider Organization Name (Legal Business Name)',
+    'Provider Last Name (Legal Name)',
+    'Provider First Name',
+    'Provider Middle Name',
+    'Provider Name Prefix Text',
+    'Provider Name Suffix Text',
+    'Provider Credential Text',
+    'Provider Other Organization Name',
+    'Provider Other Organization Name Type Code',
+    'Provider Other Last Name',
+    'Provider Other First Name',
+    'Provider Other Middle Name',
+    'Provider Other Name Prefix Text',
+    'Provider Other Name Suffix Text',
+    'Provider Other Credential Text',
+    'Provider Other Last Name Type Code',
+    'Provider First Line Business Mailing Address',
+    'Provider Second Line Business Mailing Address',
+    'Provider Business Mailing Address City Name',
+    'Provider Business Mailing Address State Name',
+    'Provider Business Mailing Address Postal Code',
+    'Provider Business Mailing Address Country Code (If outside U.S.)',
+    'Provider Business Mailing Address Telephone Number',
+    'Provider Business Mailing Address Fax Number',
+    'Provider First Line Business Practice Location Address',
+    'Provider Second Line Business Practice Location Address',
+    'Provider Business Practice Location Address City Name',
+    'Provider Business Practice Location Address State Name',
+    'Provider Business Practice Location Address Postal Code',
+    'Provider Business Practice Location Address Country Code (If outside U.S.)',
+    'Provider Business Practice Location Address Telephone Number',
+    'Provider Business Practice Location Address Fax Number',
+    'Provider Enumeration Date',
+    'Last Update Date',
+    'NPI Deactivation Reason Code',
+    'NPI Deactivation Date',
+    'NPI Reactivation Date',
+    'Provider Sex Code',
+    'Authorized Official Last Name',
+    'Authorized Official First Name',
+    'Authorized Official Middle Name',
+    'Authorized Official Title or Position',
+    'Authorized Official Telephone Number',
+]
+for _i in range(1, 16):
+    NPPES_COLUMNS += [
+        f'Healthcare Provider Taxonomy Code_{_i}',
+        f'Provider License Number_{_i}',
+        f'Provider License Number State Code_{_i}',
+        f'Healthcare Provider Primary Taxonomy Switch_{_i}',
+    ]
+for _i in range(1, 51):
+    NPPES_COLUMNS += [
+        f'Other Provider Identifier_{_i}',
+        f'Other Provider Identifier Type Code_{_i}',
+        f'Other Provider Identifier State_{_i}',
+        f'Other Provider Identifier Issuer_{_i}',
+    ]
+NPPES_COLUMNS += [
+    'Is Sole Proprietor',
+    'Is Organization Subpart',
+    'Parent Organization LBN',
+    'Parent Organization TIN',
+    'Authorized Official Name Prefix Text',
+    'Authorized Official Name Suffix Text',
+    'Authorized Official Credential Text',
+]
+NPPES_COLUMNS += [f'Healthcare Provider Taxonomy Group_{_i}' for _i in range(1, 16)]
+NPPES_COLUMNS += ['Certification Date']
+
+# Taxonomy codes and their weights for individual providers (~35% nurses)
+INDIVIDUAL_TAXONOMIES = [
+    ('163W00000X', 14), ('163WA0400X', 2), ('163WC0200X', 2), ('163WP0218X', 1),
+    ('164W00000X', 5), ('164X00000X', 2), ('363LF0000X', 4), ('363LA2200X', 1),
+    ('364SA2100X', 1), ('367500000X', 1), ('367A00000X', 1), ('367H00000X', 1),
+    ('207Q00000X', 8), ('207R00000X', 8), ('363A00000X', 5), ('208D00000X', 6),
+    ('390200000X', 6), ('225100000X', 5), ('1223G0001X', 5), ('183500000X', 4),
+    ('111N00000X', 3), ('152W00000X', 3), ('372600000X', 3), ('374700000X', 3),
+    ('101YM0800X', 5),
+]
+ORGANIZATION_TAXONOMIES = [
+    ('282N00000X', 10), ('261QM1300X', 8), ('332B00000X', 6), ('251E00000X', 6),
+    ('3336C0003X', 6), ('291U00000X', 4), ('314000000X', 3),
+]
+LICENSE_PREFIXES = ['RN', 'LP', 'PN', 'APRN', '', '', '', 'MD']
+
+CITIES = [
+    ('PHOENIX', 'AZ'), ('TUCSON', 'AZ'), ('MESA', 'AZ'), ('DENVER', 'CO'), ('AURORA', 'CO'),
+    ('LOS ANGELES', 'CA'), ('SAN FRANCISCO', 'CA'), ('SAN DIEGO', 'CA'), ('FRESNO', 'CA'),
+    ('NEW YORK', 'NY'), ('BROOKLYN', 'NY'), ('BUFFALO', 'NY'), ('HOUSTON', 'TX'),
+    ('DALLAS', 'TX'), ('AUSTIN', 'TX'), ('SAN ANTONIO', 'TX'), ('MIAMI', 'FL'),
+    ('ORLANDO', 'FL'), ('TAMPA', 'FL'), ('CHICAGO', 'IL'), ('SPRINGFIELD', 'IL'),
+    ('SEATTLE', 'WA'), ('SPOKANE', 'WA'), ('BOSTON', 'MA'), ('ATLANTA', 'GA'),
+    ('CHARLOTTE', 'NC'), ('NASHVILLE', 'TN'), ('COLUMBUS', 'OH'), ('CLEVELAND', 'OH'),
+    ('DETROIT', 'MI'), ('MINNEAPOLIS', 'MN'), ('PORTLAND', 'OR'), ('LAS VEGAS', 'NV'),
+    ('SALT LAKE CITY', 'UT'), ('ALBUQUERQUE', 'NM'), ('PHILADELPHIA', 'PA'),
+    ('PITTSBURGH', 'PA'), ('BALTIMORE', 'MD'), ('SAN JUAN', 'PR'), ('HONOLULU', 'HI'),
+]
+STREETS = ['MAIN', 'OAK', 'MAPLE', 'CEDAR', 'PINE', 'ELM', 'WASHINGTON', 'LAKE', 'HILL',
+           'PARK', 'CAMELBACK', 'COLFAX', 'BROADWAY', 'MARKET', 'CENTRAL', 'UNIVERSITY']
+STREET_SUFFIXES = ['ST', 'AVE', 'RD', 'BLVD', 'DR', 'LN', 'WAY', 'PKWY']
+CREDENTIALS = [('RN', 30), ('LPN', 8), ('NP', 8), ('APRN', 4), ('MD', 20), ('DO', 4),
+               ('PA-C', 5), ('DDS', 4), ('PT', 5), ('', 12)]
+SYLLABLES = ['AN', 'BER', 'CA', 'DA', 'EL', 'FA', 'GA', 'HA', 'IN', 'JO', 'KA', 'LA', 'MA',
+             'NA', 'O', 'PA', 'RA', 'SA', 'TA', 'VA', 'WIL', 'SON', 'MAN', 'LEE', 'RIS',
+             'TON', 'LEY', 'REZ', 'NEZ', 'KIN', 'MER', 'DEN', 'GER', 'LIN', 'NY', 'RY']
+
+
+def _weighted_choice(rng: np.random.Generator, items: List, n: int) -> np.ndarray:
+    """Draw ``n`` items from a list of (value, weight) pairs."""
+    values = np.array([value for value, _ in items], dtype=object)
+    weights = np.array([weight for _, weight in items], dtype=float)
+    return values[rng.choice(len(values), size=n, p=weights / weights.sum())]
+
+
+def _name_vocabulary(rng: np.random.Generator, size: int) -> np.ndarray:
+    """Build a vocabulary of pronounceable upper-case names."""
+    names = set()
+    while len(names) < size:
+        parts = rng.choice(len(SYLLABLES), size=rng.integers(2, 4))
+        names.add(''.join(SYLLABLES[p] for p in parts))
+    return np.array(sorted(names), dtype=object)
+
+
+def _dates(rng: np.random.Generator, n: int, start: str, end: str) -> np.ndarray:
+    """Random days between start and end, as NumPy datetime64[D]."""
+    start_day = np.datetime64(start, 'D')
+    span = (np.datetime64(end, 'D') - start_day).astype(int)
+    return start_day + rng.integers(0, span, size=n)
+
+
+def _format_dates(days: np.ndarray) -> np.ndarray:
+    """Format datetime64[D] values as NPPES MM/DD/YYYY strings."""
+    return pd.to_datetime(days).strftime('%m/%d/%Y').to_numpy(dtype=object)
+
+
+def _digits(rng: np.random.Generator, n: int, width: int) -> np.ndarray:
+    """Random zero-padded digit strings."""
+    return np.char.zfill(rng.integers(0, 10 ** width, size=n).astype(str), width).astype(object)
+
+
+def _blank(mask: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Return ``values`` where ``mask`` is True and '' elsewhere."""
+    return np.where(mask, values, '').astype(object)
+
+
+def generate_block(rng: np.random.Generator, start: int, n: int, vocab: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Generate ``n`` NPPES rows whose NPIs start at ``NPI_START + start``."""
+    blank = np.full(n, '', dtype=object)
+    data = {col: blank for col in NPPES_COLUMNS}
+
+    individual = rng.random(n) < 0.8
+    data['NPI'] = (NPI_START + start + np.arange(n)).astype(str).astype(object)
+    data['Entity Type Code'] = np.where(individual, '1', '2').astype(object)
+
+    # Names (individuals) / organization names
+    first = vocab['first'][rng.integers(0, len(vocab['first']), n)]
+    last = vocab['last'][rng.integers(0, len(vocab['last']), n)]
+    data['Provider First Name'] = _blank(individual, first)
+    data['Provider Last Name (Legal Name)'] = _blank(individual, last)
+    data['Provider Middle Name'] = _blank(individual & (rng.random(n) < 0.4),
+                                          vocab['first'][rng.integers(0, len(vocab['first']), n)])
+    data['Provider Name Suffix Text'] = _blank(individual & (rng.random(n) < 0.03), np.full(n, 'JR.', dtype=object))
+    data['Provider Name Prefix Text'] = _blank(individual & (rng.random(n) < 0.2),
+                                               _weighted_choice(rng, [('MS.', 3), ('MR.', 2), ('DR.', 2)], n))
+    data['Provider Credential Text'] = _blank(individual, _weighted_choice(rng, CREDENTIALS, n))
+    data['Provider Sex Code'] = _blank(individual, np.where(rng.random(n) < 0.7, 'F', 'M').astype(object))
+    data['Provider Organization Name (Legal Business Name)'] = _blank(
+        ~individual, np.char.add(last.astype(str), ' HEALTH, LLC').astype(object)
+    )
+    data['Provider Other Last Name'] = _blank(individual & (rng.random(n) < 0.05),
+                                              vocab['last'][rng.integers(0, len(vocab['last']), n)])
+    data['Is Sole Proprietor'] = np.where(individual, np.where(rng.random(n) < 0.1, 'Y', 'N'), '').astype(object)
+    data['Is Organization Subpart'] = _blank(~individual, np.full(n, 'N', dtype=object))
+    for col, names in (('Authorized Official Last Name', vocab['last']), ('Authorized Official First Name', vocab['first'])):
+        data[col] = _blank(~individual, names[rng.integers(0, len(names), n)])
+    data['Authorized Official Title or Position'] = _blank(~individual, np.full(n, 'ADMINISTRATOR', dtype=object))
+    data['Authorized Official Telephone Number'] = _blank(~individual, np.char.add('6', _digits(rng, n, 9).astype(str)).astype(object))
+
+    # Practice location and mailing address
+    city_idx = rng.integers(0, len(CITIES), n)
+    cities = np.array([c for c, _ in CITIES], dtype=object)[city_idx]
+    states = np.array([s for _, s in CITIES], dtype=object)[city_idx]
+    street = np.char.add(np.char.add(rng.integers(1, 20000, n).astype(str), ' '),
+                         np.array(STREETS, dtype=str)[rng.integers(0, len(STREETS), n)])
+    street = np.char.add(np.char.add(street, ' '), np.array(STREET_SUFFIXES, dtype=str)[rng.integers(0, len(STREET_SUFFIXES), n)])
+    practice_phone = np.char.add(rng.integers(200, 990, n).astype(str), _digits(rng, n, 7).astype(str)).astype(object)
+
+    data['Provider First Line Business Practice Location Address'] = street.astype(object)
+    data['Provider Second Line Business Practice Location Address'] = _blank(
+        rng.random(n) < 0.15, np.char.add('SUITE ', rng.integers(100, 999, n).astype(str)).astype(object)
+    )
+    data['Provider Business Practice Location Address City Name'] = cities
+    data['Provider Business Practice Location Address State Name'] = states
+    data['Provider Business Practice Location Address Postal Code'] = _digits(rng, n, 9)
+    data['Provider Business Practice Location Address Country Code (If outside U.S.)'] = np.full(n, 'US', dtype=object)
+    data['Provider Business Practice Location Address Telephone Number'] = _blank(rng.random(n) < 0.9, practice_phone)
+    data['Provider Business Practice Location Address Fax Number'] = _blank(rng.random(n) < 0.3, _digits(rng, n, 10))
+
+    same_mailing = rng.random(n) < 0.6
+    mailing_phone = np.char.add(rng.integers(200, 990, n).astype(str), _digits(rng, n, 7).astype(str)).astype(object)
+    data['Provider First Line Business Mailing Address'] = np.where(
+        same_mailing, street, np.char.add('PO BOX ', rng.integers(1, 9999, n).astype(str))
+    ).astype(object)
+    data['Provider Business Mailing Address City Name'] = cities
+    data['Provider Business Mailing Address State Name'] = states
+    data['Provider Business Mailing Address Postal Code'] = _digits(rng, n, 9)
+    data['Provider Business Mailing Address Country Code (If outside U.S.)'] = np.full(n, 'US', dtype=object)
+    data['Provider Business Mailing Address Telephone Number'] = np.where(
+        same_mailing, data['Provider Business Practice Location Address Telephone Number'],
+        _blank(rng.random(n) < 0.7, mailing_phone)
+    ).astype(object)
+
+    # Dates
+    enumeration = _dates(rng, n, '2005-05-23', '2026-01-01')
+    last_update = enumeration + (rng.random(n) * (np.datetime64('2026-06-01') - enumeration).astype(int)).astype(int)
+    data['Provider Enumeration Date'] = _format_dates(enumeration)
+    data['Last Update Date'] = _format_dates(last_update)
+    data['Certification Date'] = _blank(rng.random(n) < 0.5, _format_dates(last_update))
+    deactivated = rng.random(n) < 0.01
+    data['NPI Deactivation Date'] = _blank(deactivated, _format_dates(last_update))
+    data['NPI Deactivation Reason Code'] = _blank(deactivated, np.full(n, 'DT', dtype=object))
+
+    # Taxonomy / license slots: most providers fill only the first one
+    slots = np.minimum(rng.geometric(0.7, n), 15)
+    individual_codes = _weighted_choice(rng, INDIVIDUAL_TAXONOMIES, n * 15).reshape(15, n)
+    organization_codes = _weighted_choice(rng, ORGANIZATION_TAXONOMIES, n * 15).reshape(15, n)
+    for i in range(15):
+        filled = slots > i
+        codes = np.where(individual, individual_codes[i], organization_codes[i])
+        has_license = filled & individual & (rng.random(n) < 0.85)
+        prefixes = np.array(LICENSE_PREFIXES, dtype=str)[rng.integers(0, len(LICENSE_PREFIXES), n)]
+        licenses = np.char.add(prefixes, rng.integers(10000, 9999999, n).astype(str)).astype(object)
+        data[f'Healthcare Provider Taxonomy Code_{i + 1}'] = _blank(filled, codes)
+        data[f'Provider License Number_{i + 1}'] = _blank(has_license, licenses)
+        data[f'Provider License Number State Code_{i + 1}'] = _blank(has_license, states)
+        data[f'Healthcare Provider Primary Taxonomy Switch_{i + 1}'] = _blank(
+            filled, np.full(n, 'Y' if i == 0 else 'N', dtype=object)
+        )
+
+    # Other provider identifiers: mostly empty
+    identifiers = np.minimum(np.where(rng.random(n) < 0.3, rng.geometric(0.5, n), 0), 50)
+    for i in range(int(identifiers.max(initial=0))):
+        filled = identifiers > i
+        data[f'Other Provider Identifier_{i + 1}'] = _blank(filled, _digits(rng, n, 8))
+        data[f'Other Provider Identifier Type Code_{i + 1}'] = _blank(filled, np.full(n, '05', dtype=object))
+        data[f'Other Provider Identifier State_{i + 1}'] = _blank(filled, states)
+        data[f'Other Provider Identifier Issuer_{i + 1}'] = _blank(filled, np.full(n, 'MEDICAID', dtype=object))
+
+    return pd.DataFrame(data, columns=NPPES_COLUMNS)
+
+
+def generate_nppes_csv(path: str, rows: int, seed: int = DEFAULT_SEED, block_size: int = BLOCK_SIZE) -> str:
+    """
+    Write a synthetic NPPES CSV with ``rows`` rows.
+
+    Args:
+        path: Output CSV path
+        rows: Number of data rows
+        seed: Random seed (same seed and rows -> identical file)
+        block_size: Rows generated and written at a time
+
+    Returns:
+        The output path
+    """
+    rng = np.random.default_rng(seed)
+    vocab = {
+        'first': _name_vocabulary(rng, 1500),
+        'last': _name_vocabulary(rng, 6000),
+    }
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, rows, block_size):
+            block = generate_block(rng, start, min(block_size, rows - start), vocab)
+            block.to_csv(f, header=start == 0, index=False, quoting=csv.QUOTE_ALL)
+        if rows == 0:
+            pd.DataFrame(columns=NPPES_COLUMNS).to_csv(f, index=False, quoting=csv.QUOTE_ALL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Generate a synthetic NPPES-shaped CSV file.')
+    parser.add_argument('output_file', help='Path of the CSV file to write')
+    parser.add_argument('--rows', type=int, default=100_000, help='Number of rows (default: 100,000)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'Random seed (default: {DEFAULT_SEED})')
+    args = parser.parse_args(argv)
+
+    generate_nppes_csv(args.output_file, args.rows, args.seed)
+    print(f"Wrote {args.rows:,} rows x {len(NPPES_COLUMNS)} columns to {args.output_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Evidence scoring for profiles with several CMS candidate rows.
+
+A common name can match dozens of CMS rows, and taking the first one in
+file order gives an arbitrary NPI. ``CandidateScorer`` scores every
+(profile, row) candidate pair on the signals both sides carry:
+
+- location: the profile city/state against the practice and mailing address
+- license state: the profile and Nursys license states against the 15 CMS
+  license states
+- credential: the Nursys license types against the CMS credential text, and
+  whether that credential is a nursing one
+- phone: the PDL phones against the practice/mailing phones
+- PDL sex against ``Provider Sex Code``, PDL education mentioning nursing
+
+The score is the sum of config.CANDIDATE_SIGNAL_WEIGHTS of the signals that
+hold. Every signal is computed for all pairs at once with joins and array
+comparisons, never per candidate. ``candidate_margins`` gives how far the
+chosen candidate is ahead of the best other one.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from cms_index import normalize_name_series, normalize_state_series, phone_keys
+from config import (
+    CANDIDATE_SIGNAL_WEIGHTS,
+    CREDENTIAL_COLUMN,
+    FILTER_COLUMNS,
+    LICENSE_STATE_COLUMNS,
+    MAILING_CITY_COLUMN,
+    MAILING_STATE_COLUMN,
+    NURSE_CREDENTIALS,
+    PHONE_MAILING_COLUMN,
+    PHONE_PRACTICE_COLUMN,
+    SEX_CODE_COLUMN,
+)
+
+# PDL 'sex' values -> Provider Sex Code
+PDL_SEX_CODES = {'female': 'F', 'male': 'M'}
+
+
+def profile_sex(pdl_data: Optional[Dict]) -> str:
+    """The PDL sex as a CMS sex code ('F'/'M'), '' when unknown."""
+    if not isinstance(pdl_data, dict):
+        return ''
+    return PDL_SEX_CODES.get(str(pdl_data.get('sex') or '').lower(), '')
+
+
+def has_nursing_education(pdl_data: Optional[Dict]) -> bool:
+    """Whether a PDL school, degree or major mentions nursing."""
+    if not isinstance(pdl_data, dict):
+        return False
+    for entry in pdl_data.get('education') or []:
+        if not isinstance(entry, dict):
+            continue
+        school = entry.get('school') or {}
+        texts = list(entry.get('degrees') or []) + list(entry.get('majors') or [])
+        texts.append(school.get('name') if isinstance(school, dict) else '')
+        if any('nurs' in str(text).lower() for text in texts if text):
+            return True
+    return False
+
+
+def _credential_tokens(series: pd.Series) -> pd.Series:
+    """Credential text split into upper-case tokens ('R.N., BSN' -> ['RN', 'BSN'])."""
+    text = series.fillna('').astype(str).str.upper().str.replace('.', '', regex=False)
+    return text.str.findall(r'[A-Z]+')
+
+
+def _flag_pairs(size: int, pair_ids: np.ndarray) -> np.ndarray:
+    flags = np.zeros(size, dtype=bool)
+    flags[pair_ids] = True
+    return flags
+
+
+class CandidateScorer:
+    """Scores (profile, row) candidate pairs against one CMS DataFrame."""
+
+    def __init__(self, cms_df: pd.DataFrame, weights: Optional[Dict[str, float]] = None):
+        self.cms_df = cms_df
+        self.weights = dict(CANDIDATE_SIGNAL_WEIGHTS if weights is None else weights)
+
+    def _text(self, col: str, rows: np.ndarray, normalize) -> np.ndarray:
+        if col not in self.cms_df.columns:
+            return np.full(len(rows), '', dtype=object)
+        return normalize(self.cms_df[col].iloc[rows]).to_numpy(dtype=object)
+
+    def signals(self, pairs: pd.DataFrame, keys) -> pd.DataFrame:
+        """
+        One boolean column per signal of CANDIDATE_SIGNAL_WEIGHTS, aligned
+        with ``pairs`` (profile, row). ``keys`` is the cohort's ProfileKeys.
+        """
+        size = len(pairs)
+        profile_ids = pairs['profile'].to_numpy(np.int64)
+        row_ids = pairs['row'].to_numpy(np.int64)
+        rows, pos = np.unique(row_ids, return_inverse=True)
+        indexed = pd.DataFrame({'pair': np.arange(size), 'profile': profile_ids, 'row': row_ids})
+
+        profiles = keys.profiles.set_index('profile').reindex(profile_ids)
+        state = profiles['state'].fillna('').to_numpy(dtype=object)
+        city = profiles['city'].fillna('').to_numpy(dtype=object)
+        sex = profiles['sex'].fillna('').to_numpy(dtype=object)
+        nursing = profiles['nursing'].fillna(False).to_numpy(dtype=bool)
+
+        def same(profile_values: np.ndarray, col: str, normalize) -> np.ndarray:
+            cms_values = self._text(col, rows, normalize)[pos]
+            return (profile_values != '') & (profile_values == cms_values)
+
+        signals = {
+            'practice_state': same(state, FILTER_COLUMNS['state'], normalize_state_series),
+            'mailing_state': same(state, MAILING_STATE_COLUMN, normalize_state_series),
+            'practice_city': same(city, FILTER_COLUMNS['city'], normalize_name_series),
+            'mailing_city': same(city, MAILING_CITY_COLUMN, normalize_name_series),
+        }
+
+        # Any profile/Nursys license state among the candidate's license states
+        profile_states = pd.concat([
+            keys.profiles[['profile', 'state']],
+            keys.licenses[['profile', 'state']],
+        ], ignore_index=True)
+        profile_states = profile_states[profile_states['state'] != ''].drop_duplicates()
+        cms_states = pd.concat([
+            pd.DataFrame({'row': rows, 'state': self._text(col, rows, normalize_state_series)})
+            for col in LICENSE_STATE_COLUMNS if col in self.cms_df.columns
+        ] or [pd.DataFrame(columns=['row', 'state'])], ignore_index=True)
+        hits = indexed.merge(profile_states, on='profile').merge(cms_states, on=['row', 'state'])
+        signals['license_state'] = _flag_pairs(size, hits['pair'].to_numpy(np.int64))
+
+        # A PDL phone equal to the practice or mailing phone
+        cms_phones = []
+        for col in (PHONE_PRACTICE_COLUMN, PHONE_MAILING_COLUMN):
+            column_phones = phone_keys(self.cms_df, col, rows)
+            if column_phones is not None:
+                cms_phones.append(pd.DataFrame({'row': rows, 'phone': column_phones.to_numpy()}))
+        if cms_phones and not keys.phones.empty:
+            cms_phones = pd.concat(cms_phones, ignore_index=True)
+            cms_phones = cms_phones[cms_phones['phone'] != '']
+            hits = indexed.merge(cms_phones, on='row').merge(keys.phones, on=['profile', 'phone'])
+            signals['phone'] = _flag_pairs(size, hits['pair'].to_numpy(np.int64))
+        else:
+            signals['phone'] = np.zeros(size, dtype=bool)
+
+        # Credential: a Nursys license type among the credential tokens
+        if CREDENTIAL_COLUMN in self.cms_df.columns:
+            tokens = _credential_tokens(self.cms_df[CREDENTIAL_COLUMN].iloc[rows])
+            cms_tokens = pd.DataFrame({'row': rows, 'token': tokens.to_numpy()}).explode('token').dropna()
+        else:
+            cms_tokens = pd.DataFrame(columns=['row', 'token'])
+        license_types = keys.licenses[['profile', 'type']].rename(columns={'type': 'token'})
+        license_types = license_types[license_types['token'] != ''].drop_duplicates()
+        hits = indexed.merge(license_types, on='profile').merge(cms_tokens, on=['row', 'token'])
+        signals['credential'] = _flag_pairs(size, hits['pair'].to_numpy(np.int64))
+        nurse_rows = np.isin(rows, cms_tokens.loc[cms_tokens['token'].isin(NURSE_CREDENTIALS), 'row'].to_numpy())
+        signals['nurse_credential'] = nurse_rows[pos]
+        signals['nursing_education'] = nursing & signals['nurse_credential']
+
+        cms_sex = self._text(SEX_CODE_COLUMN, rows, normalize_name_series)[pos]
+        known = (sex != '') & (cms_sex != '')
+        signals['sex'] = known & (sex == cms_sex)
+        signals['sex_conflict'] = known & (sex != cms_sex)
+        return pd.DataFrame(signals, index=pairs.index)
+
+    def score(self, pairs: pd.DataFrame, keys) -> np.ndarray:
+        """Weighted evidence score of every (profile, row) pair."""
+        if pairs.empty:
+            return np.zeros(0, dtype=float)
+        signals = self.signals(pairs, keys)
+        score = np.zeros(len(pairs), dtype=float)
+        for signal, weight in self.weights.items():
+            if signal in signals.columns:
+                score += weight * signals[signal].to_numpy(dtype=float)
+        return score
+
+
+def candidate_margins(pool: pd.DataFrame, chosen: pd.DataFrame) -> np.ndarray:
+    """
+    Score lead of each chosen (profile, row) over the best other row in its
+    profile's ``pool`` (profile, row, evidence); NaN without another row.
+    """
+    if chosen.empty:
+        return np.zeros(0, dtype=float)
+    pool = pool[['profile', 'row', 'evidence']].sort_values('evidence', ascending=False, kind='stable')
+    pool = pool.drop_duplicates(['profile', 'row'])
+    pool['place'] = pool.groupby('profile').cumcount()
+    top = pool[pool['place'] == 0].set_index('profile')
+    second = pool[pool['place'] == 1].set_index('profile')['evidence']
+
+    profiles = chosen['profile'].to_numpy(np.int64)
+    chosen_rows = chosen['row'].to_numpy(np.int64)
+    evidence = chosen['evidence'].to_numpy(float)
+    top_rows = top['row'].reindex(profiles).to_numpy()
+    top_evidence = top['evidence'].reindex(profiles).to_numpy(float)
+    runner_up = np.where(top_rows == chosen_rows, second.reindex(profiles).to_numpy(float), top_evidence)
+    return evidence - runner_up
@@ -0,0 +1,126 @@
+"""
+Durable checkpoints for long chunked runs (``--resume``).
+
+A checkpoint is a small JSON file written after every committed chunk:
+
+- the number of chunks and input rows already processed, and of CSV records
+  consumed (``records``: malformed lines that were skipped count too, so a
+  resume starts right after them)
+- the partial statistics (or, for the Denver matcher, the match state)
+- the size of the output file at that point
+
+Checkpoints are written to a temporary file and renamed, so a crash leaves
+either the previous or the new checkpoint, never a torn one. On resume the
+output is truncated back to the recorded size before appending, so rows
+written after the last checkpoint are never duplicated. The input file's
+fingerprint (size, mtime, header hash) is stored as well; a checkpoint for a
+different input is rejected.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from parquet_cache import compute_fingerprint
+
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointMismatchError(Exception):
+    """The checkpoint was written for a different input file or settings."""
+    pass
+
+
+def get_checkpoint_file(output_file: str) -> str:
+    """Default checkpoint file for an output (nurses.csv -> nurses.csv.checkpoint.json)."""
+    return output_file + CHECKPOINT_SUFFIX
+
+
+def save_checkpoint(checkpoint_file: str, input_file: str, settings: Dict, progress: Dict) -> None:
+    """
+    Atomically write a checkpoint.
+
+    Args:
+        checkpoint_file: Path of the checkpoint file
+        input_file: Input being processed (fingerprinted)
+        settings: Run settings that must be identical on resume (filters, chunk size, ...)
+        progress: Chunks/rows done, partial stats, output size, ...
+    """
+    checkpoint = {
+        'version': CHECKPOINT_VERSION,
+        'input_file': os.path.abspath(input_file),
+        'fingerprint': compute_fingerprint(input_file),
+        'settings': settings,
+        'saved_at': datetime.now().isoformat(timespec='seconds'),
+        'progress': progress,
+    }
+    tmp_file = checkpoint_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, checkpoint_file)
+
+
+def load_checkpoint(checkpoint_file: str, input_file: str, settings: Dict) -> Optional[Dict]:
+    """
+    Load the progress of a checkpoint, or None if there is none.
+
+    Raises:
+        CheckpointMismatchError: if it belongs to another input file or settings
+    """
+    if not os.path.exists(checkpoint_file):
+        return None
+    with open(checkpoint_file, 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        raise CheckpointMismatchError(f"Unsupported checkpoint version in {checkpoint_file}")
+    if checkpoint['fingerprint'] != compute_fingerprint(input_file):
+        raise CheckpointMismatchError(f"{input_file} changed since the checkpoint was written")
+    if checkpoint['settings'] != settings:
+        raise CheckpointMismatchError(
+            f"Settings differ from the checkpoint ({checkpoint['settings']} vs {settings})"
+        )
+    return checkpoint['progress']
+
+
+def skip_records(count: int) -> Optional[Callable[[int], bool]]:
+    """
+    ``skiprows`` for ``pd.read_csv`` that resumes after ``count`` CSV records
+    (the header is kept), or None to skip nothing. A callable rather than
+    ``range(1, count + 1)``: Pandas turns a range into a set of every skipped
+    row number, hundreds of MB when resuming deep into the file.
+    """
+    if not count:
+        return None
+    return lambda row: 0 < row <= count
+
+
+def clear_checkpoint(checkpoint_file: str) -> None:
+    """Remove a checkpoint once its run completed."""
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+
+def sync_output(output_file: str) -> int:
+    """Flush an appended output file to disk and return its size."""
+    if not os.path.exists(output_file):
+        return 0
+    with open(output_file, 'rb+') as f:
+        os.fsync(f.fileno())
+    return os.path.getsize(output_file)
+
+
+def truncate_output(output_file: str, size: int) -> None:
+    """Cut the output back to the size recorded by the last checkpoint."""
+    if size == 0:
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        return
+    if not os.path.exists(output_file) or os.path.getsize(output_file) < size:
+        raise CheckpointMismatchError(f"{output_file} is missing or shorter than at the checkpoint")
+    with open(output_file, 'rb+') as f:
+        f.truncate(size)
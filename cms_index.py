@@ -0,0 +1,636 @@
+"""
+Match-key normalizers and hash indexes over the CMS nurse data.
+
+``normalize_name``/``normalize_license``/``normalize_phone`` are the one
+definition of the match keys; the ``*_series`` variants apply the same rules
+to whole columns. The indexes are built once per CMS DataFrame with
+vectorized Pandas string operations and then answer each lookup with a dict
+access, instead of re-normalizing whole columns for every scraped profile.
+
+Extracts written with ``process_nurses.py --key-columns`` already carry the
+normalized keys (``match_key_columns``); the indexes read those columns
+instead of normalizing the source columns again.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    FILTER_COLUMNS,
+    KEY_FIRST_NAME_COLUMN,
+    KEY_LAST_NAME_COLUMN,
+    KEY_LICENSES_COLUMN,
+    KEY_MAILING_PHONE_COLUMN,
+    KEY_NAME_BLOCK_COLUMN,
+    KEY_PRACTICE_PHONE_COLUMN,
+    LICENSE_NUMBER_COLUMNS,
+    LICENSE_STATE_COLUMNS,
+    MIDDLE_NAME_COLUMN,
+    PHONE_MAILING_COLUMN,
+    PHONE_PRACTICE_COLUMN,
+    US_STATE_CODES,
+)
+
+# Same prefixes that normalize_license() strips
+LICENSE_PREFIX_PATTERN = r'^(RN|LP|PN|TEMP)'
+
+# Source column -> precomputed key column (process_nurses.py --key-columns)
+PHONE_KEY_COLUMNS = {
+    PHONE_PRACTICE_COLUMN: KEY_PRACTICE_PHONE_COLUMN,
+    PHONE_MAILING_COLUMN: KEY_MAILING_PHONE_COLUMN,
+}
+
+
+def normalize_state(state) -> str:
+    """Normalize a state name or code to the two-letter CMS code ('Arizona' -> 'AZ')."""
+    if state is None or (isinstance(state, float) and np.isnan(state)):
+        return ''
+    state = str(state).strip().upper()
+    return US_STATE_CODES.get(state, state)
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a name for comparison."""
+    if pd.isna(name) or name == '':
+        return ''
+    return str(name).strip().upper()
+
+
+def _integral_float(value: Any) -> Any:
+    """6020000046.0 -> 6020000046: numeric CSV columns with blanks are read as floats."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def normalize_license(license_num: str) -> str:
+    """Normalize a license number for comparison (strip, uppercase, drop RN/LP/PN/TEMP)."""
+    if pd.isna(license_num) or license_num == '':
+        return ''
+    license_num = _integral_float(license_num)
+    license_str = str(license_num).strip().upper()
+    return re.sub(LICENSE_PREFIX_PATTERN, '', license_str)
+
+
+def normalize_phone(phone: Any) -> str:
+    """Normalize a phone number to last 10 digits."""
+    if pd.isna(phone) or phone == '':
+        return ''
+    phone_str = re.sub(r'\D', '', str(_integral_float(phone)))
+    if len(phone_str) >= 10:
+        return phone_str[-10:]
+    return ''
+
+
+def extract_phone_numbers(pdl_data: Optional[Dict]) -> List[str]:
+    """Extract phone numbers (last 10 digits) from People Data Labs data."""
+    if not pdl_data or 'phone_numbers' not in pdl_data:
+        return []
+
+    phones = []
+    for phone in pdl_data.get('phone_numbers', []):
+        if phone:
+            phone_clean = re.sub(r'\D', '', str(phone))
+            if len(phone_clean) >= 10:
+                phones.append(phone_clean[-10:])
+    return phones
+
+
+def _cell_text(series: pd.Series) -> pd.Series:
+    """
+    ``str()`` of every value, with integral floats written without '.0', so
+    a numeric column read as float gives the same text as the CSV cell.
+    """
+    if series.dtype.kind != 'f':
+        return series.astype(str)
+    values = series.to_numpy()
+    integral = np.isfinite(values) & (np.mod(values, 1) == 0)
+    text = series.astype(str).to_numpy(dtype=object)
+    text[integral] = values[integral].astype(np.int64).astype(str)
+    return pd.Series(text, index=series.index, dtype=object)
+
+
+def normalize_name_series(series: pd.Series) -> pd.Series:
+    """Vectorized ``normalize_name``: strip and uppercase (missing values become '')."""
+    return series.astype(str).str.strip().str.upper().mask(series.isna(), '')
+
+
+def normalize_license_series(series: pd.Series) -> pd.Series:
+    """
+    Vectorized ``normalize_license``: strip, uppercase and drop RN/LP/PN/TEMP.
+
+    Missing values become ''.
+    """
+    missing = series.isna()
+    normalized = (
+        _cell_text(series)
+        .str.strip()
+        .str.upper()
+        .str.replace(LICENSE_PREFIX_PATTERN, '', regex=True)
+    )
+    return normalized.mask(missing, '')
+
+
+def normalize_phone_series(series: pd.Series) -> pd.Series:
+    """Vectorized ``normalize_phone``: last 10 digits, '' when missing or shorter."""
+    if series.dtype.kind in 'iuf':
+        # Phones read as numbers: whole non-negative values are their own digits
+        values = series.to_numpy(dtype=float)
+        missing = np.isnan(values)
+        whole = (values >= 0) & (values < 2 ** 53) & (np.mod(values, 1) == 0)
+        if (missing | whole).all():
+            phones = np.full(len(values), '', dtype=object)
+            long_enough = whole & (values >= 1e9)
+            last_digits = np.mod(values[long_enough], 1e10).astype(np.int64)
+            if len(last_digits):
+                phones[long_enough] = np.char.zfill(last_digits.astype(str), 10).astype(object)
+            return pd.Series(phones, index=series.index, dtype=object)
+    digits = _cell_text(series).str.replace(r'\D', '', regex=True)
+    return digits.str[-10:].where((digits.str.len() >= 10) & series.notna(), '')
+
+
+def _normalize_state_series(series: pd.Series) -> pd.Series:
+    return series.astype(str).str.strip().str.upper().mask(series.isna(), '')
+
+
+def normalize_state_series(series: pd.Series) -> pd.Series:
+    """Vectorized ``normalize_state``: state names become their two-letter codes."""
+    states = _normalize_state_series(series)
+    return states.map(US_STATE_CODES).fillna(states)
+
+
+def match_key_columns(cms_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The normalized key columns (config.MATCH_KEY_COLUMNS) of CMS rows, as
+    written by ``process_nurses.py --key-columns``.
+
+    Names, licenses and phones use the ``*_series`` normalizers. Licenses are
+    the 15 'LICENSE:STATE' slots in column order joined with '|' (empty slots
+    kept so a slot's position is its column; trailing ones dropped). The name
+    block is 'LAST|F', '' without both names.
+    """
+    blank = pd.Series('', index=cms_df.index, dtype=object)
+
+    def normalized(col: str, normalize) -> pd.Series:
+        return normalize(cms_df[col]).astype(object) if col in cms_df.columns else blank
+
+    first_names = normalized(FILTER_COLUMNS['first_name'], normalize_name_series)
+    last_names = normalized(FILTER_COLUMNS['last_name'], normalize_name_series)
+
+    licenses = None
+    for number_col, state_col in zip(LICENSE_NUMBER_COLUMNS, LICENSE_STATE_COLUMNS):
+        numbers = normalized(number_col, normalize_license_series)
+        slot = (numbers + ':' + normalized(state_col, _normalize_state_series)).where(numbers != '', '')
+        licenses = slot if licenses is None else licenses + '|' + slot
+
+    has_name = (first_names != '') & (last_names != '')
+    return pd.DataFrame({
+        KEY_FIRST_NAME_COLUMN: first_names,
+        KEY_LAST_NAME_COLUMN: last_names,
+        KEY_LICENSES_COLUMN: licenses.str.rstrip('|'),
+        KEY_PRACTICE_PHONE_COLUMN: normalized(PHONE_PRACTICE_COLUMN, normalize_phone_series),
+        KEY_MAILING_PHONE_COLUMN: normalized(PHONE_MAILING_COLUMN, normalize_phone_series),
+        KEY_NAME_BLOCK_COLUMN: (last_names + '|' + first_names.str[:1]).where(has_name, ''),
+    }, index=cms_df.index)
+
+
+def _stored_text(series: pd.Series) -> pd.Series:
+    return _cell_text(series).mask(series.isna(), '').astype(object)
+
+
+def stored_key(cms_df: pd.DataFrame, key_col: str) -> Optional[pd.Series]:
+    """
+    A key column written by ``--key-columns`` as text ('' when blank), or
+    None when the extract has no such column.
+    """
+    if key_col not in cms_df.columns:
+        return None
+    return _stored_text(cms_df[key_col])
+
+
+def name_keys(
+    cms_df: pd.DataFrame,
+    first_col: str = FILTER_COLUMNS['first_name'],
+    last_col: str = FILTER_COLUMNS['last_name'],
+) -> Tuple[pd.Series, pd.Series]:
+    """Normalized (first, last) names: the stored keys when present, else normalized here."""
+    keys = []
+    for col, default_col, key_col in (
+        (first_col, FILTER_COLUMNS['first_name'], KEY_FIRST_NAME_COLUMN),
+        (last_col, FILTER_COLUMNS['last_name'], KEY_LAST_NAME_COLUMN),
+    ):
+        stored = stored_key(cms_df, key_col) if col == default_col else None
+        if stored is not None:
+            keys.append(stored)
+        elif col in cms_df.columns:
+            keys.append(normalize_name_series(cms_df[col]))
+        else:
+            keys.append(pd.Series('', index=cms_df.index))
+    return keys[0], keys[1]
+
+
+def phone_keys(cms_df: pd.DataFrame, phone_col: str, rows: Optional[np.ndarray] = None) -> Optional[pd.Series]:
+    """
+    Normalized phones of a practice/mailing column (only ``rows`` when given):
+    the stored key when present, else normalized here; None without either.
+    """
+    key_col = PHONE_KEY_COLUMNS.get(phone_col)
+    if key_col in cms_df.columns:
+        text = _stored_text(cms_df[key_col] if rows is None else cms_df[key_col].iloc[rows])
+        # Read back as a number, a key loses its leading zeros
+        return text.where(text == '', text.str.zfill(10))
+    if phone_col not in cms_df.columns:
+        return None
+    return normalize_phone_series(cms_df[phone_col] if rows is None else cms_df[phone_col].iloc[rows])
+
+
+def _melt_stored_licenses(cms_df: pd.DataFrame, licenses: pd.Series) -> pd.DataFrame:
+    """melt_licenses() from a stored ``key_licenses`` column."""
+    slots = licenses.str.split('|', expand=True)
+    positions = np.arange(len(cms_df))
+    parts = []
+    for slot in range(slots.shape[1]):
+        entries = slots[slot].fillna('').astype(str)
+        present = (entries != '').to_numpy()
+        if not present.any():
+            continue
+        pairs = entries[present].str.rsplit(':', n=1, expand=True)
+        parts.append(pd.DataFrame({
+            'license': pairs[0].to_numpy(dtype=object),
+            'state': pairs[1].to_numpy(dtype=object),
+            'row': positions[present],
+        }))
+    if parts:
+        return pd.concat(parts, ignore_index=True)
+    return pd.DataFrame({'license': [], 'state': [], 'row': []})
+
+
+def melt_licenses(cms_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Melt the 15 license number/state column pairs into one long table.
+
+    Returns a DataFrame with ``license`` (normalized), ``state`` and ``row``
+    (CMS row position), ordered column 1 first, then file order; empty
+    license cells are dropped. A stored ``key_licenses`` column is used
+    when the extract has one.
+    """
+    stored = stored_key(cms_df, KEY_LICENSES_COLUMN)
+    if stored is not None:
+        return _melt_stored_licenses(cms_df, stored)
+
+    parts = []
+    positions = np.arange(len(cms_df))
+    for number_col, state_col in zip(LICENSE_NUMBER_COLUMNS, LICENSE_STATE_COLUMNS):
+        if number_col not in cms_df.columns:
+            continue
+        licenses = normalize_license_series(cms_df[number_col])
+        present = (licenses != '').to_numpy()
+        if not present.any():
+            continue
+        if state_col in cms_df.columns:
+            states = _normalize_state_series(cms_df[state_col])
+        else:
+            states = pd.Series('', index=cms_df.index)
+        parts.append(pd.DataFrame({
+            'license': licenses.to_numpy()[present],
+            'state': states.to_numpy()[present],
+            'row': positions[present],
+        }))
+
+    if parts:
+        return pd.concat(parts, ignore_index=True)
+    return pd.DataFrame({'license': [], 'state': [], 'row': []})
+
+
+class LicenseIndex:
+    """
+    Normalized license number -> CMS row positions.
+
+    The 15 license number/state column pairs are melted into one long table
+    and grouped by normalized license. Row positions for a license are kept
+    in the order the old column-by-column scan would have found them (column
+    1 first, then file order), so ``first()`` returns the same row as before.
+    """
+
+    def __init__(self, cms_df: pd.DataFrame):
+        melted = melt_licenses(cms_df)
+        self.entries = melted
+        self._rows = melted['row'].to_numpy(dtype=np.int64)
+        self._states = melted['state'].to_numpy(dtype=object)
+        self._groups: Dict[str, np.ndarray] = melted.groupby('license', sort=False).indices
+        self.size = len(melted)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def lookup(self, normalized_license: str, state: Optional[str] = None) -> List[int]:
+        """
+        Return CMS row positions holding ``normalized_license``.
+
+        Args:
+            normalized_license: License number already passed through normalize_license()
+            state: Optional state (name or code); only licenses issued by that state match
+        """
+        entries = self._groups.get(normalized_license)
+        if entries is None:
+            return []
+        if state:
+            state_code = normalize_state(state)
+            entries = entries[self._states[entries] == state_code]
+        # A row can hold the same license in two columns; keep the first occurrence
+        rows = self._rows[entries]
+        _, first = np.unique(rows, return_index=True)
+        return rows[np.sort(first)].tolist()
+
+    def first(self, normalized_license: str, state: Optional[str] = None) -> Optional[int]:
+        """Return the first CMS row position holding the license, or None."""
+        entries = self._groups.get(normalized_license)
+        if entries is None:
+            return None
+        if state:
+            rows = self.lookup(normalized_license, state)
+            return rows[0] if rows else None
+        return int(self._rows[entries[0]])
+
+
+def melt_phones(cms_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The practice and mailing phones as one long table: ``phone``
+    (normalized), ``row`` (CMS row position) and ``column`` (0 practice,
+    1 mailing), practice phones first, then file order. Empty phones are
+    dropped, and a mailing phone equal to the row's practice phone too.
+    Stored ``key_*_phone`` columns are used when the extract has them.
+    """
+    parts = []
+    positions = np.arange(len(cms_df))
+    for column, phone_col in enumerate((PHONE_PRACTICE_COLUMN, PHONE_MAILING_COLUMN)):
+        phones = phone_keys(cms_df, phone_col)
+        if phones is None:
+            continue
+        present = (phones != '').to_numpy()
+        parts.append(pd.DataFrame({
+            'phone': phones.to_numpy(dtype=object)[present],
+            'row': positions[present],
+            'column': column,
+        }))
+    if not parts:
+        return pd.DataFrame({'phone': pd.Series(dtype=object), 'row': pd.Series(dtype=np.int64),
+                             'column': pd.Series(dtype=np.int64)})
+    return pd.concat(parts, ignore_index=True).drop_duplicates(['phone', 'row'])
+
+
+class PhoneIndex:
+    """
+    Normalized 10-digit phone -> CMS row positions, over the practice and
+    mailing phones.
+
+    Built once per CMS DataFrame from ``melt_phones``; a lookup is a dict
+    access and normalizes nothing. ``counts`` is the number of rows sharing
+    each phone, so shared numbers (a hospital switchboard) can be told apart
+    from a nurse's own.
+    """
+
+    def __init__(self, cms_df: pd.DataFrame):
+        melted = melt_phones(cms_df)
+        self.entries = melted
+        self._rows = melted['row'].to_numpy(dtype=np.int64)
+        # factorize + one stable argsort: groupby().indices is several
+        # times slower on string columns
+        codes, phones = pd.factorize(melted['phone'].to_numpy(dtype=object))
+        entries = np.argsort(codes, kind='stable')
+        starts = np.flatnonzero(np.diff(codes[entries])) + 1
+        self._groups: Dict[str, np.ndarray] = dict(zip(phones.tolist(), np.split(entries, starts)))
+        self._npis = cms_df['NPI'].to_numpy(dtype=object) if 'NPI' in cms_df.columns else None
+        self.counts = melted['phone'].value_counts()
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def lookup(self, normalized_phone: str) -> List[int]:
+        """CMS row positions with ``normalized_phone`` (normalize_phone()) as practice or mailing phone."""
+        entries = self._groups.get(normalized_phone)
+        if entries is None:
+            return []
+        return np.sort(self._rows[entries]).tolist()
+
+    def npis(self, normalized_phone: str) -> List[Any]:
+        """NPIs of the rows with the phone, in file order (row positions without an NPI column)."""
+        rows = self.lookup(normalized_phone)
+        if self._npis is None:
+            return rows
+        return self._npis[rows].tolist()
+
+
+def name_interpretations(first_name: str, last_name: str) -> List[Tuple[str, str, str]]:
+    """
+    Plausible (first, middle, last) readings of a normalized profile name
+    whose first or last name has several tokens, most plausible first.
+
+    Scraped profiles put middle and maiden names into ``lastName``:
+    'CRYSTAL' + 'ANN MARIE BARTON' reads as ('CRYSTAL', 'ANN MARIE',
+    'BARTON'), then with compound surnames ('MARIE BARTON'), then with an
+    earlier token as the surname (a maiden name), then with a compound
+    first name ('CRYSTAL ANN'). The reading as written is not included.
+    """
+    first_tokens = first_name.split()
+    last_tokens = last_name.split()
+    if not first_tokens or not last_tokens or (len(first_tokens) < 2 and len(last_tokens) < 2):
+        return []
+    first, extra_first = first_tokens[0], first_tokens[1:]
+    count = len(last_tokens)
+
+    readings = []
+    # The surname last, the tokens before it as middle names
+    for start in range(count - 1, 0, -1):
+        readings.append((first, ' '.join(extra_first + last_tokens[:start]), ' '.join(last_tokens[start:])))
+    # An earlier token as the surname (maiden name)
+    for pos in range(count - 2, -1, -1):
+        readings.append((first, ' '.join(extra_first + last_tokens[:pos]), last_tokens[pos]))
+    # Several first-name tokens: the first one alone, the last name as written
+    if extra_first:
+        readings.append((first, ' '.join(extra_first), last_name))
+    # A compound first name ('MARY' + 'ANN SMITH')
+    if count > 1:
+        readings.append((f'{first_name} {last_tokens[0]}', '', ' '.join(last_tokens[1:])))
+        readings.append((f'{first_name} {last_tokens[0]}', ' '.join(last_tokens[1:-1]), last_tokens[-1]))
+
+    unique = []
+    seen = {(first_name, last_name)}
+    for reading in readings:
+        key = (reading[0], reading[2])
+        if key not in seen:
+            seen.add(key)
+            unique.append(reading)
+    return unique
+
+
+def middle_name_agreement(profile_middle: str, cms_middle: str) -> int:
+    """
+    How well a CMS middle name supports a reading: 2 when every CMS middle
+    token (or initial) is among the reading's middle tokens, 1 when either
+    side has no middle name, 0 when they disagree.
+    """
+    if not cms_middle or not profile_middle:
+        return 1
+    profile_tokens = profile_middle.split()
+    initials = {token[0] for token in profile_tokens}
+    for token in cms_middle.replace('.', ' ').split():
+        if token not in profile_tokens and not (len(token) == 1 and token in initials):
+            return 0
+    return 2
+
+
+class _SubstringIndex:
+    """
+    Trigram inverted index over the distinct values of one name column.
+
+    ``rows_containing(text)`` intersects the posting lists of the trigrams of
+    ``text`` to get candidate values, verifies them with a real substring
+    check and returns the CMS row positions holding any matching value.
+    Queries shorter than three characters scan the (small) vocabulary.
+    """
+
+    def __init__(self, values: pd.Series):
+        groups = pd.Series(np.arange(len(values))).groupby(values.to_numpy(), sort=False).indices
+        groups.pop('', None)
+        self.vocabulary: List[str] = list(groups)
+        self._value_rows: List[np.ndarray] = [groups[value] for value in self.vocabulary]
+
+        postings: Dict[str, List[int]] = {}
+        for value_id, value in enumerate(self.vocabulary):
+            for trigram in {value[i:i + 3] for i in range(len(value) - 2)}:
+                postings.setdefault(trigram, []).append(value_id)
+        self._postings = {trigram: np.asarray(ids, dtype=np.int64) for trigram, ids in postings.items()}
+
+    def value_ids_containing(self, text: str) -> List[int]:
+        if len(text) < 3:
+            return [i for i, value in enumerate(self.vocabulary) if text in value]
+
+        trigram_lists = []
+        for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            ids = self._postings.get(trigram)
+            if ids is None:
+                return []
+            trigram_lists.append(ids)
+
+        trigram_lists.sort(key=len)
+        candidates = trigram_lists[0]
+        for ids in trigram_lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                return []
+        return [int(i) for i in candidates if text in self.vocabulary[i]]
+
+    def rows_containing(self, text: str) -> np.ndarray:
+        value_ids = self.value_ids_containing(text)
+        if not value_ids:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self._value_rows[i] for i in value_ids])
+
+
+class NameIndex:
+    """
+    First/last name lookups over the CMS rows.
+
+    Names are normalized once (strip + uppercase). Exact matches are a dict
+    lookup on (FIRST, LAST) and ``names`` holds the normalized columns for
+    columnar joins; "contains" matches use one trigram index per
+    column and intersect the resulting row sets. Row positions are returned
+    in file order, like filtering the DataFrame would.
+
+    ``decomposed`` probes the same dict (and one on (first middle name,
+    LAST), for people known by their middle name) with every reading of a
+    multi-token profile name, so those names are found without a substring
+    scan.
+    """
+
+    def __init__(
+        self,
+        cms_df: pd.DataFrame,
+        first_col: str = FILTER_COLUMNS['first_name'],
+        last_col: str = FILTER_COLUMNS['last_name'],
+    ):
+        first_names, last_names = name_keys(cms_df, first_col, last_col)
+        if MIDDLE_NAME_COLUMN in cms_df.columns:
+            middle_names = normalize_name_series(cms_df[MIDDLE_NAME_COLUMN])
+        else:
+            middle_names = pd.Series('', index=cms_df.index)
+
+        self.names = pd.DataFrame({'first': first_names.to_numpy(), 'last': last_names.to_numpy()})
+        self.middle_names = middle_names.to_numpy(dtype=object)
+
+        positions = pd.Series(np.arange(len(cms_df)))
+        self._exact: Dict[tuple, np.ndarray] = positions.groupby(
+            [first_names.to_numpy(), last_names.to_numpy()], sort=False
+        ).indices
+        first_middle = middle_names.str.split(n=1).str[0].fillna('')
+        has_middle = (first_middle != '').to_numpy()
+        self._by_middle: Dict[tuple, np.ndarray] = (
+            positions[has_middle].groupby(
+                [first_middle.to_numpy()[has_middle], last_names.to_numpy()[has_middle]], sort=False
+            ).indices
+            if has_middle.any() else {}
+        )
+        self._first = _SubstringIndex(first_names)
+        self._last = _SubstringIndex(last_names)
+
+    def exact(self, first_name: str, last_name: str) -> List[int]:
+        """Rows whose normalized first and last names equal the given ones."""
+        if not first_name or not last_name:
+            return []
+        rows = self._exact.get((first_name, last_name))
+        return rows.tolist() if rows is not None else []
+
+    def contains(self, first_name: str, last_name: str) -> List[int]:
+        """Rows whose first name contains ``first_name`` and last name contains ``last_name``."""
+        if not first_name or not last_name:
+            return []
+        first_rows = self._first.rows_containing(first_name)
+        if len(first_rows) == 0:
+            return []
+        last_rows = self._last.rows_containing(last_name)
+        return np.intersect1d(first_rows, last_rows).tolist()
+
+    def decomposed(self, first_name: str, last_name: str) -> List[Tuple[int, int]]:
+        """
+        Rows matching a reading of a multi-token name (name_interpretations),
+        as (row, order) ranked by ``order``: the reading's plausibility, then
+        how well the CMS middle name agrees with it, then file order.
+        Readings with the profile's first name as the CMS first middle name
+        come last.
+        """
+        readings = name_interpretations(first_name, last_name)
+        if not readings:
+            return []
+        best: Dict[int, int] = {}
+        for rank, (first, middle, last) in enumerate(readings):
+            rows = self._exact.get((first, last))
+            if rows is None:
+                continue
+            for row in rows.tolist():
+                order = rank * 3 + 2 - middle_name_agreement(middle, self.middle_names[row])
+                if order < best.get(row, order + 1):
+                    best[row] = order
+        # Known by the middle name: 'MARIE' + 'JONES' is MARY MARIE JONES
+        offset = len(readings) * 3
+        for rank, last in enumerate(dict.fromkeys([last_name] + [reading[2] for reading in readings])):
+            rows = self._by_middle.get((first_name.split()[0], last))
+            if rows is None:
+                continue
+            for row in rows.tolist():
+                best.setdefault(row, offset + rank)
+        return sorted(best.items(), key=lambda item: (item[1], item[0]))
+
+    def match(self, first_name: str, last_name: str) -> List[int]:
+        """
+        Exact matches if there are any, then the readings of a multi-token
+        name (``decomposed``), otherwise "contains" matches.
+        """
+        return (
+            self.exact(first_name, last_name)
+            or [row for row, _ in self.decomposed(first_name, last_name)]
+            or self.contains(first_name, last_name)
+        )
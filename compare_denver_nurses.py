@@ -4,109 +4,41 @@ Script to compare Denver nurses from JSON with CMS data.csv database (9.2M recor
 Uses streaming approach - processes chunks and matches on-the-fly without loading everything into memory.
 """
 
-import json
+import argparse
+import itertools
+import os
 import sys
+import numpy as np
 import pandas as pd
-import re
 import time
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Optional
+
+from cms_index import extract_phone_numbers, normalize_license, normalize_name
+from checkpoint import clear_checkpoint, load_checkpoint, save_checkpoint, skip_records
+from match_engine import (
+    MatchConfig,
+    MatchEngine,
+    ProfileKeys,
+    extract_cms_records,
+    matches_frame,
+    no_matches_frame,
+    write_enriched_profiles,
+)
+from metrics import METRICS_FORMATS, NULL_METRICS, PipelineMetrics
+from parquet_cache import find_fresh_cache, iter_cache_chunks
+from profile_stream import MATCH_FIELDS, PROFILE_FORMATS, iter_profiles, load_profiles
+
+CHECKPOINT_FILE = 'denver_matches.checkpoint.json'
 
 def load_denver_nurses(json_file: str) -> List[Dict[str, Any]]:
-    """Load Denver nurses from JSON file."""
+    """Load Denver nurses (JSON array or JSON Lines) with only the matching fields."""
     print(f"📂 Loading {json_file}...")
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Streamed one profile at a time, keeping only the fields used for matching
+    # (the PDL payloads are dropped as they are read)
+    data = load_profiles(json_file, MATCH_FIELDS)
     print(f"✅ {len(data)} Denver nurses loaded\n")
     return data
 
-def normalize_name(name: str) -> str:
-    """Normalize a name for comparison."""
-    if pd.isna(name) or name == '':
-        return ''
-    return str(name).strip().upper()
-
-def normalize_license(license_num: str) -> str:
-    """Normalize a license number for comparison."""
-    if pd.isna(license_num) or license_num == '':
-        return ''
-    license_str = str(license_num).strip().upper()
-    license_str = re.sub(r'^(RN|LP|PN|TEMP)', '', license_str)
-    return license_str
-
-def extract_phone_numbers(pdl_data: Optional[Dict]) -> List[str]:
-    """Extract phone numbers from People Data Labs data."""
-    if not pdl_data or 'phone_numbers' not in pdl_data:
-        return []
-    
-    phones = []
-    for phone in pdl_data.get('phone_numbers', []):
-        if phone:
-            phone_clean = re.sub(r'\D', '', str(phone))
-            if len(phone_clean) >= 10:
-                phones.append(phone_clean[-10:])
-    return phones
-
-def normalize_phone(phone: Any) -> str:
-    """Normalize a phone number to last 10 digits."""
-    if pd.isna(phone) or phone == '':
-        return ''
-    phone_str = re.sub(r'\D', '', str(phone))
-    if len(phone_str) >= 10:
-        return phone_str[-10:]
-    return ''
-
-def extract_cms_data(cms_row: pd.Series) -> Dict[str, Any]:
-    """Extract relevant CMS data from a matched row."""
-    license_numbers = []
-    license_states = []
-    
-    for i in range(1, 16):
-        lic_num = cms_row.get(f'Provider License Number_{i}')
-        lic_state = cms_row.get(f'Provider License Number State Code_{i}')
-        
-        if pd.notna(lic_num) and str(lic_num).strip():
-            license_numbers.append(str(lic_num))
-            if pd.notna(lic_state):
-                license_states.append(str(lic_state))
-    
-    practice_addr_parts = []
-    addr1 = cms_row.get('Provider First Line Business Practice Location Address')
-    addr2 = cms_row.get('Provider Second Line Business Practice Location Address')
-    city = cms_row.get('Provider Business Practice Location Address City Name')
-    state = cms_row.get('Provider Business Practice Location Address State Name')
-    zip_code = cms_row.get('Provider Business Practice Location Address Postal Code')
-    
-    if pd.notna(addr1):
-        practice_addr_parts.append(str(addr1))
-    if pd.notna(addr2):
-        practice_addr_parts.append(str(addr2))
-    
-    city_state_zip = []
-    if pd.notna(city):
-        city_state_zip.append(str(city))
-    if pd.notna(state):
-        city_state_zip.append(str(state))
-    if pd.notna(zip_code):
-        city_state_zip.append(str(zip_code))
-    
-    if city_state_zip:
-        practice_addr_parts.append(', '.join(city_state_zip))
-    
-    practice_address = ', '.join(practice_addr_parts) if practice_addr_parts else ''
-    
-    return {
-        'npi': str(cms_row.get('NPI', '')) if pd.notna(cms_row.get('NPI')) else '',
-        'full_name': f"{cms_row.get('Provider First Name', '')} {cms_row.get('Provider Last Name (Legal Name)', '')}".strip(),
-        'credential': str(cms_row.get('Provider Credential Text', '')) if pd.notna(cms_row.get('Provider Credential Text')) else '',
-        'practice_address': practice_address,
-        'practice_phone': str(cms_row.get('Provider Business Practice Location Address Telephone Number', '')) if pd.notna(cms_row.get('Provider Business Practice Location Address Telephone Number')) else '',
-        'mailing_phone': str(cms_row.get('Provider Business Mailing Address Telephone Number', '')) if pd.notna(cms_row.get('Provider Business Mailing Address Telephone Number')) else '',
-        'license_numbers': license_numbers,
-        'license_states': license_states,
-        'enumeration_date': str(cms_row.get('Provider Enumeration Date', '')) if pd.notna(cms_row.get('Provider Enumeration Date')) else '',
-        'last_update_date': str(cms_row.get('Last Update Date', '')) if pd.notna(cms_row.get('Last Update Date')) else ''
-    }
-
 def prepare_denver_nurse_data(nurse: Dict) -> Dict:
     """Prepare Denver nurse search data."""
     # Get license numbers to search
@@ -147,103 +79,130 @@ def prepare_denver_nurse_data(nurse: Dict) -> Dict:
         'cms_data': None
     }
 
-def match_chunk_against_nurses(chunk: pd.DataFrame, denver_data: List[Dict], license_cols: List[str]) -> int:
-    """Match a chunk of CMS data against Denver nurses. Returns number of new matches found."""
-    matches_found = 0
-    
-    for idx, row in chunk.iterrows():
-        # Check licenses first (CONFIRMED matches)
-        for nurse in denver_data:
-            if nurse['match_found']:
-                continue
-            
-            for normalized_lic, original_lic in nurse['licenses_to_search']:
-                for col in license_cols:
-                    if col in row and pd.notna(row[col]):
-                        if normalize_license(row[col]) == normalized_lic:
-                            nurse['match_found'] = True
-                            nurse['match_confidence'] = 'CONFIRMED'
-                            nurse['match_method'] = f'LICENSE:{original_lic}'
-                            nurse['cms_data'] = extract_cms_data(row)
-                            matches_found += 1
-                            break
-                if nurse['match_found']:
-                    break
-            if nurse['match_found']:
-                continue
-        
-        # Check names (HIGH/MEDIUM matches)
-        first_name = normalize_name(row.get('Provider First Name', ''))
-        last_name = normalize_name(row.get('Provider Last Name (Legal Name)', ''))
-        
-        if not first_name or not last_name:
-            continue
-        
-        for nurse in denver_data:
-            if nurse['match_found']:
-                continue
-            
-            if nurse['first_name'] == first_name and nurse['last_name'] == last_name:
-                # Try contact validation if we have PDL data
-                if nurse['has_pdl_data'] and nurse['pdl_phones']:
-                    cms_phones = []
-                    practice_phone = normalize_phone(row.get('Provider Business Practice Location Address Telephone Number'))
-                    mailing_phone = normalize_phone(row.get('Provider Business Mailing Address Telephone Number'))
-                    
-                    if practice_phone:
-                        cms_phones.append(practice_phone)
-                    if mailing_phone and mailing_phone != practice_phone:
-                        cms_phones.append(mailing_phone)
-                    
-                    # Check if any PDL phone matches
-                    contact_match = any(pdl_phone in cms_phones for pdl_phone in nurse['pdl_phones'])
-                    
-                    if contact_match:
-                        nurse['match_found'] = True
-                        nurse['match_confidence'] = 'HIGH'
-                        nurse['match_method'] = 'NAME+CONTACT'
-                        nurse['cms_data'] = extract_cms_data(row)
-                        matches_found += 1
-                        continue
-                
-                # Name only match
-                nurse['match_found'] = True
-                nurse['match_confidence'] = 'MEDIUM'
-                nurse['match_method'] = 'NAME_ONLY'
-                nurse['cms_data'] = extract_cms_data(row)
-                matches_found += 1
-    
-    return matches_found
+def match_chunk_against_nurses(chunk: pd.DataFrame, denver_data: List[Dict], keys: ProfileKeys) -> int:
+    """
+    Match a chunk of CMS data against Denver nurses. Returns number of new matches found.
+    
+    Runs the match engine with the ``denver`` preset on the nurses that are
+    still unmatched: the first row of the chunk that matches a nurse wins,
+    with the license (CONFIRMED) check before the name (HIGH/MEDIUM) check
+    on that row.
+    
+    Args:
+        keys: Match keys of all Denver nurses (ProfileKeys.build), in the order of ``denver_data``
+    """
+    unmatched = np.flatnonzero([not nurse['match_found'] for nurse in denver_data])
+    if len(unmatched) == 0:
+        return 0
+    
+    resolved = MatchEngine(chunk, MatchConfig.preset('denver')).resolve(keys.subset(unmatched))
+    if resolved.empty:
+        return 0
+    
+    cms_records = extract_cms_records(chunk, resolved['row'].to_numpy())
+    for i, confidence, method, cms_data in zip(
+        resolved.index.tolist(), resolved['confidence'].tolist(), resolved['method'].tolist(), cms_records
+    ):
+        nurse = denver_data[i]
+        nurse['match_found'] = True
+        nurse['match_confidence'] = confidence
+        nurse['match_method'] = method
+        nurse['cms_data'] = cms_data
+    
+    return len(resolved)
+
+def read_csv_chunks(csv_file: str, chunk_size: int, skip_rows: int = 0) -> Iterator[Tuple[pd.DataFrame, int]]:
+    """(chunk, input bytes it consumed) pairs, read through our own file handle."""
+    with open(csv_file, 'rb') as source:
+        offset = 0
+        for chunk in pd.read_csv(source, chunksize=chunk_size, low_memory=False, skiprows=skip_records(skip_rows)):
+            yield chunk, source.tell() - offset
+            offset = source.tell()
 
-def find_matches_streaming(denver_nurses: List[Dict], csv_file: str, chunk_size: int = 50000) -> Tuple[List[Dict], List[Dict]]:
+def find_matches_streaming(
+    denver_nurses: List[Dict],
+    csv_file: str,
+    chunk_size: int = 50000,
+    checkpoint_file: Optional[str] = None,
+    resume: bool = False,
+    metrics: PipelineMetrics = NULL_METRICS,
+) -> Tuple[List[Dict], List[Dict]]:
     """
     Find matches using streaming approach - processes chunks without storing in memory.
+    
+    With ``checkpoint_file``, the match state is checkpointed after every
+    chunk; ``resume=True`` continues from the last committed chunk.
+    ``metrics`` records per-chunk read/match/checkpoint timings and, from
+    the CSV, the input bytes of each chunk (Parquet chunks have none).
     """
     print("🔍 Preparing Denver nurses data for matching...\n")
     denver_data = [prepare_denver_nurse_data(nurse) for nurse in denver_nurses]
-    
-    license_cols = [f'Provider License Number_{i}' for i in range(1, 16)]
+    keys = ProfileKeys.build(denver_nurses, MatchConfig.preset('denver').adapter)
     
     print("📊 Processing data.csv in streaming mode...")
     print("   (Memory-efficient: processes and discards each chunk)\n")
     
-    start_time = time.time()
+    # Read from the Parquet cache (only the needed columns) when it is fresh
+    cache_dir = find_fresh_cache(csv_file)
+    settings = {
+        'source': 'cache' if cache_dir else 'csv',
+        'chunk_size': chunk_size,
+        'nurses': [n['fb_id'] for n in denver_data],
+    }
+    
     total_rows = 0
     chunk_num = 0
     total_matches = 0
+    progress = load_checkpoint(checkpoint_file, csv_file, settings) if resume and checkpoint_file else None
+    if progress is not None:
+        denver_data = progress['denver_data']
+        total_rows = progress['total_rows']
+        chunk_num = progress['chunks']
+        total_matches = progress['total_matches']
+        print(f"♻️  Resuming after chunk {chunk_num:,} ({total_rows:,} rows, {total_matches} matches)\n")
+    elif resume:
+        print("⚠️  No checkpoint found; starting from the beginning.\n")
+    
+    if cache_dir:
+        print(f"⚡ Using Parquet cache: {cache_dir}\n")
+        cache_chunks = itertools.islice(iter_cache_chunks(cache_dir, chunk_size=chunk_size), chunk_num, None)
+        chunks = ((chunk, None) for chunk in cache_chunks)
+    else:
+        # Malformed lines raise here, so the rows read are the records consumed
+        chunks = read_csv_chunks(csv_file, chunk_size, total_rows)
+    
+    start_time = time.time()
+    start_rows = total_rows
     
-    for chunk in pd.read_csv(csv_file, chunksize=chunk_size, low_memory=False):
+    while True:
+        metrics.start_chunk()
+        with metrics.stage('read'):
+            chunk, chunk_bytes = next(chunks, (None, None))
+        if chunk is None:
+            break
+        
         chunk_num += 1
         total_rows += len(chunk)
         
         # Match this chunk against Denver nurses
-        new_matches = match_chunk_against_nurses(chunk, denver_data, license_cols)
+        with metrics.stage('match'):
+            new_matches = match_chunk_against_nurses(chunk, denver_data, keys)
         total_matches += new_matches
         
+        if checkpoint_file:
+            with metrics.stage('checkpoint'):
+                save_checkpoint(checkpoint_file, csv_file, settings, {
+                    'chunks': chunk_num,
+                    'total_rows': total_rows,
+                    'total_matches': total_matches,
+                    'denver_data': denver_data,
+                })
+        metrics.end_chunk(len(chunk), new_matches, chunk_bytes)
+        
         # Progress report
         if chunk_num % 10 == 0:
             elapsed = time.time() - start_time
-            rate = total_rows / elapsed
+            rate = (total_rows - start_rows) / elapsed
             still_searching = sum(1 for n in denver_data if not n['match_found'])
             print(f"  Chunk {chunk_num}: {total_rows:,} rows | {rate:,.0f} rows/sec | Matches: {total_matches} | Still searching: {still_searching} | Elapsed: {elapsed:.1f}s")
         
@@ -252,6 +211,9 @@ def find_matches_streaming(denver_nurses: List[Dict], csv_file: str, chunk_size:
             print(f"\n🎉 All Denver nurses matched! Stopping early at row {total_rows:,}")
             break
     
+    if checkpoint_file:
+        clear_checkpoint(checkpoint_file)
+    
     elapsed = time.time() - start_time
     print(f"\n✅ Processing complete!")
     print(f"  Total rows processed: {total_rows:,}")
@@ -269,97 +231,37 @@ def save_csv_results(matches: List[Dict], no_matches: List[Dict]):
     print(f"💾 Saving CSV results...")
     
     if matches:
-        matches_data = []
-        for match in matches:
-            row = {
-                'Facebook ID': match['fb_id'],
-                'Facebook Name': match['fb_name'],
-                'Profile URL': match['fb_profile_url'],
-                'City': match['city'],
-                'State': match['state'],
-                'Match Confidence': match['match_confidence'],
-                'Match Method': match['match_method'],
-                'Has Nursys Licenses': match['has_nursys_licenses'],
-                'Has PDL Data': match['has_pdl_data']
-            }
-            
-            if match['cms_data']:
-                row.update({
-                    'CMS NPI': match['cms_data']['npi'],
-                    'CMS Full Name': match['cms_data']['full_name'],
-                    'CMS Credential': match['cms_data']['credential'],
-                    'CMS Practice Address': match['cms_data']['practice_address'],
-                    'CMS Practice Phone': match['cms_data']['practice_phone'],
-                    'CMS Mailing Phone': match['cms_data']['mailing_phone'],
-                    'CMS License Numbers': ', '.join(match['cms_data']['license_numbers']),
-                    'CMS License States': ', '.join(match['cms_data']['license_states']),
-                    'CMS Enumeration Date': match['cms_data']['enumeration_date'],
-                    'CMS Last Update Date': match['cms_data']['last_update_date']
-                })
-            
-            matches_data.append(row)
-        
-        matches_df = pd.DataFrame(matches_data)
-        matches_df.to_csv('denver_matches.csv', index=False)
+        matches_frame(matches).to_csv('denver_matches.csv', index=False)
         print(f"  ✅ denver_matches.csv ({len(matches)} records)")
     
     if no_matches:
-        no_matches_data = []
-        for nm in no_matches:
-            no_matches_data.append({
-                'Facebook ID': nm['fb_id'],
-                'Facebook Name': nm['fb_name'],
-                'Profile URL': nm['fb_profile_url'],
-                'City': nm['city'],
-                'State': nm['state'],
-                'Has Nursys Licenses': nm['has_nursys_licenses'],
-                'Has PDL Data': nm['has_pdl_data']
-            })
-        
-        no_matches_df = pd.DataFrame(no_matches_data)
-        no_matches_df.to_csv('denver_no_matches.csv', index=False)
+        no_matches_frame(no_matches).to_csv('denver_no_matches.csv', index=False)
         print(f"  ✅ denver_no_matches.csv ({len(no_matches)} records)")
 
-def enrich_json(denver_nurses: List[Dict], matches: List[Dict]) -> List[Dict]:
-    """Enrich the original JSON with CMS match data."""
-    print(f"\n🔧 Enriching JSON with CMS data...")
-    
-    match_lookup = {m['fb_id']: m for m in matches}
-    
-    enriched_nurses = []
-    for nurse in denver_nurses:
-        enriched_nurse = nurse.copy()
-        fb_id = nurse.get('id', '')
-        
-        if fb_id in match_lookup:
-            match = match_lookup[fb_id]
-            enriched_nurse['cmsMatch'] = {
-                'found': True,
-                'confidence': match['match_confidence'],
-                'matchMethod': match['match_method'],
-                'npi': match['cms_data']['npi'] if match['cms_data'] else '',
-                'fullName': match['cms_data']['full_name'] if match['cms_data'] else '',
-                'credential': match['cms_data']['credential'] if match['cms_data'] else '',
-                'practiceAddress': match['cms_data']['practice_address'] if match['cms_data'] else '',
-                'practicePhone': match['cms_data']['practice_phone'] if match['cms_data'] else '',
-                'mailingPhone': match['cms_data']['mailing_phone'] if match['cms_data'] else '',
-                'licenseNumbers': match['cms_data']['license_numbers'] if match['cms_data'] else [],
-                'licenseStates': match['cms_data']['license_states'] if match['cms_data'] else [],
-                'enumerationDate': match['cms_data']['enumeration_date'] if match['cms_data'] else '',
-                'lastUpdateDate': match['cms_data']['last_update_date'] if match['cms_data'] else ''
-            }
-        else:
-            enriched_nurse['cmsMatch'] = {
-                'found': False
-            }
-        
-        enriched_nurses.append(enriched_nurse)
+def enrich_json(
+    denver_nurses: Iterable[Dict],
+    matches: List[Dict],
+    output_file: str = 'denver_nurses_enriched.json',
+    fmt: str = 'json',
+    drop_pdl: bool = False,
+) -> int:
+    """
+    Enrich the original profiles with CMS match data, writing one profile at a time.
     
-    with open('denver_nurses_enriched.json', 'w', encoding='utf-8') as f:
-        json.dump(enriched_nurses, f, indent=2, ensure_ascii=False)
+    Args:
+        denver_nurses: Full profiles (e.g. streamed with iter_profiles)
+        matches: Match records from the matcher
+        output_file: Enriched output file
+        fmt: 'json' (pretty-printed array, as before) or 'jsonl' (compact JSON Lines)
+        drop_pdl: Drop the heavy PDL subtrees (HEAVY_PDL_FIELDS) from the output
     
-    print(f"  ✅ denver_nurses_enriched.json saved")
-    return enriched_nurses
+    Returns:
+        Number of profiles written
+    """
+    print(f"\n🔧 Enriching JSON with CMS data...")
+    count = write_enriched_profiles(denver_nurses, matches, output_file, fmt, drop_pdl)
+    print(f"  ✅ {output_file} saved")
+    return count
 
 def display_statistics(matches: List[Dict], no_matches: List[Dict], total: int, elapsed_time: float):
     """Display comprehensive statistics."""
@@ -416,15 +318,55 @@ def display_statistics(matches: List[Dict], no_matches: List[Dict], total: int,
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description='Compare Denver nurses with the CMS data.csv database.')
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help=f'Continue an interrupted run from its last checkpoint ({CHECKPOINT_FILE})'
+    )
+    parser.add_argument(
+        '--metrics',
+        metavar='PATH',
+        help='Write per-chunk read/match timings to PATH (JSON lines, or Prometheus text for .prom/.txt)'
+    )
+    parser.add_argument('--metrics-format', choices=METRICS_FORMATS, help='Format of --metrics')
+    parser.add_argument(
+        '--enriched-format',
+        choices=PROFILE_FORMATS,
+        default='json',
+        help='Enriched output: pretty-printed JSON array (default) or compact JSON Lines (.jsonl)'
+    )
+    parser.add_argument(
+        '--drop-pdl',
+        action='store_true',
+        help='Leave the heavy PDL subtrees (experience, education, skills, interests) out of the enriched output'
+    )
+    args = parser.parse_args()
+    
     denver_json = 'denver.json'
     cms_csv = 'data.csv'
     
     overall_start = time.time()
     
     denver_nurses = load_denver_nurses(denver_json)
-    matches, no_matches = find_matches_streaming(denver_nurses, cms_csv)
+    metrics = PipelineMetrics.open(args.metrics, 'denver_streaming', args.metrics_format)
+    try:
+        matches, no_matches = find_matches_streaming(
+            denver_nurses, cms_csv, checkpoint_file=CHECKPOINT_FILE, resume=args.resume, metrics=metrics
+        )
+    finally:
+        metrics.close()
+    if metrics.enabled:
+        print(f"📈 Metrics saved to: {args.metrics}\n")
     save_csv_results(matches, no_matches)
-    enrich_json(denver_nurses, matches)
+    # The full profiles are streamed again: the loaded ones are projected
+    enrich_json(
+        iter_profiles(denver_json),
+        matches,
+        output_file=f'denver_nurses_enriched.{args.enriched_format}',
+        fmt=args.enriched_format,
+        drop_pdl=args.drop_pdl,
+    )
     
     overall_elapsed = time.time() - overall_start
     display_statistics(matches, no_matches, len(denver_nurses), overall_elapsed)
@@ -436,6 +378,8 @@ if __name__ == '__main__':
         main()
     except KeyboardInterrupt:
         print("\n\n👋 Program interrupted. Goodbye!\n")
+        if os.path.exists(CHECKPOINT_FILE):
+            print("💾 Progress was checkpointed; run again with --resume to continue.\n")
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ Error: {e}")
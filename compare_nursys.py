@@ -4,16 +4,19 @@ Script para comparar dados do nursys.json com o CSV de nurses.
 Encontra matches baseado em nome, sobrenome e número de licença.
 """
 
-import json
 import sys
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from cms_index import NameIndex, normalize_name
+from match_engine import MatchConfig, MatchEngine, ProfileKeys
+from profile_stream import NURSYS_FIELDS, load_profiles
 
 def load_nursys_data(json_file: str) -> List[Dict[str, Any]]:
-    """Carrega dados do arquivo JSON do Nursys."""
+    """Carrega o JSON do Nursys (array ou JSON Lines) só com os campos usados no match."""
     print(f"📂 Carregando {json_file}...")
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Lido em streaming, guardando só os campos usados no match
+    data = load_profiles(json_file, NURSYS_FIELDS)
     print(f"✅ {len(data)} registros carregados do JSON\n")
     return data
 
@@ -24,139 +27,96 @@ def load_nurses_csv(csv_file: str) -> pd.DataFrame:
     print(f"✅ {len(df):,} registros carregados do CSV\n")
     return df
 
-def normalize_name(name: str) -> str:
-    """Normaliza um nome para comparação."""
-    if pd.isna(name) or name == '':
-        return ''
-    return str(name).strip().upper()
+def _csv_fields(nurses_df: pd.DataFrame, row: int) -> Dict[str, Any]:
+    """NPI e nome completo de uma linha do CSV."""
+    return {
+        'csv_npi': nurses_df['NPI'].to_numpy()[row],
+        'csv_full_name': f"{nurses_df['Provider First Name'].iat[row]} {nurses_df['Provider Last Name (Legal Name)'].iat[row]}",
+    }
 
-def find_matches(nursys_data: List[Dict], nurses_df: pd.DataFrame) -> List[Dict]:
+def find_matches(
+    nursys_data: List[Dict],
+    nurses_df: pd.DataFrame,
+    name_index: Optional[NameIndex] = None,
+) -> List[Dict]:
     """
     Encontra matches entre os dados do Nursys e o CSV de nurses.
     
     Critérios de match:
     1. Nome + Sobrenome
     2. Número de licença (se disponível no Nursys)
+    
+    Usa o motor de match (match_engine.py) com o preset ``nursys``: os
+    candidatos por nome saem do índice de nomes, construído uma vez (ou
+    recebido pronto), e a licença é confirmada em todos eles de uma vez.
     """
     matches = []
     no_matches = []
     
+    if name_index is None:
+        print("🔍 Construindo índice de nomes...")
+        name_index = NameIndex(nurses_df)
+    
     print("🔍 Procurando matches...\n")
     
-    for idx, person in enumerate(nursys_data, 1):
+    config = MatchConfig.preset('nursys')
+    keys = ProfileKeys.build(nursys_data, config.adapter)
+    resolved = MatchEngine(nurses_df, config, name_index=name_index).resolve(keys)
+    
+    for pos, person in enumerate(nursys_data):
         first_name = normalize_name(person.get('firstName', ''))
         last_name = normalize_name(person.get('lastName', ''))
-        state = person.get('state', '')
-        city = person.get('city', '')
-        profile_url = person.get('profileUrl', '')
         
         # Pular se não tiver nome
         if not first_name or not last_name:
             continue
         
-        # Buscar por nome no CSV
-        name_matches = nurses_df[
-            (nurses_df['Provider First Name'].str.upper().str.contains(first_name, na=False)) &
-            (nurses_df['Provider Last Name (Legal Name)'].str.upper().str.contains(last_name, na=False))
-        ]
+        record = {
+            'facebook_name': person.get('name', ''),
+            'firstName': first_name,
+            'lastName': last_name,
+            'city': person.get('city', ''),
+            'state': person.get('state', ''),
+            'profileUrl': person.get('profileUrl', ''),
+        }
+        nursys_licenses = config.adapter.license_entries(person)
         
-        # Se encontrou matches por nome
-        if len(name_matches) > 0:
-            # Verificar se tem licenças no Nursys para confirmar
-            nursys_licenses = person.get('nursys', {}).get('individuals', [])
-            
-            if len(nursys_licenses) > 0:
-                # Tem licenças no Nursys, tentar match por licença
-                license_confirmed = False
-                
-                for license_info in nursys_licenses:
-                    license_number = str(license_info.get('licenseNumber', '')).strip()
-                    license_state = license_info.get('state', '')
-                    license_type = license_info.get('licenseType', '')
-                    
-                    if license_number:
-                        # Buscar número de licença nas 15 colunas possíveis
-                        license_cols = [f'Provider License Number_{i}' for i in range(1, 16)]
-                        
-                        for col in license_cols:
-                            if col in name_matches.columns:
-                                license_match = name_matches[
-                                    name_matches[col].astype(str).str.contains(license_number, na=False, regex=False)
-                                ]
-                                
-                                if len(license_match) > 0:
-                                    license_confirmed = True
-                                    matches.append({
-                                        'facebook_name': person.get('name', ''),
-                                        'firstName': first_name,
-                                        'lastName': last_name,
-                                        'city': city,
-                                        'state': state,
-                                        'profileUrl': profile_url,
-                                        'match_type': 'NAME + LICENSE',
-                                        'license_number': license_number,
-                                        'license_state': license_state,
-                                        'license_type': license_type,
-                                        'csv_matches': len(license_match),
-                                        'csv_npi': license_match.iloc[0]['NPI'] if len(license_match) > 0 else None,
-                                        'csv_full_name': f"{license_match.iloc[0]['Provider First Name']} {license_match.iloc[0]['Provider Last Name (Legal Name)']}" if len(license_match) > 0 else None
-                                    })
-                                    break
-                        
-                        if license_confirmed:
-                            break
-                
-                # Se não confirmou por licença mas tem match de nome
-                if not license_confirmed:
-                    matches.append({
-                        'facebook_name': person.get('name', ''),
-                        'firstName': first_name,
-                        'lastName': last_name,
-                        'city': city,
-                        'state': state,
-                        'profileUrl': profile_url,
-                        'match_type': 'NAME ONLY (has Nursys license but not found in CSV)',
-                        'license_number': nursys_licenses[0].get('licenseNumber', '') if nursys_licenses else '',
-                        'license_state': nursys_licenses[0].get('state', '') if nursys_licenses else '',
-                        'license_type': nursys_licenses[0].get('licenseType', '') if nursys_licenses else '',
-                        'csv_matches': len(name_matches),
-                        'csv_npi': name_matches.iloc[0]['NPI'] if len(name_matches) > 0 else None,
-                        'csv_full_name': f"{name_matches.iloc[0]['Provider First Name']} {name_matches.iloc[0]['Provider Last Name (Legal Name)']}" if len(name_matches) > 0 else None
-                    })
-            else:
-                # Não tem licenças no Nursys, match apenas por nome
-                matches.append({
-                    'facebook_name': person.get('name', ''),
-                    'firstName': first_name,
-                    'lastName': last_name,
-                    'city': city,
-                    'state': state,
-                    'profileUrl': profile_url,
-                    'match_type': 'NAME ONLY (no Nursys license)',
-                    'license_number': '',
-                    'license_state': '',
-                    'license_type': '',
-                    'csv_matches': len(name_matches),
-                    'csv_npi': name_matches.iloc[0]['NPI'] if len(name_matches) > 0 else None,
-                    'csv_full_name': f"{name_matches.iloc[0]['Provider First Name']} {name_matches.iloc[0]['Provider Last Name (Legal Name)']}" if len(name_matches) > 0 else None
-                })
-        else:
+        if pos not in resolved.index:
             # Não encontrou match
-            nursys_licenses = person.get('nursys', {}).get('individuals', [])
-            no_matches.append({
-                'facebook_name': person.get('name', ''),
-                'firstName': first_name,
-                'lastName': last_name,
-                'city': city,
-                'state': state,
-                'profileUrl': profile_url,
-                'has_nursys_license': len(nursys_licenses) > 0,
-                'nursys_license_count': len(nursys_licenses)
-            })
+            record['has_nursys_license'] = len(nursys_licenses) > 0
+            record['nursys_license_count'] = len(nursys_licenses)
+            no_matches.append(record)
+            continue
         
-        # Progress
-        if idx % 10 == 0:
-            print(f"  Processados: {idx}/{len(nursys_data)} ({len(matches)} matches até agora)")
+        match = resolved.loc[pos]
+        if match['tier'] == 'name_license':
+            # Licença do Nursys encontrada numa das 15 colunas de um candidato
+            license_info = nursys_licenses[match['license_order']]
+            record.update({
+                'match_type': 'NAME + LICENSE',
+                'license_number': match['license'],
+                'license_state': license_info.get('state', ''),
+                'license_type': license_info.get('licenseType', ''),
+                'csv_matches': int(match['hits']),
+            })
+        elif nursys_licenses:
+            record.update({
+                'match_type': 'NAME ONLY (has Nursys license but not found in CSV)',
+                'license_number': nursys_licenses[0].get('licenseNumber', ''),
+                'license_state': nursys_licenses[0].get('state', ''),
+                'license_type': nursys_licenses[0].get('licenseType', ''),
+                'csv_matches': int(match['candidates']),
+            })
+        else:
+            record.update({
+                'match_type': 'NAME ONLY (no Nursys license)',
+                'license_number': '',
+                'license_state': '',
+                'license_type': '',
+                'csv_matches': int(match['candidates']),
+            })
+        record.update(_csv_fields(nurses_df, int(match['row'])))
+        matches.append(record)
     
     return matches, no_matches
 
@@ -58,6 +58,18 @@ NURSE_TAXONOMY_CODES = [
     '367H',  # Certified Nurse Midwife (CNM)
 ]
 
+# Human-readable description of each nurse taxonomy prefix
+NURSE_TAXONOMY_DESCRIPTIONS = {
+    '163W': 'Registered Nurse (RN)',
+    '164W': 'Licensed Practical Nurse (LPN)',
+    '164X': 'Licensed Vocational Nurse (LVN)',
+    '363L': 'Nurse Practitioner (NP/APRN)',
+    '364S': 'Clinical Nurse Specialist (CNS)',
+    '3675': 'Certified Registered Nurse Anesthetist (CRNA)',
+    '367A': 'Advanced Practice Midwife',
+    '367H': 'Certified Nurse Midwife (CNM)',
+}
+
 # Optional: Include nursing assistants and technicians (currently excluded)
 # Uncomment these if you want to include non-licensed nursing staff:
 # NURSING_SUPPORT_CODES = [
@@ -92,12 +104,55 @@ FILTER_COLUMNS = {
     'last_name': 'Provider Last Name (Legal Name)',
     'city': 'Provider Business Practice Location Address City Name',
     'state': 'Provider Business Practice Location Address State Name',
+    'postal_code': 'Provider Business Practice Location Address Postal Code',
+}
+
+# Middle name, used to rank decomposed multi-token profile names (cms_index.name_interpretations)
+MIDDLE_NAME_COLUMN = 'Provider Middle Name'
+
+# License columns (15 possible license number / license state pairs)
+LICENSE_NUMBER_COLUMNS = [f'Provider License Number_{i}' for i in range(1, 16)]
+LICENSE_STATE_COLUMNS = [f'Provider License Number State Code_{i}' for i in range(1, 16)]
+
+# Full state names (as scraped from Nursys/Facebook) -> two-letter codes used by CMS
+US_STATE_CODES = {
+    'ALABAMA': 'AL', 'ALASKA': 'AK', 'ARIZONA': 'AZ', 'ARKANSAS': 'AR', 'CALIFORNIA': 'CA',
+    'COLORADO': 'CO', 'CONNECTICUT': 'CT', 'DELAWARE': 'DE', 'DISTRICT OF COLUMBIA': 'DC',
+    'FLORIDA': 'FL', 'GEORGIA': 'GA', 'HAWAII': 'HI', 'IDAHO': 'ID', 'ILLINOIS': 'IL',
+    'INDIANA': 'IN', 'IOWA': 'IA', 'KANSAS': 'KS', 'KENTUCKY': 'KY', 'LOUISIANA': 'LA',
+    'MAINE': 'ME', 'MARYLAND': 'MD', 'MASSACHUSETTS': 'MA', 'MICHIGAN': 'MI', 'MINNESOTA': 'MN',
+    'MISSISSIPPI': 'MS', 'MISSOURI': 'MO', 'MONTANA': 'MT', 'NEBRASKA': 'NE', 'NEVADA': 'NV',
+    'NEW HAMPSHIRE': 'NH', 'NEW JERSEY': 'NJ', 'NEW MEXICO': 'NM', 'NEW YORK': 'NY',
+    'NORTH CAROLINA': 'NC', 'NORTH DAKOTA': 'ND', 'OHIO': 'OH', 'OKLAHOMA': 'OK', 'OREGON': 'OR',
+    'PENNSYLVANIA': 'PA', 'RHODE ISLAND': 'RI', 'SOUTH CAROLINA': 'SC', 'SOUTH DAKOTA': 'SD',
+    'TENNESSEE': 'TN', 'TEXAS': 'TX', 'UTAH': 'UT', 'VERMONT': 'VT', 'VIRGINIA': 'VA',
+    'WASHINGTON': 'WA', 'WEST VIRGINIA': 'WV', 'WISCONSIN': 'WI', 'WYOMING': 'WY',
+    'PUERTO RICO': 'PR', 'GUAM': 'GU', 'VIRGIN ISLANDS': 'VI',
 }
 
 # Phone number columns
 PHONE_MAILING_COLUMN = 'Provider Business Mailing Address Telephone Number'
 PHONE_PRACTICE_COLUMN = 'Provider Business Practice Location Address Telephone Number'
 
+# Normalized match-key columns added by `process_nurses.py --key-columns` (see
+# cms_index.match_key_columns). Licenses are the 15 slots in column order,
+# 'LICENSE:STATE' joined with '|' (trailing empty slots dropped); the name block
+# is 'LAST|F' (last name and first initial).
+KEY_FIRST_NAME_COLUMN = 'key_first_name'
+KEY_LAST_NAME_COLUMN = 'key_last_name'
+KEY_LICENSES_COLUMN = 'key_licenses'
+KEY_PRACTICE_PHONE_COLUMN = 'key_practice_phone'
+KEY_MAILING_PHONE_COLUMN = 'key_mailing_phone'
+KEY_NAME_BLOCK_COLUMN = 'key_name_block'
+MATCH_KEY_COLUMNS = [
+    KEY_FIRST_NAME_COLUMN,
+    KEY_LAST_NAME_COLUMN,
+    KEY_LICENSES_COLUMN,
+    KEY_PRACTICE_PHONE_COLUMN,
+    KEY_MAILING_PHONE_COLUMN,
+    KEY_NAME_BLOCK_COLUMN,
+]
+
 # Useful columns to keep in output (removes ~200+ useless columns)
 USEFUL_COLUMNS = [
     # Basic identification
@@ -189,3 +244,83 @@ USEFUL_COLUMNS = [
 DEFAULT_CHUNK_SIZE = 100000  # Process 100K rows at a time
 DEFAULT_OUTPUT_FILE = 'nurses_filtered.csv'
 
+# Parquet cache built by `process_nurses.py convert` (data.csv -> data.parquet/)
+PARQUET_CACHE_SUFFIX = '.parquet'
+
+# NPI-keyed SQLite store built by nurse_store.py (nurses.csv -> nurses.sqlite)
+NURSE_STORE_SUFFIX = '.sqlite'
+
+# Typed Arrow cache of a nurses CSV loaded by view_nurses.py (nurses.csv -> nurses.arrow)
+VIEW_CACHE_SUFFIX = '.arrow'
+
+
+# Default windows of view_nurses.py's recency filters (e.g. 90d, 6w, 3m, 1y)
+RECENT_UPDATE_WINDOW = '3m'
+RECENT_ENUMERATION_WINDOW = '1y'  # newly enumerated NPIs, e.g. new graduates
+
+# Cohort presets of match_engine.py. Each preset sets:
+# - adapter: JSON shape of the profiles ('facebook': nursys.licenses + PDL phones,
+#   'nursys': nursys.individuals)
+# - name_match: how names are matched ('exact', 'contains', or 'exact_or_contains',
+#   which tries exact first and falls back to contains)
+# - tiers: the match tiers, in priority order
+# - priority: 'tier' means the best tier wins; 'row' means the first CMS row with any hit
+#   wins (the streaming semantics)
+# - score_candidates: pick among several candidate rows by evidence (location, license
+#   state, credential, phone, PDL sex/education) instead of file order; needs 'tier'
+# - decompose_names: when the exact name misses, try the (first, middle, last) readings of
+#   multi-token names ('Ann Marie Barton' in lastName) before any substring match
+MATCH_PRESETS = {
+    'phoenix': {
+        'adapter': 'facebook',
+        'name_match': 'exact_or_contains',
+        'decompose_names': True,
+        'tiers': ['license', 'name_contact', 'name', 'phone', 'fuzzy_name'],
+        'priority': 'tier',
+        'score_candidates': True,
+    },
+    'denver': {
+        'adapter': 'facebook',
+        'name_match': 'exact',
+        'tiers': ['license', 'name_contact', 'name'],
+        'priority': 'row',
+    },
+    'nursys': {
+        'adapter': 'nursys',
+        'name_match': 'contains',
+        'tiers': ['name_license', 'name'],
+        'priority': 'tier',
+        'score_candidates': True,
+    },
+}
+
+# Evidence weights used to rank several CMS candidates of one profile (see
+# candidate_scoring.py); a negative weight counts against a candidate
+CANDIDATE_SIGNAL_WEIGHTS = {
+    'phone': 4.0,            # a PDL phone equals the practice/mailing phone
+    'practice_state': 3.0,   # profile state == practice-location state
+    'practice_city': 2.0,    # profile city == practice-location city
+    'license_state': 2.0,    # a profile/Nursys license state among the CMS license states
+    'credential': 2.0,       # a Nursys license type (RN, LPN, ...) in the CMS credential
+    'mailing_state': 1.0,    # profile state == mailing-address state
+    'mailing_city': 1.0,     # profile city == mailing-address city
+    'nurse_credential': 1.0, # the CMS credential is a nursing one
+    'nursing_education': 1.0,  # PDL education mentions nursing and the credential is a nursing one
+    'sex': 1.0,              # PDL sex == Provider Sex Code
+    'sex_conflict': -2.0,    # PDL sex != Provider Sex Code (both known)
+}
+NURSE_CREDENTIALS = [
+    'RN', 'LPN', 'LVN', 'NP', 'APRN', 'APN', 'CNP', 'FNP', 'CRNA', 'CNS', 'CNM', 'BSN', 'MSN', 'DNP',
+]
+CREDENTIAL_COLUMN = 'Provider Credential Text'
+SEX_CODE_COLUMN = 'Provider Sex Code'
+MAILING_CITY_COLUMN = 'Provider Business Mailing Address City Name'
+MAILING_STATE_COLUMN = 'Provider Business Mailing Address State Name'
+
+# Minimum score of the fuzzy_name tier (see fuzzy_names.py): the mean of the
+# first- and last-name Jaro-Winkler similarities, within a Soundex + state block
+FUZZY_NAME_THRESHOLD = 0.90
+
+# The phone tier only uses numbers shared by at most this many CMS rows
+# (practice + mailing); more is a clinic or hospital switchboard, not a nurse
+PHONE_MATCH_MAX_ROWS = 3
@@ -0,0 +1,199 @@
+"""
+Filter specs for multi-output runs (``process_nurses.py --spec``).
+
+A spec lists named filter sets. One scan of the input evaluates all of them
+and appends every row to each extract it matches, so fifty state extracts
+cost one read of data.csv instead of fifty:
+
+    output_dir: extracts          # optional, default: current directory
+    defaults:                     # optional, merged into every filter set
+      different_phones: false
+    outputs:
+      nurses_CA:                  # written to extracts/nurses_CA.csv
+        state: CA
+      west_coast:
+        state: [CA, OR, WA]
+        output: west.csv          # relative to output_dir
+      phoenix_np:
+        city: phoenix
+        state: AZ
+        categories: [363L]
+
+Filter options:
+
+- ``first_name``, ``last_name``, ``city``: case-insensitive partial match
+- ``state``: practice location state code, or a list of codes
+- ``different_phones``: mailing and practice phones differ
+- ``categories``: taxonomy prefixes from NURSE_TAXONOMY_CODES (any of them)
+- ``license_state``: any license issued in one of these states
+- ``postal_code``: practice location postal code starts with this prefix
+
+Specs are JSON, or YAML when PyYAML is installed.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from config import NURSE_TAXONOMY_CODES
+
+# Options a filter set can use, with the type of each (lists accept one value too)
+FILTER_OPTIONS = {
+    'first_name': str,
+    'last_name': str,
+    'city': str,
+    'state': list,
+    'different_phones': bool,
+    'categories': list,
+    'license_state': list,
+    'postal_code': str,
+}
+
+
+class FilterSpecError(ValueError):
+    """The spec file is malformed or refers to unknown options."""
+    pass
+
+
+class FilterSet:
+    """One named extract of a spec: its output file and filter options."""
+
+    def __init__(self, name: str, output_file: str, options: Dict):
+        self.name = name
+        self.output_file = output_file
+        self.first_name: Optional[str] = options.get('first_name')
+        self.last_name: Optional[str] = options.get('last_name')
+        self.city: Optional[str] = options.get('city')
+        self.states: List[str] = options.get('state') or []
+        self.different_phones: bool = options.get('different_phones', False)
+        self.categories: List[str] = options.get('categories') or []
+        self.license_states: List[str] = options.get('license_state') or []
+        self.postal_code: Optional[str] = options.get('postal_code')
+
+    @property
+    def state(self) -> Optional[str]:
+        """The single state code, when the set filters on exactly one."""
+        return self.states[0] if len(self.states) == 1 else None
+
+    def describe(self) -> List[str]:
+        """Human-readable description of the options (as describe_filters)."""
+        filters_applied = []
+        if self.first_name:
+            filters_applied.append(f"First name contains '{self.first_name}'")
+        if self.last_name:
+            filters_applied.append(f"Last name contains '{self.last_name}'")
+        if self.city:
+            filters_applied.append(f"City contains '{self.city}'")
+        if self.states:
+            filters_applied.append(f"State in {', '.join(self.states)}" if len(self.states) > 1
+                                   else f"State = '{self.states[0]}'")
+        if self.different_phones:
+            filters_applied.append("Mailing phone ≠ Practice location phone")
+        if self.categories:
+            filters_applied.append(f"Category in {', '.join(self.categories)}")
+        if self.license_states:
+            filters_applied.append(f"License state in {', '.join(self.license_states)}")
+        if self.postal_code:
+            filters_applied.append(f"Postal code starts with '{self.postal_code}'")
+        return filters_applied
+
+
+def _check_options(name: str, options: Dict) -> Dict:
+    """Validate and normalize the filter options of one set."""
+    if not isinstance(options, dict):
+        raise FilterSpecError(f"Filter set '{name}' must be a mapping of options")
+    normalized = {}
+    for key, value in options.items():
+        if key == 'output':
+            continue
+        expected = FILTER_OPTIONS.get(key)
+        if expected is None:
+            raise FilterSpecError(
+                f"Unknown option '{key}' in filter set '{name}' (use {', '.join(FILTER_OPTIONS)})"
+            )
+        if value is None:
+            continue
+        if expected is list:
+            values = value if isinstance(value, list) else [value]
+            if not all(isinstance(v, (str, int)) for v in values):
+                raise FilterSpecError(f"Option '{key}' in filter set '{name}' must be a string or a list of strings")
+            value = [str(v).strip().upper() for v in values]
+        elif expected is bool:
+            if not isinstance(value, bool):
+                raise FilterSpecError(f"Option '{key}' in filter set '{name}' must be true or false")
+        elif not isinstance(value, (str, int)) or isinstance(value, bool):
+            raise FilterSpecError(f"Option '{key}' in filter set '{name}' must be a string")
+        else:
+            value = str(value)
+        normalized[key] = value
+
+    unknown = [c for c in normalized.get('categories', []) if c not in NURSE_TAXONOMY_CODES]
+    if unknown:
+        raise FilterSpecError(
+            f"Unknown categories {', '.join(unknown)} in filter set '{name}' "
+            f"(use {', '.join(NURSE_TAXONOMY_CODES)})"
+        )
+    return normalized
+
+
+def parse_spec(spec: Dict, base_dir: str = '.') -> List[FilterSet]:
+    """
+    Build the filter sets of an already-loaded spec.
+
+    Args:
+        spec: Spec mapping (``outputs`` plus optional ``defaults``/``output_dir``)
+        base_dir: Directory that a relative ``output_dir`` is resolved against
+
+    Raises:
+        FilterSpecError: if the spec is malformed
+    """
+    if not isinstance(spec, dict) or not isinstance(spec.get('outputs'), dict) or not spec['outputs']:
+        raise FilterSpecError("The spec needs an 'outputs' mapping with at least one filter set")
+    unknown = set(spec) - {'outputs', 'defaults', 'output_dir'}
+    if unknown:
+        raise FilterSpecError(f"Unknown top-level keys: {', '.join(sorted(unknown))}")
+
+    defaults = _check_options('defaults', spec.get('defaults') or {})
+    output_dir = os.path.join(base_dir, spec.get('output_dir') or '')
+
+    filter_sets = []
+    seen_outputs = {}
+    for name, options in spec['outputs'].items():
+        name = str(name)
+        merged = dict(defaults, **_check_options(name, options or {}))
+        output_file = os.path.normpath(os.path.join(output_dir, (options or {}).get('output') or f'{name}.csv'))
+        if output_file in seen_outputs:
+            raise FilterSpecError(f"Filter sets '{seen_outputs[output_file]}' and '{name}' write the same file {output_file}")
+        seen_outputs[output_file] = name
+        filter_sets.append(FilterSet(name, output_file, merged))
+    return filter_sets
+
+
+def load_spec(spec_file: str, base_dir: str = '.') -> List[FilterSet]:
+    """
+    Load a JSON or YAML spec file.
+
+    Raises:
+        FilterSpecError: if the file cannot be parsed or is malformed
+    """
+    with open(spec_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    if spec_file.endswith(('.yaml', '.yml')):
+        if yaml is None:
+            raise FilterSpecError("YAML specs require PyYAML (pip install pyyaml); or use a JSON spec")
+        try:
+            spec = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise FilterSpecError(f"Invalid YAML in {spec_file}: {e}")
+    else:
+        try:
+            spec = json.loads(text)
+        except ValueError as e:
+            raise FilterSpecError(f"Invalid JSON in {spec_file}: {e}")
+    return parse_spec(spec, base_dir)
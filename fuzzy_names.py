@@ -0,0 +1,207 @@
+"""
+Fuzzy name matching for profiles whose names are not in the CMS data as
+written (typos, spelling variants, several surnames in ``lastName``).
+
+Scoring every CMS row would not scale to the full extract, so candidates are
+blocked first: ``FuzzyNameIndex`` groups the CMS rows by the Soundex code of
+each last-name token plus the practice-location state. A lookup only scores
+the rows of the blocks its own last-name tokens fall into, with a
+Jaro-Winkler score that is bounded (pairs whose lengths alone cannot reach
+the threshold are skipped) and computed once per distinct CMS last name.
+
+    index = FuzzyNameIndex(cms_df)
+    index.matches('SARA', 'REGESTER', 'AZ')  # [(row, score), ...] best first
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cms_index import name_keys, normalize_state, normalize_state_series
+from config import FILTER_COLUMNS, FUZZY_NAME_THRESHOLD
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('BFPV', '1'),
+    **dict.fromkeys('CGJKQSXZ', '2'),
+    **dict.fromkeys('DT', '3'),
+    'L': '4',
+    **dict.fromkeys('MN', '5'),
+    'R': '6',
+}
+
+# Splits 'MARIE JONES-LAMBERT' into its surnames
+NAME_TOKEN_PATTERN = re.compile(r"[\s\-]+")
+
+# Jaro-Winkler prefix scale and the longest prefix it rewards
+WINKLER_SCALE = 0.1
+WINKLER_PREFIX = 4
+
+
+def soundex(name: str) -> str:
+    """American Soundex code of a name ('ROBERT' -> 'R163'); '' without letters."""
+    letters = [c for c in str(name).upper() if 'A' <= c <= 'Z']
+    if not letters:
+        return ''
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # H and W do not separate letters with the same code; vowels do
+        if letter not in 'HW':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def name_tokens(name: str) -> List[str]:
+    """The name itself, then each of its tokens when it has several."""
+    tokens = [token for token in NAME_TOKEN_PATTERN.split(name) if token]
+    return [name] + tokens if len(tokens) > 1 else [name]
+
+
+def jaro_winkler(a: str, b: str, min_score: float = 0.0) -> float:
+    """
+    Jaro-Winkler similarity of two strings (1.0 = equal).
+
+    Returns 0.0 without comparing the characters when the lengths alone
+    bound the score below ``min_score``.
+    """
+    if a == b:
+        return 1.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+    shorter = min(len_a, len_b)
+    # Best case: every character of the shorter string matches, in order
+    bound = (shorter / len_a + shorter / len_b + 1) / 3
+    bound += min(WINKLER_PREFIX, shorter) * WINKLER_SCALE * (1 - bound)
+    if bound < min_score:
+        return 0.0
+
+    window = max(max(len_a, len_b) // 2 - 1, 0)
+    matched_b = [False] * len_b
+    matches_a = []
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len_b, i + window + 1)):
+            if not matched_b[j] and b[j] == char:
+                matched_b[j] = True
+                matches_a.append(char)
+                break
+    matches = len(matches_a)
+    if not matches:
+        return 0.0
+    matches_b = [char for j, char in enumerate(b) if matched_b[j]]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) // 2
+    jaro = (matches / len_a + matches / len_b + (matches - transpositions) / matches) / 3
+
+    prefix = 0
+    for x, y in zip(a[:WINKLER_PREFIX], b[:WINKLER_PREFIX]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * WINKLER_SCALE * (1 - jaro)
+
+
+class FuzzyNameIndex:
+    """
+    CMS rows blocked by (Soundex of a last-name token, practice state).
+
+    A row is in the block of every token of its last name, so 'ORTIZ
+    MARTINEZ' is found from 'ORTIZ', 'MARTINEZ' or a misspelling of either.
+    Rows without a first name, last name or state are not indexed.
+    """
+
+    def __init__(self, cms_df: pd.DataFrame, threshold: float = FUZZY_NAME_THRESHOLD):
+        self.threshold = threshold
+        first_names, last_names = name_keys(cms_df)
+        state_col = FILTER_COLUMNS['state']
+        states = normalize_state_series(cms_df[state_col]) if state_col in cms_df.columns else pd.Series('', index=cms_df.index)
+
+        names = pd.DataFrame({
+            'first': first_names.to_numpy(),
+            'last': last_names.to_numpy(),
+            'state': states.to_numpy(),
+            'row': np.arange(len(cms_df)),
+        })
+        names = names[(names['first'] != '') & (names['last'] != '') & (names['state'] != '')]
+        tokens = names.assign(token=names['last'].str.split(NAME_TOKEN_PATTERN)).explode('token')
+        # One Soundex call per distinct token instead of per row
+        codes = {token: soundex(token) for token in tokens['token'].dropna().unique()}
+        tokens['code'] = tokens['token'].map(codes).fillna('')
+        tokens = tokens[tokens['code'] != ''].drop_duplicates(['code', 'state', 'row'])
+        tokens = tokens.sort_values(['code', 'state', 'last', 'row'], kind='stable')
+
+        self._first = tokens['first'].to_numpy(dtype=object)
+        self._rows = tokens['row'].to_numpy(np.int64)
+        # (code, state) -> [(last name, its tokens, start, stop)], one entry per distinct last name
+        self._blocks: Dict[Tuple[str, str], List[Tuple[str, List[str], int, int]]] = {}
+        keys = tokens[['code', 'state', 'last']].to_numpy(dtype=object)
+        if len(keys):
+            starts = np.flatnonzero(np.r_[True, (keys[1:] != keys[:-1]).any(axis=1)])
+            stops = np.r_[starts[1:], len(keys)]
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                code, state, last = keys[start]
+                self._blocks.setdefault((code, state), []).append((last, name_tokens(last), start, stop))
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def block_sizes(self) -> np.ndarray:
+        """Number of indexed rows per block."""
+        return np.array([
+            sum(stop - start for _, _, start, stop in entries) for entries in self._blocks.values()
+        ], dtype=np.int64)
+
+    def matches(self, first_name: str, last_name: str, state: str) -> List[Tuple[int, float]]:
+        """
+        CMS rows whose name scores at least the threshold, as (row, score),
+        best score first (ties in file order).
+
+        The score is the mean of the first-name and the last-name
+        Jaro-Winkler similarities; the last-name similarity is the best one
+        between the names and their tokens.
+        """
+        state = normalize_state(state)
+        if not first_name or not last_name or not state:
+            return []
+        variants = name_tokens(last_name)
+        codes = {soundex(token) for token in variants[1:] or variants} - {''}
+        # The first name scores at most 1.0, so the last name needs 2t - 1
+        min_last = 2 * self.threshold - 1
+
+        best: Dict[int, float] = {}
+        first_scores: Dict[str, float] = {}
+        for code in codes:
+            for cms_last, cms_variants, start, stop in self._blocks.get((code, state), ()):
+                last_score = max(
+                    jaro_winkler(variant, cms_variant, min_last)
+                    for variant in variants for cms_variant in cms_variants
+                )
+                if last_score < min_last:
+                    continue
+                min_first = 2 * self.threshold - last_score
+                for pos in range(start, stop):
+                    cms_first = self._first[pos]
+                    first_score = first_scores.get(cms_first)
+                    if first_score is None:
+                        first_score = first_scores[cms_first] = jaro_winkler(first_name, cms_first)
+                    if first_score < min_first:
+                        continue
+                    row = int(self._rows[pos])
+                    score = (first_score + last_score) / 2
+                    if score > best.get(row, -1.0):
+                        best[row] = score
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))
+
+    def best_match(self, first_name: str, last_name: str, state: str) -> Optional[Tuple[int, float, int]]:
+        """(row, score, number of rows above the threshold) of the best match, or None."""
+        found = self.matches(first_name, last_name, state)
+        if not found:
+            return None
+        row, score = found[0]
+        return row, score, len(found)
@@ -0,0 +1,87 @@
+"""
+State file for incremental (``--incremental``) runs of process_nurses.py.
+
+The state sits next to the output (``nurses.csv`` -> ``nurses.csv.state.json``)
+and records:
+
+- ``watermark``: the newest ``Last Update Date``, ``NPI Deactivation Date``
+  or ``NPI Reactivation Date`` already applied to the output, as an ISO date
+- ``npis``: the NPIs currently in the output
+- the source file and filters of the run that wrote it
+
+The next run only processes rows updated on or after the watermark day (from
+the full monthly dump or a weekly delta file) and upserts them into the output
+by NPI.
+"""
+
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+STATE_FILE_SUFFIX = '.state.json'
+STATE_VERSION = 1
+
+# NPPES columns used to detect updates and deactivations
+LAST_UPDATE_COLUMN = 'Last Update Date'
+DEACTIVATION_DATE_COLUMN = 'NPI Deactivation Date'
+REACTIVATION_DATE_COLUMN = 'NPI Reactivation Date'
+NPPES_DATE_FORMAT = '%m/%d/%Y'
+
+
+def get_state_file(output_file: str) -> str:
+    """Default state file for an output CSV (nurses.csv -> nurses.csv.state.json)."""
+    return output_file + STATE_FILE_SUFFIX
+
+
+def load_state(state_file: str) -> Optional[Dict]:
+    """Load the incremental state, or None if there is no usable state file."""
+    if not os.path.exists(state_file):
+        return None
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != STATE_VERSION:
+        return None
+    return state
+
+
+def get_watermark(state: Dict) -> Optional[date]:
+    """The state's watermark as a date (None means "process everything")."""
+    if not state.get('watermark'):
+        return None
+    return date.fromisoformat(state['watermark'])
+
+
+def save_state(
+    state_file: str,
+    source: str,
+    watermark: Optional[date],
+    npis: Iterable[str],
+    filters: List[str],
+) -> Dict:
+    """
+    Write the state file atomically (temporary file + rename).
+
+    Args:
+        state_file: Path of the state file
+        source: Input file of the run
+        watermark: Newest update date applied to the output
+        npis: NPIs currently in the output
+        filters: Description of the filters the output was built with
+    """
+    state = {
+        'version': STATE_VERSION,
+        'source': os.path.abspath(source),
+        'updated_at': datetime.now().isoformat(timespec='seconds'),
+        'watermark': watermark.isoformat() if watermark else None,
+        'filters': filters,
+        'npis': sorted(str(npi) for npi in npis),
+    }
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, state_file)
+    return state
@@ -0,0 +1,1114 @@
+#!/usr/bin/env python3
+"""
+Matching engine for scraped nurse cohorts against the CMS nurse data.
+
+The Phoenix, Denver and Nursys comparisons differ only in a few settings,
+which are configuration here instead of three copies of the matching loop:
+
+- the JSON shape of the cohort, read by an input adapter (``facebook``:
+  ``nursys.licenses[].license`` and PDL phones; ``nursys``:
+  ``nursys.individuals[].licenseNumber``)
+- how names are matched: ``exact``, ``contains``, or ``exact_or_contains``
+  (exact first/last names, else substring), and whether multi-token names
+  are decomposed into their (first, middle, last) readings when the exact
+  name misses (``decompose_names``)
+- the tiers, in priority order, and whether the best tier wins
+  (``priority='tier'``) or the first CMS row with any hit (``'row'``, the
+  streaming semantics, which give the same result chunk by chunk)
+- whether several candidate rows are ranked by evidence (location, license
+  state, credential, phone, PDL sex/education; ``score_candidates``, see
+  candidate_scoring.py) instead of file order
+
+Tiers:
+
+- ``license``      CONFIRMED  a profile license equals a CMS license (normalized, any of the 15 columns)
+- ``name_license`` CONFIRMED  a name candidate whose license column contains a profile license
+- ``name_contact`` HIGH       a name candidate whose practice/mailing phone equals a PDL phone
+- ``name``         MEDIUM     the first name candidate (file order)
+- ``phone``        MEDIUM     a CMS row whose practice/mailing phone equals a PDL phone, whatever
+                              the name (numbers of more than PHONE_MATCH_MAX_ROWS rows are skipped)
+- ``fuzzy_name``   LOW        the best fuzzy name match in the profile's state (fuzzy_names.py)
+
+Presets are in config.MATCH_PRESETS. Every tier is resolved with joins over
+key tables (``ProfileKeys``) and the CMS indexes, and the CMS fields of the
+matched rows are extracted column-wise (``extract_cms_records``):
+
+    python match_engine.py phoenix_nurses.json nurses.csv --preset phoenix
+    python match_engine.py denver.json data.csv --preset denver --streaming
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from cms_index import (
+    LicenseIndex,
+    NameIndex,
+    PhoneIndex,
+    extract_phone_numbers,
+    melt_licenses,
+    name_keys,
+    normalize_license_series,
+    normalize_name,
+    normalize_state,
+    phone_keys,
+)
+from config import (
+    FILTER_COLUMNS,
+    FUZZY_NAME_THRESHOLD,
+    LICENSE_NUMBER_COLUMNS,
+    LICENSE_STATE_COLUMNS,
+    MATCH_PRESETS,
+    PHONE_MAILING_COLUMN,
+    PHONE_MATCH_MAX_ROWS,
+    PHONE_PRACTICE_COLUMN,
+)
+from candidate_scoring import CandidateScorer, candidate_margins, has_nursing_education, profile_sex
+from fuzzy_names import FuzzyNameIndex
+from parquet_cache import find_fresh_cache, iter_cache_chunks
+from profile_stream import (
+    HEAVY_PDL_FIELDS,
+    MATCH_FIELDS,
+    NURSYS_FIELDS,
+    PROFILE_FORMATS,
+    ProfileWriter,
+    drop_fields,
+    iter_profiles,
+    load_profiles,
+)
+
+TIER_CONFIDENCE = {
+    'license': 'CONFIRMED',
+    'name_license': 'CONFIRMED',
+    'name_contact': 'HIGH',
+    'name': 'MEDIUM',
+    'phone': 'MEDIUM',
+    'fuzzy_name': 'LOW',
+}
+# Tiers that pick among the name candidates (exact/contains)
+CANDIDATE_TIERS = ('name_license', 'name_contact', 'name')
+NAME_MATCH_MODES = ('exact_or_contains', 'exact', 'contains')
+MATCH_PRIORITIES = ('tier', 'row')
+
+# Fields of a match record's ``cms_data``, in output order
+CMS_DATA_FIELDS = [
+    'npi', 'full_name', 'credential', 'practice_address', 'practice_phone', 'mailing_phone',
+    'license_numbers', 'license_states', 'enumeration_date', 'last_update_date',
+]
+PRACTICE_ADDRESS_COLUMNS = [
+    'Provider First Line Business Practice Location Address',
+    'Provider Second Line Business Practice Location Address',
+    FILTER_COLUMNS['city'],
+    FILTER_COLUMNS['state'],
+    'Provider Business Practice Location Address Postal Code',
+]
+
+
+class MatchConfigError(ValueError):
+    """Unknown preset, adapter, tier or option combination."""
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Input adapters
+# ---------------------------------------------------------------------------
+
+class ProfileAdapter:
+    """Reads the match keys of one JSON shape of scraped profiles."""
+
+    name = ''
+    license_list = ''  # list under profile['nursys']
+    fields: List[str] = []  # projection for profile_stream
+
+    def license_entries(self, profile: Dict) -> List[Dict]:
+        return profile.get('nursys', {}).get(self.license_list, [])
+
+    def license_numbers(self, profile: Dict) -> List[Tuple[int, str]]:
+        """(position in license_entries, license number) of the non-empty licenses."""
+        raise NotImplementedError
+
+    def license_attributes(self, entry: Dict) -> Tuple[str, str]:
+        """(state, license type) of one license entry, as written."""
+        raise NotImplementedError
+
+    def phones(self, profile: Dict) -> List[str]:
+        return extract_phone_numbers(profile.get('peopleDataLabs'))
+
+    def has_pdl_data(self, profile: Dict) -> bool:
+        return 'peopleDataLabs' in profile and profile['peopleDataLabs'] is not None
+
+
+class FacebookProfileAdapter(ProfileAdapter):
+    """Facebook profiles with Nursys licenses and PDL data (phoenix_nurses.json, denver.json)."""
+
+    name = 'facebook'
+    license_list = 'licenses'
+    fields = MATCH_FIELDS
+
+    def license_numbers(self, profile: Dict) -> List[Tuple[int, str]]:
+        return [
+            (order, info.get('license', ''))
+            for order, info in enumerate(self.license_entries(profile))
+            if info.get('license', '')
+        ]
+
+    def license_attributes(self, entry: Dict) -> Tuple[str, str]:
+        return entry.get('licenseState', ''), entry.get('type', '')
+
+
+class NursysProfileAdapter(ProfileAdapter):
+    """Profiles with Nursys lookup results (nursys.json)."""
+
+    name = 'nursys'
+    license_list = 'individuals'
+    fields = NURSYS_FIELDS
+
+    def license_numbers(self, profile: Dict) -> List[Tuple[int, str]]:
+        numbers = []
+        for order, info in enumerate(self.license_entries(profile)):
+            number = str(info.get('licenseNumber', '')).strip()
+            if number:
+                numbers.append((order, number))
+        return numbers
+
+    def license_attributes(self, entry: Dict) -> Tuple[str, str]:
+        return entry.get('state', ''), entry.get('licenseType', '')
+
+
+ADAPTERS: Dict[str, ProfileAdapter] = {
+    adapter.name: adapter for adapter in (FacebookProfileAdapter(), NursysProfileAdapter())
+}
+
+
+class MatchConfig:
+    """Adapter, name matching mode, tiers and priority of a matching run."""
+
+    def __init__(
+        self,
+        adapter: str = 'facebook',
+        name_match: str = 'exact_or_contains',
+        tiers: Iterable[str] = ('license', 'name_contact', 'name'),
+        priority: str = 'tier',
+        decompose_names: bool = False,
+        score_candidates: bool = False,
+    ):
+        if adapter not in ADAPTERS:
+            raise MatchConfigError(f"Unknown adapter '{adapter}' (use one of {', '.join(ADAPTERS)})")
+        if name_match not in NAME_MATCH_MODES:
+            raise MatchConfigError(f"Unknown name match '{name_match}' (use one of {', '.join(NAME_MATCH_MODES)})")
+        if priority not in MATCH_PRIORITIES:
+            raise MatchConfigError(f"Unknown priority '{priority}' (use one of {', '.join(MATCH_PRIORITIES)})")
+        tiers = list(tiers)
+        unknown = [tier for tier in tiers if tier not in TIER_CONFIDENCE]
+        if unknown or not tiers:
+            raise MatchConfigError(
+                f"Unknown tiers {', '.join(unknown)} (use some of {', '.join(TIER_CONFIDENCE)})" if unknown
+                else "At least one tier is needed"
+            )
+        if 'fuzzy_name' in tiers and priority != 'tier':
+            raise MatchConfigError("The fuzzy_name tier needs priority 'tier' (a fuzzy hit must not beat a later exact one)")
+        if 'phone' in tiers and priority != 'tier':
+            raise MatchConfigError("The phone tier needs priority 'tier' (a phone hit must not beat a later name one)")
+        if score_candidates and priority != 'tier':
+            raise MatchConfigError("score_candidates needs priority 'tier' (with 'row' the first CMS row wins)")
+        if decompose_names and (priority != 'tier' or name_match == 'contains'):
+            raise MatchConfigError(
+                "decompose_names needs priority 'tier' and exact names (it only runs when the exact name misses)"
+            )
+        self.adapter = ADAPTERS[adapter]
+        self.name_match = name_match
+        self.tiers = tiers
+        self.priority = priority
+        self.decompose_names = decompose_names
+        self.score_candidates = score_candidates
+
+    @classmethod
+    def preset(cls, name: str, **overrides) -> 'MatchConfig':
+        """Config of a preset in config.MATCH_PRESETS; ``None`` overrides are ignored."""
+        if name not in MATCH_PRESETS:
+            raise MatchConfigError(f"Unknown preset '{name}' (use one of {', '.join(MATCH_PRESETS)})")
+        settings = dict(MATCH_PRESETS[name])
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**settings)
+
+    def describe(self) -> str:
+        return (f"adapter={self.adapter.name}, names={self.name_match}"
+                f"{'+decomposed' if self.decompose_names else ''}, "
+                f"tiers={'>'.join(self.tiers)}, priority={self.priority}"
+                f"{', scored candidates' if self.score_candidates else ''}")
+
+
+# ---------------------------------------------------------------------------
+# Profile keys
+# ---------------------------------------------------------------------------
+
+class ProfileKeys:
+    """
+    Normalized match keys of a cohort, as tables keyed by profile position:
+    ``licenses`` (profile, order, raw, license, state, type), ``names``
+    (profile, first, last, state), ``phones`` (profile, phone) and
+    ``profiles`` (profile, state, city, sex, nursing), the signals used to
+    score several candidates (candidate_scoring.py).
+    """
+
+    def __init__(
+        self,
+        licenses: pd.DataFrame,
+        names: pd.DataFrame,
+        phones: pd.DataFrame,
+        profiles: Optional[pd.DataFrame] = None,
+    ):
+        self.licenses = licenses
+        self.names = names
+        self.phones = phones
+        self.profiles = profiles if profiles is not None else pd.DataFrame(
+            columns=['profile', 'state', 'city', 'sex', 'nursing']
+        )
+
+    @classmethod
+    def build(cls, profiles: Iterable[Dict], adapter: ProfileAdapter) -> 'ProfileKeys':
+        license_rows = []
+        name_rows = []
+        phone_rows = []
+        profile_rows = []
+        for pos, profile in enumerate(profiles):
+            entries = adapter.license_entries(profile)
+            for order, number in adapter.license_numbers(profile):
+                license_state, license_type = adapter.license_attributes(entries[order])
+                license_rows.append((pos, order, number, normalize_state(license_state), normalize_name(license_type)))
+
+            state = normalize_state(profile.get('state'))
+            first_name = normalize_name(profile.get('firstName', ''))
+            last_name = normalize_name(profile.get('lastName', ''))
+            if first_name and last_name:
+                name_rows.append((pos, first_name, last_name, state))
+
+            for phone in adapter.phones(profile):
+                phone_rows.append((pos, phone))
+
+            pdl_data = profile.get('peopleDataLabs')
+            profile_rows.append((
+                pos, state, normalize_name(profile.get('city', '')), profile_sex(pdl_data), has_nursing_education(pdl_data),
+            ))
+
+        licenses = pd.DataFrame(license_rows, columns=['profile', 'order', 'raw', 'state', 'type'])
+        licenses['license'] = normalize_license_series(licenses['raw']) if len(licenses) else pd.Series(dtype=object)
+        return cls(
+            licenses,
+            pd.DataFrame(name_rows, columns=['profile', 'first', 'last', 'state']),
+            pd.DataFrame(phone_rows, columns=['profile', 'phone']).drop_duplicates(),
+            pd.DataFrame(profile_rows, columns=['profile', 'state', 'city', 'sex', 'nursing']),
+        )
+
+    def subset(self, profiles: np.ndarray) -> 'ProfileKeys':
+        """Keys of the given profile positions only."""
+        return ProfileKeys(
+            self.licenses[self.licenses['profile'].isin(profiles)],
+            self.names[self.names['profile'].isin(profiles)],
+            self.phones[self.phones['profile'].isin(profiles)],
+            self.profiles[self.profiles['profile'].isin(profiles)],
+        )
+
+
+# ---------------------------------------------------------------------------
+# Matching core
+# ---------------------------------------------------------------------------
+
+_EMPTY_HITS_COLUMNS = ['profile', 'row', 'license', 'license_order', 'license_column', 'hits']
+
+
+def _empty_hits() -> pd.DataFrame:
+    return pd.DataFrame({col: pd.Series(dtype=np.int64 if col != 'license' else object) for col in _EMPTY_HITS_COLUMNS})
+
+
+class MatchEngine:
+    """
+    Resolves profile keys against one CMS DataFrame (a filtered extract, or a
+    chunk of data.csv when streaming). Indexes are built on first use, or
+    passed in when they already exist for the same DataFrame.
+    """
+
+    def __init__(
+        self,
+        cms_df: pd.DataFrame,
+        config: MatchConfig,
+        license_index: Optional[LicenseIndex] = None,
+        name_index: Optional[NameIndex] = None,
+        fuzzy_index: Optional[FuzzyNameIndex] = None,
+        phone_index: Optional[PhoneIndex] = None,
+    ):
+        self.cms_df = cms_df
+        self.config = config
+        self._license_entries = license_index.entries if license_index is not None else None
+        self._name_index = name_index
+        self._cms_names = name_index.names if name_index is not None else None
+        self._fuzzy_index = fuzzy_index
+        self._phone_index = phone_index
+        self.scorer = CandidateScorer(cms_df)
+
+    @property
+    def license_entries(self) -> pd.DataFrame:
+        """Melted (license, state, row) table; ``entry`` is column-1-first, then file order."""
+        if self._license_entries is None:
+            self._license_entries = melt_licenses(self.cms_df)
+        return self._license_entries
+
+    @property
+    def name_index(self) -> NameIndex:
+        if self._name_index is None:
+            self._name_index = NameIndex(self.cms_df)
+            self._cms_names = self._name_index.names
+        return self._name_index
+
+    @property
+    def fuzzy_index(self) -> FuzzyNameIndex:
+        if self._fuzzy_index is None:
+            self._fuzzy_index = FuzzyNameIndex(self.cms_df, FUZZY_NAME_THRESHOLD)
+        return self._fuzzy_index
+
+    @property
+    def phone_index(self) -> PhoneIndex:
+        if self._phone_index is None:
+            self._phone_index = PhoneIndex(self.cms_df)
+        return self._phone_index
+
+    @property
+    def cms_names(self) -> pd.DataFrame:
+        """Normalized (first, last) per CMS row; exact matching needs no substring index."""
+        if self._cms_names is None:
+            first_names, last_names = name_keys(self.cms_df)
+            self._cms_names = pd.DataFrame({'first': first_names.to_numpy(), 'last': last_names.to_numpy()})
+        return self._cms_names
+
+    # -- tiers ---------------------------------------------------------------
+
+    def _license_hits(self, licenses: pd.DataFrame, keys: ProfileKeys) -> pd.DataFrame:
+        """
+        First CMS row per profile holding one of its licenses; with scored
+        candidates, the best-scored row holding its first matched license.
+        """
+        licenses = licenses[licenses['license'] != '']
+        if licenses.empty:
+            return _empty_hits()
+        entries = self.license_entries[['license', 'row']].rename_axis('entry').reset_index()
+        hits = licenses.merge(entries, on='license', how='inner')
+        # Best tier: licenses in profile order, then CMS column/file order;
+        # first row: the earliest row, then the profile's first license in it
+        if self.config.score_candidates:
+            hits['evidence'] = self.scorer.score(hits[['profile', 'row']], keys)
+            pool = hits
+            hits = hits.sort_values(
+                ['profile', 'order', 'evidence', 'entry'], ascending=[True, True, False, True], kind='stable'
+            ).drop_duplicates('profile')
+            hits['margin'] = candidate_margins(pool, hits)
+        else:
+            order = ['profile', 'order', 'entry'] if self.config.priority == 'tier' else ['profile', 'row', 'order']
+            hits = hits.sort_values(order, kind='stable').drop_duplicates('profile')
+        found = pd.DataFrame({
+            'profile': hits['profile'].to_numpy(np.int64),
+            'row': hits['row'].to_numpy(np.int64),
+            'license': hits['raw'].to_numpy(object),
+            'license_order': hits['order'].to_numpy(np.int64),
+            'license_column': -1,
+            'hits': 1,
+        })
+        if self.config.score_candidates:
+            found['evidence'] = hits['evidence'].to_numpy(float)
+            found['margin'] = hits['margin'].to_numpy(float)
+        return found
+
+    def rank_candidates(self, candidates: pd.DataFrame, keys: ProfileKeys) -> pd.DataFrame:
+        """
+        Name candidates re-ranked by evidence score (``evidence`` column),
+        best first; equal scores keep their name-match rank.
+        """
+        candidates = candidates.assign(evidence=self.scorer.score(candidates[['profile', 'row']], keys))
+        candidates = candidates.sort_values(
+            ['profile', 'evidence', 'rank'], ascending=[True, False, True], kind='stable'
+        ).reset_index(drop=True)
+        candidates['rank'] = candidates.groupby('profile').cumcount()
+        return candidates
+
+    def name_candidates(self, names: pd.DataFrame) -> pd.DataFrame:
+        """
+        Candidate CMS rows per profile (profile, row, rank), ``rank`` in file
+        order, according to the name matching mode. Candidates from the
+        readings of a decomposed name are ranked by NameIndex.decomposed.
+        """
+        parts = []
+        pending = names
+        if self.config.name_match in ('exact', 'exact_or_contains'):
+            cms_names = self.cms_names.rename_axis('row').reset_index()
+            exact = names.merge(cms_names, on=['first', 'last'], how='inner')[['profile', 'row']]
+            parts.append(exact.assign(order=0))
+            pending = names[~names['profile'].isin(exact['profile'])]
+        if self.config.decompose_names and not pending.empty:
+            name_index = self.name_index
+            decomposed = pd.DataFrame(
+                [
+                    (profile, row, order)
+                    for profile, first_name, last_name in pending[['profile', 'first', 'last']].itertuples(index=False)
+                    for row, order in name_index.decomposed(first_name, last_name)
+                ],
+                columns=['profile', 'row', 'order'],
+            )
+            parts.append(decomposed)
+            pending = pending[~pending['profile'].isin(decomposed['profile'])]
+        if self.config.name_match in ('contains', 'exact_or_contains') and not pending.empty:
+            name_index = self.name_index
+            parts.append(pd.DataFrame(
+                [
+                    (profile, row)
+                    for profile, first_name, last_name in pending[['profile', 'first', 'last']].itertuples(index=False)
+                    for row in name_index.contains(first_name, last_name)
+                ],
+                columns=['profile', 'row'],
+            ).assign(order=0))
+
+        candidates = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=['profile', 'row', 'order'])
+        candidates = candidates.astype({'profile': np.int64, 'row': np.int64, 'order': np.int64})
+        candidates = candidates.sort_values(['profile', 'order', 'row'], kind='stable').reset_index(drop=True)
+        candidates['rank'] = candidates.groupby('profile').cumcount()
+        return candidates.drop(columns='order')
+
+    def _contact_hits(self, candidates: pd.DataFrame, phones: pd.DataFrame) -> pd.DataFrame:
+        """First candidate per profile whose practice or mailing phone equals one of its PDL phones."""
+        if candidates.empty or phones.empty:
+            return _empty_hits()
+        if self._phone_index is not None or 'phone' in self.config.tiers:
+            # The phone index is built anyway: join the profile phones to it
+            # instead of normalizing the candidates' phones again
+            cms_phones = phones.merge(self.phone_index.entries[['phone', 'row']], on='phone')
+            hits = candidates.merge(cms_phones, on=['profile', 'row'])
+        else:
+            rows = np.unique(candidates['row'].to_numpy())
+            cms_phones = []
+            for col in (PHONE_PRACTICE_COLUMN, PHONE_MAILING_COLUMN):
+                column_phones = phone_keys(self.cms_df, col, rows)
+                if column_phones is not None:
+                    cms_phones.append(pd.DataFrame({'row': rows, 'phone': column_phones.to_numpy()}))
+            if not cms_phones:
+                return _empty_hits()
+            cms_phones = pd.concat(cms_phones, ignore_index=True)
+            cms_phones = cms_phones[cms_phones['phone'] != '']
+            hits = candidates.merge(cms_phones, on='row').merge(phones, on=['profile', 'phone'])
+        hits = hits.sort_values(['profile', 'rank'], kind='stable').drop_duplicates('profile')
+        return pd.DataFrame({
+            'profile': hits['profile'].to_numpy(np.int64),
+            'row': hits['row'].to_numpy(np.int64),
+            'license': None,
+            'license_order': -1,
+            'license_column': -1,
+            'hits': 1,
+        })
+
+    def _name_license_hits(self, candidates: pd.DataFrame, licenses: pd.DataFrame) -> pd.DataFrame:
+        """
+        First candidate per profile whose license column contains one of its
+        (raw) licenses: licenses in profile order, then columns 1..15, then
+        file order. ``hits`` counts the candidates holding that license in
+        that column.
+        """
+        pairs = candidates.merge(licenses[['profile', 'order', 'raw']], on='profile')
+        if pairs.empty:
+            return _empty_hits()
+        rows = np.unique(pairs['row'].to_numpy())
+        pair_rows = np.searchsorted(rows, pairs['row'].to_numpy())
+        raws = pairs['raw'].astype(str).to_numpy(dtype=object)
+
+        found = []
+        for column, col in enumerate(LICENSE_NUMBER_COLUMNS):
+            if col not in self.cms_df.columns:
+                continue
+            # Same text the license cell has as a string ('nan' for float NaN)
+            values = self.cms_df[col].iloc[rows].astype(str).to_numpy(dtype=object)[pair_rows]
+            contained = np.fromiter(
+                (isinstance(value, str) and raw in value for raw, value in zip(raws, values)),
+                dtype=bool, count=len(pairs),
+            )
+            if contained.any():
+                found.append(pairs[contained].assign(column=column))
+        if not found:
+            return _empty_hits()
+
+        hits = pd.concat(found, ignore_index=True)
+        counts = hits.groupby(['profile', 'order', 'column']).size().rename('hits').reset_index()
+        order = ['profile', 'order', 'column', 'rank'] if self.config.priority == 'tier' else ['profile', 'row', 'order', 'column']
+        first = hits.sort_values(order, kind='stable').drop_duplicates('profile')
+        first = first.merge(counts, on=['profile', 'order', 'column'])
+        return pd.DataFrame({
+            'profile': first['profile'].to_numpy(np.int64),
+            'row': first['row'].to_numpy(np.int64),
+            'license': first['raw'].to_numpy(object),
+            'license_order': first['order'].to_numpy(np.int64),
+            'license_column': first['column'].to_numpy(np.int64),
+            'hits': first['hits'].to_numpy(np.int64),
+        })
+
+    def _name_hits(self, candidates: pd.DataFrame) -> pd.DataFrame:
+        first = candidates[candidates['rank'] == 0]
+        return pd.DataFrame({
+            'profile': first['profile'].to_numpy(np.int64),
+            'row': first['row'].to_numpy(np.int64),
+            'license': None,
+            'license_order': -1,
+            'license_column': -1,
+            'hits': 1,
+        })
+
+    def _fuzzy_hits(self, names: pd.DataFrame) -> pd.DataFrame:
+        """
+        Best fuzzy name match per profile within its state's Soundex blocks;
+        ``hits`` counts the CMS rows above the threshold.
+        """
+        found = []
+        if not names.empty:
+            fuzzy_index = self.fuzzy_index
+            for profile, first_name, last_name, state in names[['profile', 'first', 'last', 'state']].itertuples(index=False):
+                best = fuzzy_index.best_match(first_name, last_name, state)
+                if best is not None:
+                    found.append((profile, *best))
+        found = pd.DataFrame(found, columns=['profile', 'row', 'score', 'hits'])
+        return pd.DataFrame({
+            'profile': found['profile'].to_numpy(np.int64),
+            'row': found['row'].to_numpy(np.int64),
+            'license': None,
+            'license_order': -1,
+            'license_column': -1,
+            'hits': found['hits'].to_numpy(np.int64),
+            'score': found['score'].to_numpy(float),
+        })
+
+    def _phone_hits(self, phones: pd.DataFrame, keys: ProfileKeys) -> pd.DataFrame:
+        """
+        A CMS row per profile whose practice or mailing phone equals one of
+        its PDL phones, names aside: practice phones first, then file order,
+        or the best-scored row with scored candidates. Phones of more than
+        PHONE_MATCH_MAX_ROWS rows are not used; ``hits`` counts the rows
+        with the profile's phones.
+        """
+        if phones.empty:
+            return _empty_hits().assign(phone=pd.Series(dtype=object))
+        phone_index = self.phone_index
+        entries = phone_index.entries.rename_axis('entry').reset_index()
+        own = phone_index.counts[phone_index.counts <= PHONE_MATCH_MAX_ROWS].index
+        hits = phones[phones['phone'].isin(own)].merge(entries, on='phone')
+        counts = hits.groupby('profile')['row'].nunique()
+        if self.config.score_candidates and not hits.empty:
+            hits['evidence'] = self.scorer.score(hits[['profile', 'row']], keys)
+            pool = hits
+            hits = hits.sort_values(
+                ['profile', 'evidence', 'entry'], ascending=[True, False, True], kind='stable'
+            ).drop_duplicates('profile')
+            hits['margin'] = candidate_margins(pool, hits)
+        else:
+            hits = hits.sort_values(['profile', 'entry'], kind='stable').drop_duplicates('profile')
+        found = pd.DataFrame({
+            'profile': hits['profile'].to_numpy(np.int64),
+            'row': hits['row'].to_numpy(np.int64),
+            'license': None,
+            'license_order': -1,
+            'license_column': -1,
+            'hits': counts.reindex(hits['profile']).to_numpy(np.int64),
+            'phone': hits['phone'].to_numpy(object),
+        })
+        if 'evidence' in hits.columns:
+            found['evidence'] = hits['evidence'].to_numpy(float)
+            found['margin'] = hits['margin'].to_numpy(float)
+        return found
+
+    def _tier_hits(self, tier: str, keys: ProfileKeys, candidates: Optional[pd.DataFrame]) -> pd.DataFrame:
+        if tier == 'license':
+            return self._license_hits(keys.licenses, keys)
+        if tier == 'name_contact':
+            return self._contact_hits(candidates, keys.phones)
+        if tier == 'name_license':
+            return self._name_license_hits(candidates, keys.licenses)
+        if tier == 'fuzzy_name':
+            return self._fuzzy_hits(keys.names)
+        if tier == 'phone':
+            return self._phone_hits(keys.phones, keys)
+        return self._name_hits(candidates)
+
+    # -- resolution ----------------------------------------------------------
+
+    def resolve(self, keys: ProfileKeys) -> pd.DataFrame:
+        """
+        Match the profiles of ``keys`` against the CMS rows.
+
+        Returns:
+            One row per matched profile (index: profile position) with
+            ``tier``, ``confidence``, ``method``, ``row`` (CMS position),
+            ``license`` (profile license behind a license tier),
+            ``license_order``, ``license_column``, ``hits``, ``score``
+            (fuzzy_name only, NaN otherwise), ``phone`` (phone only), ``evidence`` and ``margin``
+            (scored candidates: the row's evidence score and its lead over
+            the best other candidate, NaN without one) and ``candidates``
+            (number of name candidates)
+        """
+        config = self.config
+        name_tiers = [tier for tier in config.tiers if tier in CANDIDATE_TIERS]
+        resolved = []
+        done = np.empty(0, dtype=np.int64)
+        candidates = None
+
+        for tier in config.tiers:
+            tier_keys = keys
+            if config.priority == 'tier' and len(done):
+                tier_keys = ProfileKeys(
+                    keys.licenses[~keys.licenses['profile'].isin(done)],
+                    keys.names[~keys.names['profile'].isin(done)],
+                    keys.phones[~keys.phones['profile'].isin(done)],
+                    keys.profiles,
+                )
+            if tier in CANDIDATE_TIERS and candidates is None:
+                candidates = self.name_candidates(tier_keys.names)
+                if config.score_candidates:
+                    candidates = self.rank_candidates(candidates, keys)
+            tier_candidates = candidates
+            if tier in CANDIDATE_TIERS:
+                if config.priority == 'tier':
+                    tier_candidates = candidates[~candidates['profile'].isin(done)]
+                else:
+                    # First row wins: only the first name row can decide a name tier
+                    tier_candidates = candidates[candidates['rank'] == 0]
+
+            hits = self._tier_hits(tier, tier_keys, tier_candidates)
+            if config.score_candidates and tier in CANDIDATE_TIERS:
+                hits = hits.merge(candidates[['profile', 'row', 'evidence']], on=['profile', 'row'], how='left')
+                hits['margin'] = candidate_margins(candidates, hits)
+            hits['tier'] = tier
+            hits['tier_rank'] = config.tiers.index(tier)
+            resolved.append(hits)
+            if config.priority == 'tier':
+                done = np.union1d(done, hits['profile'].to_numpy(np.int64))
+
+        result = pd.concat(resolved, ignore_index=True) if resolved else _empty_hits()
+        if config.priority == 'row':
+            result = result.sort_values(['profile', 'row', 'tier_rank'], kind='stable')
+        result = result.drop_duplicates('profile').sort_values('profile').set_index('profile')
+        for col in ('score', 'evidence', 'margin', 'phone'):
+            if col not in result.columns:
+                result[col] = np.nan
+
+        result['confidence'] = result['tier'].map(TIER_CONFIDENCE)
+        result['method'] = [
+            f'LICENSE:{license}' if tier == 'license'
+            else f'NAME+LICENSE:{license}' if tier == 'name_license'
+            else 'NAME+CONTACT' if tier == 'name_contact'
+            else f'PHONE:{phone}' if tier == 'phone'
+            else f'FUZZY_NAME:{score:.2f}' if tier == 'fuzzy_name'
+            else 'NAME_ONLY'
+            for tier, license, score, phone in zip(result['tier'], result['license'], result['score'], result['phone'])
+        ]
+        counts = candidates.groupby('profile').size() if candidates is not None and name_tiers else pd.Series(dtype=np.int64)
+        result['candidates'] = counts.reindex(result.index, fill_value=0).to_numpy(np.int64)
+        return result.drop(columns='tier_rank')
+
+
+# ---------------------------------------------------------------------------
+# CMS data of the matched rows
+# ---------------------------------------------------------------------------
+
+def _column_values(cms_df: pd.DataFrame, col: str, rows: np.ndarray) -> Optional[np.ndarray]:
+    if col not in cms_df.columns:
+        return None
+    return cms_df[col].iloc[rows].to_numpy(dtype=object)
+
+
+def _text(values: np.ndarray) -> np.ndarray:
+    """``str(value)`` of every value (missing values become 'nan')."""
+    return values.astype(str).astype(object) if len(values) else np.empty(0, dtype=object)
+
+
+def _optional_text(cms_df: pd.DataFrame, col: str, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(text, present): ``str(value)`` where present, '' where missing or the column is absent."""
+    values = _column_values(cms_df, col, rows)
+    if values is None:
+        return np.full(len(rows), '', dtype=object), np.zeros(len(rows), dtype=bool)
+    present = pd.notna(values)
+    text = _text(values)
+    text[~present] = ''
+    return text, present
+
+
+def _group_lists(owners: List[np.ndarray], values: List[np.ndarray], size: int) -> List[List[str]]:
+    """Lists of ``values`` per owner position, keeping the order the parts were given in."""
+    if not owners or not size:
+        return [[] for _ in range(size)]
+    owner = np.concatenate(owners)
+    value = np.concatenate(values)
+    order = np.argsort(owner, kind='stable')
+    bounds = np.cumsum(np.bincount(owner, minlength=size))[:-1]
+    return [part.tolist() for part in np.split(value[order], bounds)]
+
+
+def extract_cms_frame(cms_df: pd.DataFrame, rows: Union[np.ndarray, List[int]]) -> pd.DataFrame:
+    """
+    CMS data (CMS_DATA_FIELDS) of the given row positions, built column-wise.
+
+    Same values as the per-row ``extract_cms_data``: missing fields are '',
+    the practice address joins the present address/city/state/postal code
+    parts with ', ', and the license lists keep the non-blank license
+    numbers (and the states present next to them) in column order.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    size = len(rows)
+    frame = {}
+
+    frame['npi'] = _optional_text(cms_df, 'NPI', rows)[0]
+
+    # f"{first} {last}".strip(): a missing name prints as 'nan', an absent column as ''
+    names = []
+    for col in (FILTER_COLUMNS['first_name'], FILTER_COLUMNS['last_name']):
+        values = _column_values(cms_df, col, rows)
+        names.append(_text(values) if values is not None else np.full(size, '', dtype=object))
+    frame['full_name'] = pd.Series(names[0] + ' ' + names[1], dtype=object).str.strip().to_numpy(dtype=object)
+
+    frame['credential'] = _optional_text(cms_df, 'Provider Credential Text', rows)[0]
+
+    address = np.full(size, '', dtype=object)
+    has_part = np.zeros(size, dtype=bool)
+    for col in PRACTICE_ADDRESS_COLUMNS:
+        text, present = _optional_text(cms_df, col, rows)
+        address = np.where(present & has_part, address + ', ' + text, np.where(present, text, address))
+        has_part |= present
+    frame['practice_address'] = address
+
+    frame['practice_phone'] = _optional_text(cms_df, PHONE_PRACTICE_COLUMN, rows)[0]
+    frame['mailing_phone'] = _optional_text(cms_df, PHONE_MAILING_COLUMN, rows)[0]
+
+    positions = np.arange(size)
+    number_owners, numbers, state_owners, states = [], [], [], []
+    for number_col, state_col in zip(LICENSE_NUMBER_COLUMNS, LICENSE_STATE_COLUMNS):
+        number_text, number_present = _optional_text(cms_df, number_col, rows)
+        if not number_present.any():
+            continue
+        kept = number_present & (pd.Series(number_text, dtype=object).str.strip() != '').to_numpy()
+        number_owners.append(positions[kept])
+        numbers.append(number_text[kept])
+        state_text, state_present = _optional_text(cms_df, state_col, rows)
+        with_state = kept & state_present
+        state_owners.append(positions[with_state])
+        states.append(state_text[with_state])
+    frame['license_numbers'] = _group_lists(number_owners, numbers, size)
+    frame['license_states'] = _group_lists(state_owners, states, size)
+
+    frame['enumeration_date'] = _optional_text(cms_df, 'Provider Enumeration Date', rows)[0]
+    frame['last_update_date'] = _optional_text(cms_df, 'Last Update Date', rows)[0]
+
+    return pd.DataFrame({field: pd.Series(list(frame[field]), dtype=object) for field in CMS_DATA_FIELDS})
+
+
+def extract_cms_records(cms_df: pd.DataFrame, rows: Union[np.ndarray, List[int]]) -> List[Dict[str, Any]]:
+    """``cms_data`` dicts of the given row positions (see extract_cms_frame)."""
+    frame = extract_cms_frame(cms_df, rows)
+    columns = [frame[field].tolist() for field in CMS_DATA_FIELDS]
+    return [dict(zip(CMS_DATA_FIELDS, values)) for values in zip(*columns)]
+
+
+def extract_cms_data(cms_row: Any) -> Dict[str, Any]:
+    """Extract relevant CMS data from one matched row (a Series or dict)."""
+    return extract_cms_records(pd.DataFrame([cms_row]), [0])[0]
+
+
+# ---------------------------------------------------------------------------
+# Match records and outputs
+# ---------------------------------------------------------------------------
+
+def profile_result(profile: Dict, adapter: ProfileAdapter) -> Dict[str, Any]:
+    """Unmatched result record of a profile."""
+    return {
+        'fb_id': profile.get('id', ''),
+        'fb_name': profile.get('name', ''),
+        'fb_profile_url': profile.get('profileUrl', ''),
+        'city': profile.get('city', ''),
+        'state': profile.get('state', ''),
+        'has_nursys_licenses': len(adapter.license_entries(profile)) > 0,
+        'has_pdl_data': adapter.has_pdl_data(profile),
+        'match_found': False,
+        'match_confidence': '',
+        'match_method': '',
+        'match_evidence': None,
+        'match_margin': None,
+        'cms_data': None
+    }
+
+
+def build_match_records(
+    profiles: List[Dict],
+    resolved: pd.DataFrame,
+    cms_df: pd.DataFrame,
+    adapter: ProfileAdapter,
+) -> Tuple[List[Dict], List[Dict]]:
+    """(matches, no_matches) records in profile order from a ``resolve`` result."""
+    cms_records = extract_cms_records(cms_df, resolved['row'].to_numpy())
+    # NaN (not scored, or no other candidate) -> None
+    evidence = resolved['evidence'].astype(object).where(resolved['evidence'].notna(), None).tolist()
+    margins = resolved['margin'].astype(object).where(resolved['margin'].notna(), None).tolist()
+    by_profile = dict(zip(
+        resolved.index.tolist(),
+        zip(resolved['confidence'].tolist(), resolved['method'].tolist(), evidence, margins, cms_records),
+    ))
+
+    matches = []
+    no_matches = []
+    for pos, profile in enumerate(profiles):
+        result = profile_result(profile, adapter)
+        match = by_profile.get(pos)
+        if match is None:
+            no_matches.append(result)
+            continue
+        result['match_found'] = True
+        (result['match_confidence'], result['match_method'], result['match_evidence'],
+         result['match_margin'], result['cms_data']) = match
+        matches.append(result)
+    return matches, no_matches
+
+
+def match_profiles(
+    profiles: List[Dict],
+    cms_df: pd.DataFrame,
+    config: MatchConfig,
+    license_index: Optional[LicenseIndex] = None,
+    name_index: Optional[NameIndex] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """Match a cohort against an in-memory CMS DataFrame; returns (matches, no_matches)."""
+    keys = ProfileKeys.build(profiles, config.adapter)
+    resolved = MatchEngine(cms_df, config, license_index, name_index).resolve(keys)
+    return build_match_records(profiles, resolved, cms_df, config.adapter)
+
+
+def iter_cms_chunks(csv_file: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Chunks of a CMS CSV, from its Parquet cache when that is fresh."""
+    cache_dir = find_fresh_cache(csv_file)
+    if cache_dir:
+        return iter_cache_chunks(cache_dir, chunk_size=chunk_size)
+    return iter(pd.read_csv(csv_file, chunksize=chunk_size, low_memory=False))
+
+
+def match_profiles_streaming(
+    profiles: List[Dict],
+    chunks: Iterable[pd.DataFrame],
+    config: MatchConfig,
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Match a cohort against CMS chunks (e.g. the 9M-row data.csv), stopping
+    early once every profile is matched. Needs ``priority='row'``, whose
+    result does not depend on where the chunks are cut.
+    """
+    if config.priority != 'row':
+        raise MatchConfigError("Streaming needs priority 'row' (the first CMS row with a hit wins)")
+    if config.name_match != 'exact':
+        raise MatchConfigError("Streaming needs name_match 'exact' (substring indexes are per chunk)")
+
+    keys = ProfileKeys.build(profiles, config.adapter)
+    matched = np.zeros(len(profiles), dtype=bool)
+    outcomes: Dict[int, Tuple[str, str, Dict]] = {}
+    for chunk in chunks:
+        resolved = MatchEngine(chunk, config).resolve(keys.subset(np.flatnonzero(~matched)))
+        if not resolved.empty:
+            cms_records = extract_cms_records(chunk, resolved['row'].to_numpy())
+            for profile, confidence, method, cms_data in zip(
+                resolved.index.tolist(), resolved['confidence'].tolist(), resolved['method'].tolist(), cms_records
+            ):
+                outcomes[profile] = (confidence, method, cms_data)
+            matched[resolved.index.to_numpy()] = True
+        if matched.all():
+            break
+
+    matches = []
+    no_matches = []
+    for pos, profile in enumerate(profiles):
+        result = profile_result(profile, config.adapter)
+        if pos in outcomes:
+            result['match_found'] = True
+            result['match_confidence'], result['match_method'], result['cms_data'] = outcomes[pos]
+            matches.append(result)
+        else:
+            no_matches.append(result)
+    return matches, no_matches
+
+
+def matches_frame(matches: List[Dict]) -> pd.DataFrame:
+    """The matches CSV (profile columns, then the CMS columns), built column-wise."""
+    frame = pd.DataFrame({
+        'Facebook ID': [m['fb_id'] for m in matches],
+        'Facebook Name': [m['fb_name'] for m in matches],
+        'Profile URL': [m['fb_profile_url'] for m in matches],
+        'City': [m['city'] for m in matches],
+        'State': [m['state'] for m in matches],
+        'Match Confidence': [m['match_confidence'] for m in matches],
+        'Match Method': [m['match_method'] for m in matches],
+        'Match Evidence': [m.get('match_evidence') for m in matches],
+        'Match Margin': [m.get('match_margin') for m in matches],
+        'Has Nursys Licenses': [m['has_nursys_licenses'] for m in matches],
+        'Has PDL Data': [m['has_pdl_data'] for m in matches],
+    })
+    cms = pd.DataFrame([m['cms_data'] for m in matches], columns=CMS_DATA_FIELDS)
+    frame['CMS NPI'] = cms['npi'].to_numpy()
+    frame['CMS Full Name'] = cms['full_name'].to_numpy()
+    frame['CMS Credential'] = cms['credential'].to_numpy()
+    frame['CMS Practice Address'] = cms['practice_address'].to_numpy()
+    frame['CMS Practice Phone'] = cms['practice_phone'].to_numpy()
+    frame['CMS Mailing Phone'] = cms['mailing_phone'].to_numpy()
+    frame['CMS License Numbers'] = cms['license_numbers'].str.join(', ').to_numpy()
+    frame['CMS License States'] = cms['license_states'].str.join(', ').to_numpy()
+    frame['CMS Enumeration Date'] = cms['enumeration_date'].to_numpy()
+    frame['CMS Last Update Date'] = cms['last_update_date'].to_numpy()
+    return frame
+
+
+def no_matches_frame(no_matches: List[Dict]) -> pd.DataFrame:
+    """The no-matches CSV."""
+    return pd.DataFrame({
+        'Facebook ID': [nm['fb_id'] for nm in no_matches],
+        'Facebook Name': [nm['fb_name'] for nm in no_matches],
+        'Profile URL': [nm['fb_profile_url'] for nm in no_matches],
+        'City': [nm['city'] for nm in no_matches],
+        'State': [nm['state'] for nm in no_matches],
+        'Has Nursys Licenses': [nm['has_nursys_licenses'] for nm in no_matches],
+        'Has PDL Data': [nm['has_pdl_data'] for nm in no_matches],
+    })
+
+
+def cms_match_record(match: Optional[Dict]) -> Dict[str, Any]:
+    """The ``cmsMatch`` object written into an enriched profile."""
+    if match is None:
+        return {'found': False}
+    cms_data = match['cms_data']
+    return {
+        'found': True,
+        'confidence': match['match_confidence'],
+        'matchMethod': match['match_method'],
+        'npi': cms_data['npi'] if cms_data else '',
+        'fullName': cms_data['full_name'] if cms_data else '',
+        'credential': cms_data['credential'] if cms_data else '',
+        'practiceAddress': cms_data['practice_address'] if cms_data else '',
+        'practicePhone': cms_data['practice_phone'] if cms_data else '',
+        'mailingPhone': cms_data['mailing_phone'] if cms_data else '',
+        'licenseNumbers': cms_data['license_numbers'] if cms_data else [],
+        'licenseStates': cms_data['license_states'] if cms_data else [],
+        'enumerationDate': cms_data['enumeration_date'] if cms_data else '',
+        'lastUpdateDate': cms_data['last_update_date'] if cms_data else ''
+    }
+
+
+def write_enriched_profiles(
+    profiles: Iterable[Dict],
+    matches: List[Dict],
+    output_file: str,
+    fmt: str = 'json',
+    drop_pdl: bool = False,
+) -> int:
+    """
+    Write the full profiles with a ``cmsMatch`` object, one at a time.
+
+    Returns:
+        Number of profiles written
+    """
+    match_lookup = {m['fb_id']: m for m in matches}
+    with ProfileWriter(output_file, fmt) as writer:
+        for profile in profiles:
+            if drop_pdl:
+                profile = drop_fields(profile, HEAVY_PDL_FIELDS)
+            writer.write(dict(profile, cmsMatch=cms_match_record(match_lookup.get(profile.get('id', '')))))
+    return writer.count
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Match a cohort of scraped nurse profiles against CMS data.',
+        epilog='Example: python match_engine.py denver.json data.csv --preset denver --streaming',
+    )
+    parser.add_argument('cohort', help='Profiles file (JSON array or JSON Lines)')
+    parser.add_argument('cms_source', help='CMS CSV: a process_nurses.py extract, or data.csv with --streaming')
+    parser.add_argument('--preset', choices=sorted(MATCH_PRESETS), default='phoenix',
+                        help='Matching preset from config.MATCH_PRESETS (default: phoenix)')
+    parser.add_argument('--adapter', choices=sorted(ADAPTERS), help='Override the JSON shape of the profiles')
+    parser.add_argument('--name-match', choices=NAME_MATCH_MODES, help='Override how names are matched')
+    parser.add_argument('--tiers', help=f"Override the tiers, comma-separated in priority order ({', '.join(TIER_CONFIDENCE)})")
+    parser.add_argument('--priority', choices=MATCH_PRIORITIES, help='Override whether the best tier or the first row wins')
+    parser.add_argument('--decompose-names', action=argparse.BooleanOptionalAction,
+                        help="Override whether multi-token names ('Ann Marie Barton') are tried as (first, middle, last) readings")
+    parser.add_argument('--streaming', action='store_true',
+                        help='Read the CMS source in chunks (for data.csv; needs priority row and exact names)')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='Rows per chunk with --streaming (default: 50000)')
+    parser.add_argument('--output-prefix', help='Prefix of the output files (default: the preset name)')
+    parser.add_argument('--enriched-format', choices=PROFILE_FORMATS, default='json',
+                        help='Enriched output: pretty-printed JSON array (default) or compact JSON Lines')
+    parser.add_argument('--drop-pdl', action='store_true',
+                        help='Leave the heavy PDL subtrees out of the enriched output')
+    parser.add_argument('--no-enrich', action='store_true', help='Only write the CSV results')
+    args = parser.parse_args(argv)
+
+    for path in (args.cohort, args.cms_source):
+        if not os.path.exists(path):
+            print(f"❌ Error: {path} not found")
+            return 1
+
+    try:
+        config = MatchConfig.preset(
+            args.preset,
+            adapter=args.adapter,
+            name_match=args.name_match,
+            tiers=[tier.strip() for tier in args.tiers.split(',')] if args.tiers else None,
+            priority=args.priority,
+            decompose_names=args.decompose_names,
+        )
+        if args.streaming and (config.priority != 'row' or config.name_match != 'exact'):
+            raise MatchConfigError("--streaming needs --priority row and --name-match exact (the denver preset)")
+    except MatchConfigError as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    prefix = args.output_prefix or args.preset
+    print(f"📂 Loading {args.cohort}...")
+    profiles = load_profiles(args.cohort, config.adapter.fields)
+    print(f"✅ {len(profiles):,} profiles loaded ({config.describe()})\n")
+
+    if args.streaming:
+        print(f"📊 Streaming {args.cms_source} in chunks of {args.chunk_size:,} rows...")
+        matches, no_matches = match_profiles_streaming(
+            profiles, iter_cms_chunks(args.cms_source, args.chunk_size), config
+        )
+    else:
+        print(f"📂 Loading {args.cms_source}...")
+        cms_df = pd.read_csv(args.cms_source, low_memory=False)
+        print(f"✅ {len(cms_df):,} CMS records loaded\n")
+        matches, no_matches = match_profiles(profiles, cms_df, config)
+
+    by_confidence = pd.Series([m['match_confidence'] for m in matches], dtype=object).value_counts()
+    print(f"\n✅ {len(matches):,} matches, {len(no_matches):,} without match")
+    for confidence in ('CONFIRMED', 'HIGH', 'MEDIUM', 'LOW'):
+        print(f"  {confidence}: {by_confidence.get(confidence, 0):,}")
+
+    print(f"\n💾 Saving results...")
+    if matches:
+        matches_frame(matches).to_csv(f'{prefix}_matches.csv', index=False)
+        print(f"  ✅ {prefix}_matches.csv ({len(matches)} records)")
+    if no_matches:
+        no_matches_frame(no_matches).to_csv(f'{prefix}_no_matches.csv', index=False)
+        print(f"  ✅ {prefix}_no_matches.csv ({len(no_matches)} records)")
+    if not args.no_enrich:
+        output_file = f'{prefix}_nurses_enriched.{args.enriched_format}'
+        # The loaded profiles are projected; the enriched file gets the full ones
+        write_enriched_profiles(iter_profiles(args.cohort), matches, output_file, args.enriched_format, args.drop_pdl)
+        print(f"  ✅ {output_file} saved")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n👋 Program interrupted. Goodbye!\n")
+        sys.exit(0)
@@ -0,0 +1,240 @@
+"""
+Per-stage timing and throughput metrics for the chunked pipelines.
+
+A ``PipelineMetrics`` collects, for every chunk, the time spent in each
+stage (read/parse, taxonomy mask, each extra filter, projection, write, ...),
+rows in/out, the input bytes the chunk consumed and the peak RSS. Input bytes
+are measured by the pipeline itself (file offsets, byte ranges or the file
+size of a whole-file scan), so they hold for mmap-based readers and worker
+processes too. ``process_rchar_bytes`` is only the process's own read()
+counter and is reported separately. Records are written
+either as JSON lines (one line per chunk plus a summary line) or as a
+Prometheus text file that is rewritten after each chunk, e.g. for the
+node_exporter textfile collector:
+
+    metrics = PipelineMetrics.open('run.jsonl', pipeline='filter_nurses_polars')
+    for chunk in chunks:
+        metrics.start_chunk()
+        with metrics.stage('read'):
+            ...
+        metrics.end_chunk(rows_in=..., rows_out=..., input_bytes=...)
+    metrics.close()
+
+Code that takes an optional metrics object uses ``NULL_METRICS`` by default,
+whose stages cost nothing.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_FORMATS = ('jsonl', 'prometheus')
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, in bytes (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def process_rchar_bytes() -> Optional[int]:
+    """
+    Bytes passed to read() by this process so far (Linux /proc/self/io
+    ``rchar``), or None. Excludes mmap reads and child processes and includes
+    unrelated reads, so it is not a measure of the input consumed.
+    """
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def infer_format(path: str) -> str:
+    """Pick the output format from the file extension (.prom -> prometheus)."""
+    return 'prometheus' if path.endswith(('.prom', '.txt')) else 'jsonl'
+
+
+class PipelineMetrics:
+    """Collects per-chunk stage timings and writes them as JSON lines or Prometheus text."""
+
+    def __init__(self, path: Optional[str] = None, pipeline: str = 'pipeline', fmt: Optional[str] = None):
+        self.path = path
+        self.pipeline = pipeline
+        self.format = fmt or (infer_format(path) if path else 'jsonl')
+        if self.format not in METRICS_FORMATS:
+            raise ValueError(f"Unknown metrics format '{self.format}' (use one of {', '.join(METRICS_FORMATS)})")
+
+        self.enabled = path is not None
+        self.chunks = 0
+        self.rows_in = 0
+        self.rows_out = 0
+        self.input_bytes: Optional[int] = None
+        self.stage_totals: Dict[str, float] = {}
+        self._chunk_stages: Dict[str, float] = {}
+        self._start_time = time.perf_counter()
+        self._start_rchar = process_rchar_bytes()
+        self._file = None
+        if self.enabled and self.format == 'jsonl':
+            self._file = open(path, 'a', encoding='utf-8')
+
+    @classmethod
+    def open(cls, path: Optional[str], pipeline: str, fmt: Optional[str] = None) -> 'PipelineMetrics':
+        """Metrics writing to ``path``, or ``NULL_METRICS`` when no path is given."""
+        if not path:
+            return NULL_METRICS
+        return cls(path, pipeline, fmt)
+
+    def start_chunk(self) -> None:
+        """Begin timing a new chunk."""
+        self._chunk_stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time a stage of the current chunk (stages can repeat; times add up)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._chunk_stages[name] = self._chunk_stages.get(name, 0.0) + elapsed
+
+    def end_chunk(self, rows_in: Optional[int], rows_out: int, input_bytes: Optional[int] = None) -> None:
+        """
+        Record the finished chunk and write it out. ``rows_in`` is None when
+        the input was not counted; ``input_bytes`` is None when the reader
+        does not expose how much of the input the chunk consumed.
+        """
+        self.chunks += 1
+        self.rows_in = None if rows_in is None or self.rows_in is None else self.rows_in + rows_in
+        self.rows_out += rows_out
+        for name, seconds in self._chunk_stages.items():
+            self.stage_totals[name] = self.stage_totals.get(name, 0.0) + seconds
+        self.add_input_bytes(input_bytes)
+
+        if self.format == 'jsonl':
+            self._write_line({
+                'ts': time.time(),
+                'pipeline': self.pipeline,
+                'chunk': self.chunks,
+                'rows_in': rows_in,
+                'rows_out': rows_out,
+                'input_bytes': input_bytes,
+                'peak_rss_bytes': peak_rss_bytes(),
+                'stages': {name: round(seconds, 6) for name, seconds in self._chunk_stages.items()},
+            })
+        else:
+            self._write_prometheus()
+
+    def add_input_bytes(self, input_bytes: Optional[int]) -> None:
+        """
+        Count input bytes not tied to one chunk, e.g. the file size after a
+        whole-file scan whose reader has no offsets (None is ignored).
+        """
+        if input_bytes is not None:
+            self.input_bytes = (self.input_bytes or 0) + input_bytes
+
+    def summary(self) -> Dict:
+        """Totals for the whole run."""
+        elapsed = time.perf_counter() - self._start_time
+        now_rchar = process_rchar_bytes()
+        return {
+            'pipeline': self.pipeline,
+            'chunks': self.chunks,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'input_bytes': self.input_bytes,
+            'elapsed_seconds': round(elapsed, 6),
+            'rows_per_second': round(self.rows_in / elapsed, 1) if elapsed > 0 and self.rows_in is not None else None,
+            'input_bytes_per_second': round(self.input_bytes / elapsed, 1) if elapsed > 0 and self.input_bytes is not None else None,
+            'process_rchar_bytes': (
+                now_rchar - self._start_rchar if now_rchar is not None and self._start_rchar is not None else None
+            ),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'stages': {name: round(seconds, 6) for name, seconds in self.stage_totals.items()},
+        }
+
+    def close(self) -> Dict:
+        """Write the summary and close the output; returns the summary."""
+        summary = self.summary()
+        if self.format == 'jsonl':
+            self._write_line(dict(summary, summary=True, ts=time.time()))
+            self._file.close()
+        else:
+            self._write_prometheus()
+        return summary
+
+    def _write_line(self, record: Dict) -> None:
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def _write_prometheus(self) -> None:
+        summary = self.summary()
+        label = f'pipeline="{self.pipeline}"'
+        lines = [
+            '# HELP nurses_stage_seconds_total Time spent per pipeline stage.',
+            '# TYPE nurses_stage_seconds_total counter',
+        ]
+        for name, seconds in summary['stages'].items():
+            lines.append(f'nurses_stage_seconds_total{{{label},stage="{name}"}} {seconds}')
+        counters = [
+            ('nurses_chunks_total', 'Chunks processed.', summary['chunks']),
+            ('nurses_rows_in_total', 'Input rows processed.', summary['rows_in']),
+            ('nurses_rows_out_total', 'Rows kept by the filters.', summary['rows_out']),
+            ('nurses_input_bytes_total', 'Input file bytes consumed by the pipeline.', summary['input_bytes']),
+            ('nurses_process_rchar_bytes_total', 'Bytes passed to read() by this process (/proc/self/io rchar; '
+             'excludes mmap reads and worker processes).', summary['process_rchar_bytes']),
+        ]
+        gauges = [
+            ('nurses_elapsed_seconds', 'Wall time since the run started.', summary['elapsed_seconds']),
+            ('nurses_peak_rss_bytes', 'Peak resident set size of the process.', summary['peak_rss_bytes']),
+        ]
+        for metric_type, metrics in (('counter', counters), ('gauge', gauges)):
+            for name, help_text, value in metrics:
+                if value is None:
+                    continue
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}', f'{name}{{{label}}} {value}']
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, self.path)
+
+
+class _NullMetrics(PipelineMetrics):
+    """Metrics sink that records nothing."""
+
+    def __init__(self):
+        super().__init__(None, 'null')
+
+    def start_chunk(self) -> None:
+        pass
+
+    def stage(self, name: str):
+        return contextlib.nullcontext()
+
+    def end_chunk(self, rows_in: Optional[int], rows_out: int, input_bytes: Optional[int] = None) -> None:
+        pass
+
+    def add_input_bytes(self, input_bytes: Optional[int]) -> None:
+        pass
+
+    def close(self) -> Dict:
+        return {}
+
+
+NULL_METRICS = _NullMetrics()
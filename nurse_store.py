@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Persistent NPI-keyed store of a process_nurses.py output.
+
+``view_nurses.py`` and the compare scripts read the whole nurses.csv with
+``pd.read_csv`` even to look up one NPI or license. The store is a SQLite
+file built once from the CSV (nurses.csv -> nurses.sqlite):
+
+    nurses    one row per NPI (primary key) with every CSV column, plus
+              normalized first/last name, city and state key columns
+    licenses  (license, state) -> NPI, normalized like cms_index.LicenseIndex
+    phones    normalized practice/mailing phone -> NPI
+
+with secondary indexes on license (+ state), (last, first) name,
+(state, city) and phone, so each lookup is an index search instead of a
+full load:
+
+    from nurse_store import open_store
+    with open_store('nurses.csv') as store:
+        store.get('1234567890')
+        store.by_license('RN123456', state='AZ')
+        store.by_name('SMITH', 'JANE')
+        store.by_location(state='AZ', city='PHOENIX')
+        store.by_phone('(602) 555-1234')
+
+Lookups return records (dicts keyed by the CSV column names) in file order,
+like ``cms_df.iloc[rows].to_dict('records')``, except that values are the
+CSV text (None when empty) rather than Pandas-inferred numbers. The store
+records the CSV's fingerprint; ``open_store`` rebuilds it when the CSV
+changed.
+
+Command line:
+
+    python nurse_store.py build nurses.csv
+    python nurse_store.py lookup nurses.csv --license RN123456 --state AZ
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from cms_index import (
+    melt_licenses,
+    normalize_license,
+    normalize_name,
+    normalize_name_series,
+    normalize_phone,
+    normalize_phone_series,
+    normalize_state,
+)
+from config import (
+    DEFAULT_CHUNK_SIZE,
+    FILTER_COLUMNS,
+    NURSE_STORE_SUFFIX,
+    PHONE_MAILING_COLUMN,
+    PHONE_PRACTICE_COLUMN,
+)
+from parquet_cache import compute_fingerprint
+
+STORE_VERSION = 1
+
+# Normalized key columns of the nurses table (source column in FILTER_COLUMNS)
+KEY_COLUMNS = {
+    '_first_name': 'first_name',
+    '_last_name': 'last_name',
+    '_city': 'city',
+    '_state': 'state',
+}
+
+PHONE_COLUMNS = {
+    'practice': PHONE_PRACTICE_COLUMN,
+    'mailing': PHONE_MAILING_COLUMN,
+}
+
+
+def get_store_file(csv_file: str) -> str:
+    """Default store for a nurses CSV (nurses.csv -> nurses.sqlite)."""
+    return os.path.splitext(csv_file)[0] + NURSE_STORE_SUFFIX
+
+
+def _quote(column: str) -> str:
+    """Quote a CSV column name for SQL ('Provider First Name' -> "Provider First Name")."""
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _records(frame: pd.DataFrame) -> Iterator[tuple]:
+    """Rows of a DataFrame as tuples, with missing values as None."""
+    return frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+
+
+def _create_schema(conn: sqlite3.Connection, columns: List[str]) -> None:
+    data_columns = ', '.join(f'{_quote(col)} TEXT' for col in columns if col != 'NPI')
+    key_columns = ', '.join(f'{key} TEXT' for key in KEY_COLUMNS)
+    conn.executescript(f'''
+        CREATE TABLE store_meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE nurses ("NPI" TEXT PRIMARY KEY, {data_columns}, {key_columns});
+        CREATE TABLE licenses (npi TEXT NOT NULL, license TEXT NOT NULL, state TEXT NOT NULL);
+        CREATE TABLE phones (npi TEXT NOT NULL, phone TEXT NOT NULL, kind TEXT NOT NULL);
+    ''')
+
+
+def _create_indexes(conn: sqlite3.Connection) -> None:
+    # Built after the bulk load, which is much faster than maintaining them row by row
+    conn.executescript('''
+        CREATE INDEX idx_licenses_license ON licenses (license, state);
+        CREATE INDEX idx_nurses_name ON nurses (_last_name, _first_name);
+        CREATE INDEX idx_nurses_location ON nurses (_state, _city);
+        CREATE INDEX idx_phones_phone ON phones (phone);
+    ''')
+
+
+def build_store(csv_file: str, store_file: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """
+    Build (or rebuild) the store for a process_nurses.py output.
+
+    The store is written to a temporary file and renamed, so readers never
+    see a half-built store.
+
+    Args:
+        csv_file: nurses CSV written by process_nurses.py
+        store_file: SQLite file to write (default: get_store_file(csv_file))
+        chunk_size: CSV rows loaded per batch
+
+    Returns:
+        The store metadata (source, fingerprint, rows, columns, ...)
+    """
+    store_file = store_file or get_store_file(csv_file)
+    tmp_file = store_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    start_time = time.time()
+    conn = sqlite3.connect(tmp_file)
+    # The temporary file is thrown away if the build fails, so skip the journal
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+
+    columns = None
+    total_rows = 0
+    for chunk in pd.read_csv(csv_file, dtype=str, chunksize=chunk_size):
+        if columns is None:
+            columns = list(chunk.columns)
+            if 'NPI' not in columns:
+                conn.close()
+                os.remove(tmp_file)
+                raise ValueError(f"{csv_file} has no NPI column")
+            _create_schema(conn, columns)
+            insert_nurse = (
+                f'INSERT OR REPLACE INTO nurses ({", ".join(_quote(col) for col in columns)}, '
+                f'{", ".join(KEY_COLUMNS)}) VALUES ({", ".join("?" * (len(columns) + len(KEY_COLUMNS)))})'
+            )
+
+        chunk = chunk[chunk['NPI'].notna()].reset_index(drop=True)
+        chunk['NPI'] = chunk['NPI'].str.strip()
+        npis = chunk['NPI'].to_numpy()
+
+        keys = pd.DataFrame(index=chunk.index)
+        for key, filter_name in KEY_COLUMNS.items():
+            source = FILTER_COLUMNS[filter_name]
+            keys[key] = normalize_name_series(chunk[source]) if source in chunk.columns else ''
+        conn.executemany(insert_nurse, _records(pd.concat([chunk, keys], axis=1)))
+
+        licenses = melt_licenses(chunk)
+        conn.executemany(
+            'INSERT INTO licenses (npi, license, state) VALUES (?, ?, ?)',
+            zip(npis[licenses['row'].to_numpy(dtype=int)], licenses['license'], licenses['state']),
+        )
+
+        for kind, column in PHONE_COLUMNS.items():
+            if column not in chunk.columns:
+                continue
+            phones = normalize_phone_series(chunk[column])
+            present = (phones != '').to_numpy()
+            conn.executemany(
+                'INSERT INTO phones (npi, phone, kind) VALUES (?, ?, ?)',
+                ((npi, phone, kind) for npi, phone in zip(npis[present], phones.to_numpy()[present])),
+            )
+
+        total_rows += len(chunk)
+        print(f"  Loaded {total_rows:,} nurses")
+
+    if columns is None:
+        conn.close()
+        os.remove(tmp_file)
+        raise ValueError(f"{csv_file} is empty")
+
+    _create_indexes(conn)
+    meta = {
+        'version': STORE_VERSION,
+        'source': os.path.abspath(csv_file),
+        'fingerprint': compute_fingerprint(csv_file),
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'rows': conn.execute('SELECT COUNT(*) FROM nurses').fetchone()[0],
+        'columns': columns,
+    }
+    conn.executemany(
+        'INSERT INTO store_meta (key, value) VALUES (?, ?)',
+        ((key, json.dumps(value)) for key, value in meta.items()),
+    )
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+    os.replace(tmp_file, store_file)
+
+    meta['build_seconds'] = round(time.time() - start_time, 2)
+    return meta
+
+
+def load_store_meta(store_file: str) -> Optional[Dict]:
+    """Metadata of a store, or None if there is no usable store."""
+    if not os.path.exists(store_file):
+        return None
+    try:
+        conn = sqlite3.connect(f'file:{store_file}?mode=ro', uri=True)
+        try:
+            rows = conn.execute('SELECT key, value FROM store_meta').fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    meta = {key: json.loads(value) for key, value in rows}
+    if meta.get('version') != STORE_VERSION:
+        return None
+    return meta
+
+
+def is_store_fresh(csv_file: str, store_file: Optional[str] = None) -> bool:
+    """Check whether the store exists and was built from the current CSV."""
+    meta = load_store_meta(store_file or get_store_file(csv_file))
+    if meta is None or not os.path.exists(csv_file):
+        return False
+    return meta['fingerprint'] == compute_fingerprint(csv_file)
+
+
+class NurseStore:
+    """Read-only query API over a store built by ``build_store``."""
+
+    def __init__(self, store_file: str):
+        meta = load_store_meta(store_file)
+        if meta is None:
+            raise FileNotFoundError(f"No nurse store at {store_file} (build it with: python nurse_store.py build)")
+        self.store_file = store_file
+        self.meta = meta
+        self.columns: List[str] = meta['columns']
+        self._conn = sqlite3.connect(f'file:{store_file}?mode=ro', uri=True, check_same_thread=False)
+        self._select = f'SELECT {", ".join(_quote(col) for col in self.columns)} FROM nurses'
+
+    def __len__(self) -> int:
+        return self.meta['rows']
+
+    def __enter__(self) -> 'NurseStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _query(self, where: str, params: tuple, limit: Optional[int] = None) -> List[Dict]:
+        sql = f'{self._select} WHERE {where} ORDER BY nurses.rowid'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return [dict(zip(self.columns, row)) for row in self._conn.execute(sql, params)]
+
+    def get(self, npi) -> Optional[Dict]:
+        """The record of an NPI, or None."""
+        rows = self._query('"NPI" = ?', (str(npi).strip(),))
+        return rows[0] if rows else None
+
+    def get_many(self, npis: List) -> List[Dict]:
+        """Records of several NPIs (missing ones are skipped), in file order."""
+        npis = [str(npi).strip() for npi in npis]
+        # Stay below SQLite's limit on bound parameters. Each batch is sorted on
+        # its own, so the rowids are collected first and fetched in order.
+        rowids = []
+        for start in range(0, len(npis), 900):
+            batch = npis[start:start + 900]
+            sql = f'SELECT rowid FROM nurses WHERE "NPI" IN ({", ".join("?" * len(batch))})'
+            rowids += [rowid for (rowid,) in self._conn.execute(sql, tuple(batch))]
+        rowids = sorted(set(rowids))
+        records = []
+        for start in range(0, len(rowids), 900):
+            batch = rowids[start:start + 900]
+            records += self._query(f'nurses.rowid IN ({", ".join("?" * len(batch))})', tuple(batch))
+        return records
+
+    def by_license(self, license_number: str, state: Optional[str] = None) -> List[Dict]:
+        """
+        Nurses holding a license (normalized like normalize_license: RN/LP/PN/TEMP
+        prefixes dropped), optionally only when issued by ``state`` (name or code).
+        """
+        license_key = normalize_license(license_number)
+        if not license_key:
+            return []
+        if state:
+            return self._query(
+                '"NPI" IN (SELECT npi FROM licenses WHERE license = ? AND state = ?)',
+                (license_key, normalize_state(state)),
+            )
+        return self._query('"NPI" IN (SELECT npi FROM licenses WHERE license = ?)', (license_key,))
+
+    def by_name(
+        self,
+        last_name: str,
+        first_name: Optional[str] = None,
+        prefix: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Nurses by last (and optionally first) name, compared normalized.
+
+        Args:
+            last_name: Last name (exact, or the start of it with ``prefix``)
+            first_name: First name (exact, or the start of it with ``prefix``)
+            prefix: Match names starting with the given text
+            limit: Maximum number of records
+        """
+        conditions, params = [], []
+        for key, value in (('_last_name', last_name), ('_first_name', first_name)):
+            value = normalize_name(value)
+            if not value:
+                continue
+            if prefix:
+                # Range scan on the index: value <= name < value with its last char incremented
+                conditions.append(f'{key} >= ? AND {key} < ?')
+                params += [value, value[:-1] + chr(ord(value[-1]) + 1)]
+            else:
+                conditions.append(f'{key} = ?')
+                params.append(value)
+        if not conditions:
+            return []
+        return self._query(' AND '.join(conditions), tuple(params), limit)
+
+    def by_location(
+        self,
+        state: Optional[str] = None,
+        city: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Nurses by practice location state (name or code) and/or city (exact, case-insensitive)."""
+        conditions, params = [], []
+        if state:
+            conditions.append('_state = ?')
+            params.append(normalize_state(state))
+        if city:
+            conditions.append('_city = ?')
+            params.append(normalize_name(city))
+        if not conditions:
+            return []
+        return self._query(' AND '.join(conditions), tuple(params), limit)
+
+    def by_phone(self, phone, kind: Optional[str] = None) -> List[Dict]:
+        """Nurses whose practice or mailing phone (``kind``: 'practice'/'mailing') is ``phone``."""
+        phone_key = normalize_phone(phone)
+        if not phone_key:
+            return []
+        if kind:
+            return self._query(
+                '"NPI" IN (SELECT npi FROM phones WHERE phone = ? AND kind = ?)', (phone_key, kind)
+            )
+        return self._query('"NPI" IN (SELECT npi FROM phones WHERE phone = ?)', (phone_key,))
+
+    def to_frame(self, records: List[Dict]) -> pd.DataFrame:
+        """Records as a DataFrame with the CSV's column order."""
+        return pd.DataFrame.from_records(records, columns=self.columns)
+
+
+def open_store(csv_file: str, store_file: Optional[str] = None, rebuild: bool = True) -> NurseStore:
+    """
+    Open the store of a nurses CSV, building it first when it is missing or
+    stale (unless ``rebuild`` is False).
+    """
+    store_file = store_file or get_store_file(csv_file)
+    if rebuild and not is_store_fresh(csv_file, store_file):
+        print(f"Building nurse store {store_file} from {csv_file}...")
+        build_store(csv_file, store_file)
+    return NurseStore(store_file)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Build and query the NPI-keyed nurse store.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build the store from a nurses CSV')
+    build_parser.add_argument('csv_file', help='CSV written by process_nurses.py')
+    build_parser.add_argument('--store', help='Store file (default: <csv>.sqlite)')
+    build_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                              help=f'Rows loaded per batch (default: {DEFAULT_CHUNK_SIZE:,})')
+
+    lookup_parser = subparsers.add_parser('lookup', help='Look nurses up (builds the store when needed)')
+    lookup_parser.add_argument('csv_file', help='CSV written by process_nurses.py')
+    lookup_parser.add_argument('--store', help='Store file (default: <csv>.sqlite)')
+    lookup_parser.add_argument('--npi', help='NPI')
+    lookup_parser.add_argument('--license', help='License number')
+    lookup_parser.add_argument('--last-name', help='Last name (exact)')
+    lookup_parser.add_argument('--first-name', help='First name (exact, with --last-name)')
+    lookup_parser.add_argument('--city', help='Practice city (exact)')
+    lookup_parser.add_argument('--state', help='Practice state, or the license state with --license')
+    lookup_parser.add_argument('--phone', help='Practice or mailing phone')
+    lookup_parser.add_argument('--limit', type=int, default=20, help='Maximum records shown (default: 20)')
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.csv_file):
+        print(f"Erro: Arquivo '{args.csv_file}' não encontrado.")
+        return 1
+
+    if args.command == 'build':
+        store_file = args.store or get_store_file(args.csv_file)
+        print(f"Building nurse store {store_file} from {args.csv_file}...")
+        meta = build_store(args.csv_file, store_file, args.chunk_size)
+        print(f"\nStore built: {meta['rows']:,} nurses in {meta['build_seconds']:.1f}s")
+        print(f"Store size: {os.path.getsize(store_file) / 1024 / 1024:.2f} MB")
+        return 0
+
+    with open_store(args.csv_file, args.store) as store:
+        start_time = time.perf_counter()
+        if args.npi:
+            record = store.get(args.npi)
+            records = [record] if record else []
+        elif args.license:
+            records = store.by_license(args.license, args.state)
+        elif args.last_name:
+            records = store.by_name(args.last_name, args.first_name)
+        elif args.phone:
+            records = store.by_phone(args.phone)
+        elif args.city or args.state:
+            records = store.by_location(args.state, args.city)
+        else:
+            print("Erro: informe --npi, --license, --last-name, --phone, --city ou --state")
+            return 1
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        for record in records[:args.limit]:
+            print(f"{record['NPI']}  {record.get(FILTER_COLUMNS['first_name']) or ''} "
+                  f"{record.get(FILTER_COLUMNS['last_name']) or ''}  "
+                  f"{record.get(FILTER_COLUMNS['city']) or ''}, {record.get(FILTER_COLUMNS['state']) or ''}")
+        if len(records) > args.limit:
+            print(f"... {len(records) - args.limit:,} more")
+        print(f"\n{len(records):,} record(s) in {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Byte-range helpers for scanning one large CSV file from several processes.
+
+The file is split into contiguous byte ranges that always start and end on a
+record boundary, so every worker can parse its own range independently. Quoted
+fields may contain embedded newlines; a newline only counts as a record
+boundary when the number of quote characters seen since the start of the data
+is even (an escaped quote ``""`` adds two, so it never changes the parity).
+"""
+
+import io
+import os
+from typing import List, Tuple
+
+# Bytes read at a time while looking for record boundaries
+SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def read_header_bytes(file_path: str) -> Tuple[bytes, int]:
+    """
+    Read the raw header line of a CSV file.
+
+    Returns:
+        (header_bytes, data_start_offset)
+    """
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        return header, f.tell()
+
+
+def split_csv_ranges(file_path: str, num_ranges: int) -> List[Tuple[int, int]]:
+    """
+    Split the data section of a CSV file into newline-aligned byte ranges.
+
+    The whole file is scanned once with ``bytes.count``/``bytes.find`` to keep
+    track of the quote parity, so newlines inside quoted fields are never used
+    as split points.
+
+    Args:
+        file_path: Path to the CSV file
+        num_ranges: Desired number of ranges (fewer are returned for tiny files)
+
+    Returns:
+        List of (start, end) byte offsets, in file order, covering every record
+    """
+    file_size = os.path.getsize(file_path)
+    _, data_start = read_header_bytes(file_path)
+
+    if num_ranges <= 1 or file_size <= data_start:
+        return [(data_start, file_size)] if file_size > data_start else []
+
+    span = file_size - data_start
+    targets = [data_start + span * i // num_ranges for i in range(1, num_ranges)]
+    boundaries = [data_start]
+
+    with open(file_path, 'rb') as f:
+        f.seek(data_start)
+        offset = data_start
+        quote_parity = 0
+        t = 0
+
+        while t < len(targets):
+            block = f.read(SCAN_BLOCK_SIZE)
+            if not block:
+                break
+
+            pos = 0
+            while t < len(targets):
+                rel_target = max(targets[t], boundaries[-1]) - offset
+                if rel_target > len(block):
+                    break
+
+                # Fast-forward to the target, keeping track of quote parity
+                if pos < rel_target:
+                    quote_parity ^= block.count(b'"', pos, rel_target) & 1
+                    pos = rel_target
+
+                newline = block.find(b'\n', pos)
+                if newline == -1:
+                    break
+
+                quote_parity ^= block.count(b'"', pos, newline) & 1
+                pos = newline + 1
+
+                # Newline outside of quotes: this is a record boundary
+                if quote_parity == 0:
+                    if offset + pos > boundaries[-1]:
+                        boundaries.append(offset + pos)
+                    t += 1
+
+            quote_parity ^= block.count(b'"', pos) & 1
+            offset += len(block)
+
+    if boundaries[-1] < file_size:
+        boundaries.append(file_size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+class CsvRangeReader(io.RawIOBase):
+    """
+    Read-only stream over ``header + file[start:end]``.
+
+    Lets a CSV parser (e.g. ``pd.read_csv(..., chunksize=...)``) stream a
+    single byte range as if it were a complete CSV file with its own header.
+    """
+
+    def __init__(self, file_path: str, header: bytes, start: int, end: int):
+        super().__init__()
+        self._file = open(file_path, 'rb')
+        self._file.seek(start)
+        self._header = memoryview(header)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._header:
+            n = min(len(buffer), len(self._header))
+            buffer[:n] = self._header[:n]
+            self._header = self._header[n:]
+            return n
+
+        if self._remaining <= 0:
+            return 0
+
+        n = min(len(buffer), self._remaining)
+        data = self._file.read(n)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+def open_csv_range(file_path: str, header: bytes, start: int, end: int) -> io.BufferedReader:
+    """Open a buffered binary stream over one byte range (with the header prepended)."""
+    return io.BufferedReader(CsvRangeReader(file_path, header, start, end), buffer_size=1024 * 1024)
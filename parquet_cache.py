@@ -0,0 +1,405 @@
+"""
+Columnar Parquet cache for the raw NPI CSV file.
+
+``python process_nurses.py convert data.csv`` parses the CSV once and writes
+only ``USEFUL_COLUMNS`` to Parquet, one file per practice-location state:
+
+    data.parquet/
+        _manifest.json
+        state=AZ/data.parquet
+        state=CO/data.parquet
+        ...
+
+Besides the CSV columns, every row stores its precomputed ``nurse_categories``
+taxonomy bitmask (see taxonomy.py), so nurse filters and statistics never
+have to look at the 15 taxonomy code columns again, and its position in the
+CSV (``_source_row``). Partitions group the rows by state; readers that need
+CSV order (the Denver matcher keeps the first matching row) merge the
+partitions back by that position.
+
+The manifest records a fingerprint of the source CSV (size, mtime and a hash
+of the header row) and the taxonomy prefixes the bitmask was built with. Entry points call ``find_fresh_cache`` and read from the
+cache only when the fingerprint still matches, so a new monthly dump is never
+silently shadowed by a stale cache.
+
+Requires pyarrow (``pip install pyarrow``), an optional dependency.
+"""
+
+import csv
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from config import (
+    FILTER_COLUMNS,
+    USEFUL_COLUMNS,
+    PARQUET_CACHE_SUFFIX,
+    DEFAULT_CHUNK_SIZE,
+)
+from taxonomy import NURSE_CLASSIFIER, NURSE_CATEGORIES_COLUMN
+
+MANIFEST_FILE = '_manifest.json'
+MANIFEST_VERSION = 3
+
+# Row position in the source CSV (0 = first data row)
+SOURCE_ROW_COLUMN = '_source_row'
+
+# Partition column (practice location state)
+PARTITION_COLUMN = FILTER_COLUMNS['state']
+
+# Explicit types for the cache; every other column is stored as a string
+# (phones, postal codes and license numbers keep their exact text).
+INTEGER_COLUMNS = {
+    'NPI': 'int64',
+    'Entity Type Code': 'int8',
+}
+DATE_COLUMNS = ['Provider Enumeration Date', 'Last Update Date']
+CSV_DATE_FORMAT = '%m/%d/%Y'
+
+
+def get_cache_dir(csv_file: str) -> str:
+    """Default cache directory for a CSV file (data.csv -> data.parquet/)."""
+    return os.path.splitext(csv_file)[0] + PARQUET_CACHE_SUFFIX
+
+
+def compute_fingerprint(csv_file: str) -> Dict[str, object]:
+    """Fingerprint a source CSV by size, modification time and header hash."""
+    stat = os.stat(csv_file)
+    with open(csv_file, 'rb') as f:
+        header = f.readline()
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'header_sha256': hashlib.sha256(header).hexdigest(),
+    }
+
+
+def load_manifest(cache_dir: str) -> Optional[Dict]:
+    """Load the cache manifest, or None if the cache does not exist."""
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def is_cache_fresh(csv_file: str, cache_dir: Optional[str] = None) -> bool:
+    """
+    Check whether the cache exists, was built from the current CSV and its
+    nurse_categories bitmask matches the configured taxonomy prefixes.
+    """
+    cache_dir = cache_dir or get_cache_dir(csv_file)
+    manifest = load_manifest(cache_dir)
+    if manifest is None or not os.path.exists(csv_file):
+        return False
+    if manifest.get('nurse_category_prefixes') != NURSE_CLASSIFIER.prefixes:
+        return False
+    return manifest['fingerprint'] == compute_fingerprint(csv_file)
+
+
+def find_fresh_cache(csv_file: str, cache_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Return the cache directory if a fresh cache exists for ``csv_file``
+    (never without pyarrow, which is needed to read it).
+    """
+    if importlib.util.find_spec('pyarrow') is None:
+        return None
+    cache_dir = cache_dir or get_cache_dir(csv_file)
+    if is_cache_fresh(csv_file, cache_dir):
+        return cache_dir
+    return None
+
+
+def _partition_dir_name(state: Optional[str]) -> str:
+    """Directory name for a partition value (null/blank states get their own)."""
+    if state is None or not str(state).strip():
+        return 'state=__none__'
+    return 'state=' + re.sub(r'[^A-Za-z0-9]+', '_', str(state).strip())
+
+
+def convert_csv_to_parquet(
+    csv_file: str,
+    cache_dir: Optional[str] = None,
+    block_size_mb: int = 64,
+) -> Dict:
+    """
+    Convert the raw NPI CSV into the partitioned Parquet cache.
+
+    Only ``USEFUL_COLUMNS`` are parsed. The cache is built in a temporary
+    directory and swapped in at the end, so an interrupted conversion never
+    leaves a half-written cache behind.
+
+    Args:
+        csv_file: Path to the source CSV file
+        cache_dir: Target cache directory (default: next to the CSV)
+        block_size_mb: CSV block size handed to the pyarrow reader
+
+    Returns:
+        The manifest that was written
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    cache_dir = cache_dir or get_cache_dir(csv_file)
+    tmp_dir = cache_dir + '.tmp'
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    fingerprint = compute_fingerprint(csv_file)
+
+    with open(csv_file, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        header = next(csv.reader(f), [])
+    columns = [col for col in USEFUL_COLUMNS if col in header]
+    if PARTITION_COLUMN not in columns:
+        raise ValueError(f"Column '{PARTITION_COLUMN}' not found in {csv_file}")
+
+    column_types = {col: pa.string() for col in columns}
+    for col, type_name in INTEGER_COLUMNS.items():
+        if col in column_types:
+            column_types[col] = getattr(pa, type_name)()
+    for col in DATE_COLUMNS:
+        if col in column_types:
+            column_types[col] = pa.timestamp('s')
+
+    reader = pa_csv.open_csv(
+        csv_file,
+        read_options=pa_csv.ReadOptions(block_size=block_size_mb * 1024 * 1024),
+        parse_options=pa_csv.ParseOptions(
+            newlines_in_values=True,
+            invalid_row_handler=lambda row: 'skip',
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types=column_types,
+            strings_can_be_null=True,
+            timestamp_parsers=[CSV_DATE_FORMAT],
+        ),
+    )
+
+    schema = pa.schema([
+        (col, pa.date32() if col in DATE_COLUMNS else column_types[col]) for col in columns
+    ] + [
+        (NURSE_CATEGORIES_COLUMN, pa.from_numpy_dtype(NURSE_CLASSIFIER.dtype)),
+        (SOURCE_ROW_COLUMN, pa.int64()),
+    ])
+
+    writers = {}
+    partitions = {}
+    total_rows = 0
+    batch_num = 0
+    start_time = time.time()
+
+    try:
+        for batch in reader:
+            batch_num += 1
+            first_row = total_rows
+            total_rows += batch.num_rows
+            table = pa.Table.from_batches([batch])
+            for col in DATE_COLUMNS:
+                if col in columns:
+                    idx = table.schema.get_field_index(col)
+                    table = table.set_column(idx, col, pc.cast(table[col], pa.date32()))
+            table = table.select(columns)
+            table = table.append_column(NURSE_CATEGORIES_COLUMN, NURSE_CLASSIFIER.categories_arrow(table))
+            table = table.append_column(
+                SOURCE_ROW_COLUMN, pa.array(np.arange(first_row, total_rows, dtype=np.int64))
+            ).cast(schema)
+
+            state_values = table[PARTITION_COLUMN]
+            for state in pc.unique(state_values).to_pylist():
+                key = state.strip() if state is not None else ''
+                if state is None:
+                    part = table.filter(pc.is_null(state_values))
+                else:
+                    part = table.filter(pc.equal(state_values, state))
+
+                dir_name = _partition_dir_name(key)
+                if dir_name not in writers:
+                    os.makedirs(os.path.join(tmp_dir, dir_name), exist_ok=True)
+                    rel_path = os.path.join(dir_name, 'data.parquet')
+                    writers[dir_name] = pq.ParquetWriter(os.path.join(tmp_dir, rel_path), schema)
+                    partitions[dir_name] = {'path': rel_path, 'states': [], 'rows': 0}
+
+                info = partitions[dir_name]
+                if key not in info['states']:
+                    info['states'].append(key)
+                info['rows'] += part.num_rows
+                writers[dir_name].write_table(part)
+
+            elapsed = time.time() - start_time
+            print(f"  Batch {batch_num}: {total_rows:,} rows | {len(partitions)} partitions | "
+                  f"{total_rows / max(elapsed, 1e-9):,.0f} rows/sec")
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'source': os.path.abspath(csv_file),
+        'fingerprint': fingerprint,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'columns': columns + [NURSE_CATEGORIES_COLUMN],
+        'row_column': SOURCE_ROW_COLUMN,
+        'nurse_category_prefixes': NURSE_CLASSIFIER.prefixes,
+        'date_columns': [col for col in DATE_COLUMNS if col in columns],
+        'partition_column': PARTITION_COLUMN,
+        'total_rows': total_rows,
+        'partitions': sorted(partitions.values(), key=lambda p: p['path']),
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+    os.rename(tmp_dir, cache_dir)
+    return manifest
+
+
+def cache_partition_files(cache_dir: str, states: Optional[List[str]] = None) -> List[str]:
+    """
+    List the Parquet files of a cache, optionally only those holding the given
+    practice-location states (compared case-insensitively).
+    """
+    manifest = load_manifest(cache_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No Parquet cache found in {cache_dir}")
+
+    wanted = {s.strip().upper() for s in states} if states else None
+    files = []
+    for partition in manifest['partitions']:
+        if wanted is not None and not wanted.intersection(s.upper() for s in partition['states']):
+            continue
+        files.append(os.path.join(cache_dir, partition['path']))
+    return files
+
+
+def scan_cache_polars(cache_dir: str, states: Optional[List[str]] = None):
+    """Lazily scan the cache with Polars, touching only the needed partitions."""
+    import polars as pl
+
+    files = cache_partition_files(cache_dir, states)
+    if not files:
+        manifest = load_manifest(cache_dir)
+        return pl.DataFrame(schema={col: pl.Utf8 for col in manifest['columns']}).lazy()
+    return pl.scan_parquet(files)
+
+
+def iter_cache_chunks(
+    cache_dir: str,
+    columns: Optional[List[str]] = None,
+    states: Optional[List[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    format_dates: bool = True,
+    file_order: bool = True,
+) -> Iterator["pd.DataFrame"]:
+    """
+    Stream the cache as Pandas DataFrames, like ``pd.read_csv(chunksize=...)``.
+
+    Args:
+        cache_dir: Cache directory
+        columns: Columns to read (default: all cached columns)
+        states: Only read partitions for these practice-location states
+        chunk_size: Maximum rows per yielded DataFrame
+        format_dates: Render date columns back as MM/DD/YYYY strings, exactly
+            as they appear in the CSV (default), instead of datetime64
+        file_order: Yield the rows in CSV order (default), merging the
+            partitions by ``_source_row``; False reads one partition after
+            the other, which is cheaper when the order does not matter
+    """
+    manifest = load_manifest(cache_dir)
+    date_columns = set(manifest['date_columns'])
+    data_columns = [c for c in columns if c in manifest['columns']] if columns else list(manifest['columns'])
+    files = cache_partition_files(cache_dir, states)
+
+    if file_order:
+        tables = _iter_merged_tables(files, data_columns, chunk_size)
+    else:
+        tables = _iter_partition_tables(files, data_columns, chunk_size)
+    for table in tables:
+        df = table.select(data_columns).to_pandas(date_as_object=False)
+        if format_dates:
+            for col in date_columns.intersection(df.columns):
+                df[col] = df[col].dt.strftime(CSV_DATE_FORMAT)
+        yield df
+
+
+def _iter_partition_tables(files: List[str], columns: List[str], chunk_size: int) -> Iterator["pa.Table"]:
+    """Batches of each partition file in turn."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    for path in files:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield pa.Table.from_batches([batch])
+
+
+def _iter_merged_tables(files: List[str], columns: List[str], chunk_size: int) -> Iterator["pa.Table"]:
+    """
+    Batches of up to ``chunk_size`` rows in ``_source_row`` order.
+
+    Every partition is already in CSV order, so this is a k-way merge: each
+    round takes, from every partition's buffered batch, the rows up to the
+    smallest last ``_source_row`` among the buffers (no partition can hold an
+    earlier row that is not buffered yet), and sorts only those.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    read_columns = columns + [SOURCE_ROW_COLUMN]
+    # Buffer a share of a chunk per partition, so memory stays near one chunk
+    batch_size = max(chunk_size // max(len(files), 1), 4096)
+    readers = [pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=read_columns) for path in files]
+    buffers: List[Optional["pa.Table"]] = [None] * len(readers)
+    pending: List["pa.Table"] = []
+    pending_rows = 0
+
+    while True:
+        for i, reader in enumerate(readers):
+            if reader is not None and (buffers[i] is None or buffers[i].num_rows == 0):
+                batch = next(reader, None)
+                if batch is None:
+                    readers[i] = None
+                    buffers[i] = None
+                else:
+                    buffers[i] = pa.Table.from_batches([batch])
+        live = [i for i, table in enumerate(buffers) if table is not None and table.num_rows]
+        if not live:
+            break
+
+        bound = min(buffers[i][SOURCE_ROW_COLUMN][-1].as_py() for i in live)
+        taken = []
+        for i in live:
+            rows = buffers[i][SOURCE_ROW_COLUMN].to_numpy()
+            cut = int(np.searchsorted(rows, bound, side='right'))
+            taken.append(buffers[i].slice(0, cut))
+            buffers[i] = buffers[i].slice(cut)
+        merged = pa.concat_tables(taken)
+        merged = merged.take(np.argsort(merged[SOURCE_ROW_COLUMN].to_numpy(), kind='stable'))
+        pending.append(merged)
+        pending_rows += merged.num_rows
+
+        while pending_rows >= chunk_size:
+            table = pa.concat_tables(pending)
+            yield table.slice(0, chunk_size)
+            rest = table.slice(chunk_size)
+            pending, pending_rows = [rest], rest.num_rows
+
+    if pending_rows:
+        yield pa.concat_tables(pending)
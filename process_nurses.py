@@ -8,10 +8,15 @@ loading them entirely into memory.
 """
 
 import argparse
+import csv
+import shutil
 import sys
 import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, List
+from functools import reduce
+from typing import Optional, List, Tuple
 
 # Try to import polars first (faster), fall back to pandas
 try:
@@ -19,20 +24,67 @@ try:
     USE_POLARS = True
     print("Using Polars for processing (optimized)")
 except ImportError:
-    import pandas as pd
     USE_POLARS = False
     print("Using Pandas for processing (Polars not found)")
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 from config import (
-    NURSE_TAXONOMY_CODES,
+    NURSE_TAXONOMY_DESCRIPTIONS,
     TAXONOMY_CODE_COLUMNS,
     FILTER_COLUMNS,
+    KEY_FIRST_NAME_COLUMN,
+    KEY_LAST_NAME_COLUMN,
+    KEY_LICENSES_COLUMN,
+    KEY_MAILING_PHONE_COLUMN,
+    KEY_NAME_BLOCK_COLUMN,
+    KEY_PRACTICE_PHONE_COLUMN,
+    LICENSE_NUMBER_COLUMNS,
+    LICENSE_STATE_COLUMNS,
+    MATCH_KEY_COLUMNS,
     PHONE_MAILING_COLUMN,
     PHONE_PRACTICE_COLUMN,
     USEFUL_COLUMNS,
     DEFAULT_CHUNK_SIZE,
     DEFAULT_OUTPUT_FILE
 )
+from taxonomy import NURSE_CLASSIFIER, NURSE_CATEGORIES_COLUMN, merge_category_counts
+from parallel_scan import read_header_bytes, split_csv_ranges, open_csv_range
+from parquet_cache import (
+    convert_csv_to_parquet,
+    find_fresh_cache,
+    get_cache_dir,
+    load_manifest,
+    SOURCE_ROW_COLUMN,
+    iter_cache_chunks,
+    scan_cache_polars,
+    cache_partition_files,
+)
+from filter_spec import FilterSet, FilterSpecError, load_spec
+from metrics import NULL_METRICS, METRICS_FORMATS, PipelineMetrics
+from checkpoint import (
+    CheckpointMismatchError,
+    get_checkpoint_file,
+    load_checkpoint,
+    save_checkpoint,
+    clear_checkpoint,
+    skip_records,
+    sync_output,
+    truncate_output,
+)
+from incremental_state import (
+    LAST_UPDATE_COLUMN,
+    DEACTIVATION_DATE_COLUMN,
+    REACTIVATION_DATE_COLUMN,
+    NPPES_DATE_FORMAT,
+    get_state_file,
+    get_watermark,
+    load_state,
+    save_state,
+)
 
 
 def get_file_size(file_path: str) -> int:
@@ -49,6 +101,351 @@ def format_size(bytes_size: int) -> str:
     return f"{bytes_size:.2f} TB"
 
 
+def read_csv_header(file_path: str) -> List[str]:
+    """Read only the header row of a CSV file."""
+    with open(file_path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def describe_filters(
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    different_phones: Optional[bool] = False,
+) -> List[str]:
+    """Build a human-readable description of the active filters."""
+    filters_applied = []
+    if first_name:
+        filters_applied.append(f"First name contains '{first_name}'")
+    if last_name:
+        filters_applied.append(f"Last name contains '{last_name}'")
+    if city:
+        filters_applied.append(f"City contains '{city}'")
+    if state:
+        filters_applied.append(f"State = '{state}'")
+    if different_phones:
+        filters_applied.append("Mailing phone ≠ Practice location phone")
+    return filters_applied
+
+
+def polars_filter_steps(
+    columns: List[str],
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    different_phones: Optional[bool] = False,
+) -> List[Tuple[str, "pl.Expr"]]:
+    """
+    The individual filters as named Polars expressions: ``taxonomy`` first,
+    then one per active name/city/state/phone filter.
+
+    A row is a nurse when its ``nurse_categories`` bitmask (see taxonomy.py)
+    is non-zero. Columns missing from ``columns`` are skipped, matching the
+    chunked readers.
+    """
+    # Filter for nurse taxonomy codes (using prefix matching) via the category
+    # bitmask; reuse a precomputed nurse_categories column when there is one
+    if NURSE_CATEGORIES_COLUMN in columns:
+        steps = [('taxonomy', pl.col(NURSE_CATEGORIES_COLUMN) != 0)]
+    else:
+        steps = [('taxonomy', NURSE_CLASSIFIER.categories_polars([col for col in TAXONOMY_CODE_COLUMNS if col in columns]) != 0)]
+
+    if first_name and FILTER_COLUMNS['first_name'] in columns:
+        steps.append(('first_name', pl.col(FILTER_COLUMNS['first_name']).str.to_lowercase().str.contains(first_name.lower())))
+
+    if last_name and FILTER_COLUMNS['last_name'] in columns:
+        steps.append(('last_name', pl.col(FILTER_COLUMNS['last_name']).str.to_lowercase().str.contains(last_name.lower())))
+
+    if city and FILTER_COLUMNS['city'] in columns:
+        steps.append(('city', pl.col(FILTER_COLUMNS['city']).str.to_lowercase().str.contains(city.lower())))
+
+    if state and FILTER_COLUMNS['state'] in columns:
+        steps.append(('state', pl.col(FILTER_COLUMNS['state']).str.to_uppercase() == state.upper()))
+
+    # Filter by different phone numbers
+    # (quoted empty fields are read as '' rather than null, so treat both as missing)
+    if different_phones and PHONE_MAILING_COLUMN in columns and PHONE_PRACTICE_COLUMN in columns:
+        mailing_phone = pl.col(PHONE_MAILING_COLUMN).cast(pl.Utf8)
+        practice_phone = pl.col(PHONE_PRACTICE_COLUMN).cast(pl.Utf8)
+        steps.append(('different_phones', (
+            mailing_phone.is_not_null() & (mailing_phone != '') &
+            practice_phone.is_not_null() & (practice_phone != '') &
+            (mailing_phone != practice_phone)
+        )))
+
+    return steps
+
+
+def build_polars_filter(
+    columns: List[str],
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    different_phones: Optional[bool] = False,
+) -> "pl.Expr":
+    """
+    Build a single Polars expression combining the nurse taxonomy filter with
+    the optional name/city/state/phone filters (see ``polars_filter_steps``).
+
+    Because the result is a plain expression it can be used on an eager chunk
+    or pushed down into a lazy ``scan_csv`` query.
+    """
+    steps = polars_filter_steps(columns, first_name, last_name, city, state, different_phones)
+    return reduce(lambda left, right: left & right, [expr for _, expr in steps])
+
+
+def polars_key_columns(schema: dict) -> List["pl.Expr"]:
+    """
+    The normalized match-key columns (config.MATCH_KEY_COLUMNS) as Polars
+    expressions, for ``--key-columns``.
+    
+    Same values as ``cms_index.match_key_columns`` (the Pandas engines): names
+    stripped and upper-cased, licenses without RN/LP/PN/TEMP as 15
+    'LICENSE:STATE' slots joined with '|', phones as their last 10 digits,
+    and the 'LAST|F' name block. ``schema`` maps the available columns to
+    their dtypes; integral floats are keyed without '.0', as in Pandas.
+    """
+    # cms_index needs Pandas, which is optional for the Polars engines
+    from cms_index import LICENSE_PREFIX_PATTERN
+    
+    def text(col: str) -> "pl.Expr":
+        if col not in schema:
+            return pl.lit(None, pl.Utf8)
+        if schema[col].is_float():
+            value = pl.col(col)
+            return pl.when(value == value.floor()).then(value.cast(pl.Int64).cast(pl.Utf8)).otherwise(value.cast(pl.Utf8))
+        return pl.col(col).cast(pl.Utf8)
+    
+    def upper(col: str) -> "pl.Expr":
+        return text(col).str.strip_chars().str.to_uppercase().fill_null('')
+    
+    def phone(col: str) -> "pl.Expr":
+        digits = text(col).str.replace_all(r'\D', '')
+        return pl.when(digits.str.len_chars() >= 10).then(digits.str.slice(-10)).otherwise(pl.lit('')).fill_null('')
+    
+    slots = []
+    for number_col, state_col in zip(LICENSE_NUMBER_COLUMNS, LICENSE_STATE_COLUMNS):
+        number = text(number_col).str.strip_chars().str.to_uppercase().str.replace(LICENSE_PREFIX_PATTERN, '').fill_null('')
+        slots.append(pl.when(number != '').then(pl.concat_str([number, pl.lit(':'), upper(state_col)])).otherwise(pl.lit('')))
+    
+    first_name = upper(FILTER_COLUMNS['first_name'])
+    last_name = upper(FILTER_COLUMNS['last_name'])
+    return [
+        first_name.alias(KEY_FIRST_NAME_COLUMN),
+        last_name.alias(KEY_LAST_NAME_COLUMN),
+        pl.concat_str(slots, separator='|').str.strip_chars_end('|').alias(KEY_LICENSES_COLUMN),
+        phone(PHONE_PRACTICE_COLUMN).alias(KEY_PRACTICE_PHONE_COLUMN),
+        phone(PHONE_MAILING_COLUMN).alias(KEY_MAILING_PHONE_COLUMN),
+        pl.when((first_name != '') & (last_name != ''))
+        .then(pl.concat_str([last_name, pl.lit('|'), first_name.str.slice(0, 1)]))
+        .otherwise(pl.lit(''))
+        .alias(KEY_NAME_BLOCK_COLUMN),
+    ]
+
+
+def with_key_columns_pandas(df_output: "pd.DataFrame", df_filtered: "pd.DataFrame") -> "pd.DataFrame":
+    """``df_output`` followed by the match-key columns of ``df_filtered`` (see cms_index.match_key_columns)."""
+    from cms_index import match_key_columns
+    
+    return pd.concat([df_output, match_key_columns(df_filtered)], axis=1)
+
+
+def polars_filter_set_expr(columns: List[str], filter_set: FilterSet) -> "pl.Expr":
+    """
+    Row filter of one ``--spec`` filter set, without the taxonomy step (the
+    fan-out engine drops non-nurses once for all sets).
+    
+    Uses the same expressions as ``polars_filter_steps`` so that a spec entry
+    selects exactly the rows of the equivalent single run.
+    """
+    steps = [
+        expr for name, expr in polars_filter_steps(
+            columns,
+            filter_set.first_name,
+            filter_set.last_name,
+            filter_set.city,
+            filter_set.state,
+            filter_set.different_phones,
+        )
+        if name != 'taxonomy'
+    ]
+    
+    if len(filter_set.states) > 1 and FILTER_COLUMNS['state'] in columns:
+        steps.append(pl.col(FILTER_COLUMNS['state']).str.to_uppercase().is_in(filter_set.states))
+    
+    if filter_set.categories:
+        bits = sum(NURSE_CLASSIFIER.bits[prefix] for prefix in filter_set.categories)
+        steps.append((pl.col(NURSE_CATEGORIES_COLUMN) & bits) != 0)
+    
+    if filter_set.license_states:
+        license_cols = [col for col in LICENSE_STATE_COLUMNS if col in columns]
+        steps.append(pl.any_horizontal([
+            pl.col(col).cast(pl.Utf8).str.to_uppercase().is_in(filter_set.license_states).fill_null(False)
+            for col in license_cols
+        ]) if license_cols else pl.lit(False))
+    
+    if filter_set.postal_code and FILTER_COLUMNS['postal_code'] in columns:
+        steps.append(pl.col(FILTER_COLUMNS['postal_code']).cast(pl.Utf8).str.starts_with(filter_set.postal_code))
+    
+    if not steps:
+        return pl.lit(True)
+    return reduce(lambda left, right: left & right, steps)
+
+
+def count_output_categories(output_file: str) -> Optional[dict]:
+    """
+    Count nurses per taxonomy category in a finished output file.
+    
+    Used by the engines that stream straight to disk (lazy/cached), where the
+    rows never pass through Python; only the 15 taxonomy columns are read.
+    """
+    if not os.path.exists(output_file):
+        return None
+    columns = [col for col in TAXONOMY_CODE_COLUMNS if col in read_csv_header(output_file)]
+    masks = (
+        pl.scan_csv(output_file, infer_schema_length=0)
+        .select(NURSE_CLASSIFIER.categories_polars(columns))
+        .collect()
+        .to_series()
+        .to_numpy()
+    )
+    return NURSE_CLASSIFIER.count_categories(masks)
+
+
+def restore_progress(
+    engine: str,
+    input_file: str,
+    output_file: str,
+    chunk_size: int,
+    filters_applied: List[str],
+    checkpoint_file: Optional[str],
+    resume: bool,
+    key_columns: bool = False,
+) -> tuple:
+    """
+    Load the checkpoint of a chunked engine when resuming.
+    
+    Returns:
+        (settings, progress): settings to store with every checkpoint and the
+        progress to continue from (zeroes when starting fresh). On resume the
+        output is truncated back to the last committed chunk.
+    """
+    settings = {
+        'engine': engine,
+        'output_file': os.path.abspath(output_file),
+        'chunk_size': chunk_size,
+        'filters': filters_applied,
+        'key_columns': key_columns,
+    }
+    progress = {
+        'chunks': 0, 'total_rows': 0, 'records': 0, 'filtered_rows': 0, 'category_counts': None, 'output_bytes': 0,
+    }
+    
+    saved = load_checkpoint(checkpoint_file, input_file, settings) if resume and checkpoint_file else None
+    if saved is not None:
+        progress = saved
+        progress.setdefault('records', progress['total_rows'])
+        print(f"Resuming after chunk {progress['chunks']:,} "
+              f"({progress['total_rows']:,} rows, {progress['filtered_rows']:,} nurses)")
+    elif resume:
+        print("No checkpoint found; starting from the beginning.")
+    
+    # Drop anything written after the last committed chunk (or a stale
+    # output when starting over), so appended chunks are never duplicated
+    truncate_output(output_file, progress['output_bytes'])
+    return settings, progress
+
+
+def next_chunk_pandas(reader) -> Tuple[Optional["pd.DataFrame"], int]:
+    """
+    Next chunk of an ``on_bad_lines='warn'`` Pandas reader (None at the
+    end) and the number of malformed lines Pandas skipped while reading it.
+    """
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        chunk = next(reader, None)
+    skipped = 0
+    for warning in caught:
+        # One warning per read, with a 'Skipping line N: ...' line per bad line
+        message = str(warning.message)
+        if issubclass(warning.category, pd.errors.ParserWarning) and message.startswith('Skipping line'):
+            skipped += message.count('Skipping line')
+        else:
+            warnings.warn_explicit(warning.message, warning.category, warning.filename, warning.lineno)
+    return chunk, skipped
+
+
+def filter_chunk_pandas(
+    chunk: "pd.DataFrame",
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    different_phones: Optional[bool] = False,
+    metrics: PipelineMetrics = NULL_METRICS,
+) -> "pd.DataFrame":
+    """
+    Apply the nurse taxonomy filter and the optional name/city/state/phone
+    filters to a single Pandas chunk.
+    
+    The returned frame carries a ``nurse_categories`` bitmask column (see
+    taxonomy.py) so callers can compute per-category statistics. Each step is
+    timed as its own ``metrics`` stage.
+    """
+    # Filter for nurses: check if ANY taxonomy code column contains a nurse code
+    # (prefix matching, e.g. '163W' matches '163W00000X', '163WA0400X', etc.)
+    with metrics.stage('filter:taxonomy'):
+        if NURSE_CATEGORIES_COLUMN in chunk.columns:
+            categories = chunk[NURSE_CATEGORIES_COLUMN]
+            df_filtered = chunk[categories != 0]
+        else:
+            categories = NURSE_CLASSIFIER.categories_pandas(chunk)
+            nurse_mask = categories != 0
+            # concat instead of assign: wide chunks have one block per column, and
+            # inserting into them triggers Pandas' fragmentation warning
+            df_filtered = pd.concat([chunk[nurse_mask], categories[nurse_mask]], axis=1)
+    
+    # Apply additional filters
+    if first_name and FILTER_COLUMNS['first_name'] in df_filtered.columns:
+        with metrics.stage('filter:first_name'):
+            df_filtered = df_filtered[
+                df_filtered[FILTER_COLUMNS['first_name']].str.lower().str.contains(first_name.lower(), na=False)
+            ]
+    
+    if last_name and FILTER_COLUMNS['last_name'] in df_filtered.columns:
+        with metrics.stage('filter:last_name'):
+            df_filtered = df_filtered[
+                df_filtered[FILTER_COLUMNS['last_name']].str.lower().str.contains(last_name.lower(), na=False)
+            ]
+    
+    if city and FILTER_COLUMNS['city'] in df_filtered.columns:
+        with metrics.stage('filter:city'):
+            df_filtered = df_filtered[
+                df_filtered[FILTER_COLUMNS['city']].str.lower().str.contains(city.lower(), na=False)
+            ]
+    
+    if state and FILTER_COLUMNS['state'] in df_filtered.columns:
+        with metrics.stage('filter:state'):
+            df_filtered = df_filtered[
+                df_filtered[FILTER_COLUMNS['state']].str.upper() == state.upper()
+            ]
+    
+    # Filter by different phone numbers
+    if different_phones:
+        if PHONE_MAILING_COLUMN in df_filtered.columns and PHONE_PRACTICE_COLUMN in df_filtered.columns:
+            with metrics.stage('filter:different_phones'):
+                df_filtered = df_filtered[
+                    df_filtered[PHONE_MAILING_COLUMN].notna() &
+                    df_filtered[PHONE_PRACTICE_COLUMN].notna() &
+                    (df_filtered[PHONE_MAILING_COLUMN] != df_filtered[PHONE_PRACTICE_COLUMN])
+                ]
+    
+    return df_filtered
+
+
 def filter_nurses_polars(
     input_file: str,
     output_file: str,
@@ -58,6 +455,10 @@ def filter_nurses_polars(
     city: Optional[str] = None,
     state: Optional[str] = None,
     different_phones: Optional[bool] = False,
+    checkpoint_file: Optional[str] = None,
+    resume: bool = False,
+    metrics: PipelineMetrics = NULL_METRICS,
+    key_columns: bool = False,
 ) -> dict:
     """
     Filter nurses from CSV using Polars (faster for large files).
@@ -70,134 +471,618 @@ def filter_nurses_polars(
         last_name: Filter by provider last name (case-insensitive partial match)
         city: Filter by city (case-insensitive partial match)
         state: Filter by state code (exact match, case-insensitive)
+        checkpoint_file: Write a checkpoint after every chunk (see checkpoint.py)
+        resume: Continue from the checkpoint instead of starting over
+        metrics: Per-chunk stage timings (read, taxonomy, filter:*, project, write)
+        key_columns: Append the normalized match-key columns (MATCH_KEY_COLUMNS)
     
     Returns:
         Dictionary with processing statistics
     """
-    total_rows = 0
-    filtered_rows = 0
-    first_chunk = True
-    
     print(f"\nProcessing file: {input_file}")
     print(f"File size: {format_size(get_file_size(input_file))}")
     print(f"Output file: {output_file}")
     print(f"Chunk size: {chunk_size:,} rows")
     
     # Build filter description
-    filters_applied = []
-    if first_name:
-        filters_applied.append(f"First name contains '{first_name}'")
-    if last_name:
-        filters_applied.append(f"Last name contains '{last_name}'")
-    if city:
-        filters_applied.append(f"City contains '{city}'")
-    if state:
-        filters_applied.append(f"State = '{state}'")
-    if different_phones:
-        filters_applied.append("Mailing phone ≠ Practice location phone")
+    filters_applied = describe_filters(first_name, last_name, city, state, different_phones)
     
     if filters_applied:
         print(f"Filters: {', '.join(filters_applied)}")
     
+    settings, progress = restore_progress(
+        'polars', input_file, output_file, chunk_size, filters_applied, checkpoint_file, resume, key_columns
+    )
+    chunk_num = progress['chunks']
+    total_rows = progress['total_rows']
+    filtered_rows = progress['filtered_rows']
+    category_counts = progress['category_counts']
+    first_chunk = progress['output_bytes'] == 0
+    
     print("\nProcessing chunks...")
     
     # Process CSV in chunks using Polars
     reader = pl.read_csv_batched(
         input_file,
         batch_size=chunk_size,
+        infer_schema_length=0,  # every column as text, as in the input (leading zeros kept)
         low_memory=True,
         ignore_errors=True,
+        skip_rows_after_header=total_rows,
     )
     
-    chunk_num = 0
     while True:
-        try:
-            # Read next chunk
+        metrics.start_chunk()
+        
+        # Read next chunk
+        with metrics.stage('read'):
             chunk = reader.next_batches(1)
-            if chunk is None or len(chunk) == 0:
-                break
-            
-            df = chunk[0]
-            chunk_num += 1
-            total_rows += len(df)
-            
-            # Filter for nurses: check if ANY taxonomy code column contains a nurse code
-            # Filter for nurse taxonomy codes (using prefix matching)
-            # This allows matching all specializations (e.g., '163W' matches '163W00000X', '163WA0400X', etc.)
-            nurse_filter = pl.lit(False)
-            for col in TAXONOMY_CODE_COLUMNS:
-                if col in df.columns:
-                    for code_prefix in NURSE_TAXONOMY_CODES:
-                        nurse_filter = nurse_filter | df[col].cast(pl.Utf8).str.starts_with(code_prefix)
-            
-            df_filtered = df.filter(nurse_filter)
-            
-            # Apply additional filters
-            if first_name and FILTER_COLUMNS['first_name'] in df_filtered.columns:
-                df_filtered = df_filtered.filter(
-                    pl.col(FILTER_COLUMNS['first_name']).str.to_lowercase().str.contains(first_name.lower())
-                )
-            
-            if last_name and FILTER_COLUMNS['last_name'] in df_filtered.columns:
-                df_filtered = df_filtered.filter(
-                    pl.col(FILTER_COLUMNS['last_name']).str.to_lowercase().str.contains(last_name.lower())
+        if chunk is None or len(chunk) == 0:
+            break
+        
+        df = chunk[0]
+        chunk_num += 1
+        total_rows += len(df)
+        
+        # Classify taxonomy codes once, then filter for nurses and apply
+        # the additional name/city/state/phone filters
+        with metrics.stage('taxonomy'):
+            df = df.with_columns(
+                NURSE_CLASSIFIER.categories_polars([col for col in TAXONOMY_CODE_COLUMNS if col in df.columns])
+            )
+        if metrics.enabled:
+            # One filter() per step so each one gets its own timing
+            df_filtered = df
+            for name, expr in polars_filter_steps(df.columns, first_name, last_name, city, state, different_phones):
+                with metrics.stage(f'filter:{name}'):
+                    df_filtered = df_filtered.filter(expr)
+        else:
+            df_filtered = df.filter(
+                build_polars_filter(df.columns, first_name, last_name, city, state, different_phones)
+            )
+        
+        chunk_filtered = len(df_filtered)
+        filtered_rows += chunk_filtered
+        with metrics.stage('stats'):
+            category_counts = merge_category_counts(
+                category_counts, NURSE_CLASSIFIER.count_categories(df_filtered[NURSE_CATEGORIES_COLUMN].to_numpy())
+            )
+        
+        # Write to output file (only useful columns)
+        if chunk_filtered > 0:
+            # Select only useful columns that exist in the dataframe
+            with metrics.stage('project'):
+                available_useful_cols = [col for col in USEFUL_COLUMNS if col in df_filtered.columns]
+                df_output = df_filtered.select(
+                    available_useful_cols + (polars_key_columns(df_filtered.schema) if key_columns else [])
                 )
             
-            if city and FILTER_COLUMNS['city'] in df_filtered.columns:
-                df_filtered = df_filtered.filter(
-                    pl.col(FILTER_COLUMNS['city']).str.to_lowercase().str.contains(city.lower())
-                )
+            with metrics.stage('write'):
+                if first_chunk:
+                    df_output.write_csv(output_file)
+                    first_chunk = False
+                else:
+                    # Append to existing file
+                    with open(output_file, 'ab') as f:
+                        df_output.write_csv(f, include_header=False)
+        
+        if checkpoint_file:
+            with metrics.stage('checkpoint'):
+                save_checkpoint(checkpoint_file, input_file, settings, {
+                    'chunks': chunk_num,
+                    'total_rows': total_rows,
+                    'filtered_rows': filtered_rows,
+                    'category_counts': category_counts,
+                    'output_bytes': sync_output(output_file),
+                })
+        
+        metrics.end_chunk(len(df), chunk_filtered)
+        print(f"  Chunk {chunk_num}: {len(df):,} rows → {chunk_filtered:,} nurses (Total: {filtered_rows:,})")
+    
+    # The batched reader memory-maps the file and reports no offsets; it has
+    # scanned the whole file (rows skipped on resume included)
+    metrics.add_input_bytes(get_file_size(input_file))
+    
+    if checkpoint_file:
+        clear_checkpoint(checkpoint_file)
+    
+    return {
+        'total_rows': total_rows,
+        'filtered_rows': filtered_rows,
+        'chunks_processed': chunk_num,
+        'category_counts': category_counts
+    }
+
+
+def filter_nurses_lazy(
+    input_file: str,
+    output_file: str,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    different_phones: Optional[bool] = False,
+    key_columns: bool = False,
+) -> dict:
+    """
+    Filter nurses from CSV using a lazy Polars query (streaming engine).
+    
+    Builds ``scan_csv(...).filter(...).select(USEFUL_COLUMNS).sink_csv(...)`` so
+    Polars only parses the columns the filter and the output actually need
+    (projection pushdown) and evaluates the filter while scanning (predicate
+    pushdown). Every column is read as a string, so values are written out
+    exactly as they appear in the input.
+    
+    Args:
+        input_file: Path to input CSV file
+        output_file: Path to output CSV file
+        first_name: Filter by provider first name (case-insensitive partial match)
+        last_name: Filter by provider last name (case-insensitive partial match)
+        city: Filter by city (case-insensitive partial match)
+        state: Filter by state code (exact match, case-insensitive)
+        different_phones: Keep only rows whose mailing and practice phones differ
+        key_columns: Append the normalized match-key columns (MATCH_KEY_COLUMNS)
+    
+    Returns:
+        Dictionary with processing statistics ('total_rows' is None: the
+        streaming sink does not count the rows it reads)
+    """
+    print(f"\nProcessing file: {input_file}")
+    print(f"File size: {format_size(get_file_size(input_file))}")
+    print(f"Output file: {output_file}")
+    print("Engine: lazy (scan_csv + streaming sink)")
+    
+    filters_applied = describe_filters(first_name, last_name, city, state, different_phones)
+    if filters_applied:
+        print(f"Filters: {', '.join(filters_applied)}")
+    
+    columns = read_csv_header(input_file)
+    available_useful_cols = [col for col in USEFUL_COLUMNS if col in columns]
+    
+    lazy_df = pl.scan_csv(
+        input_file,
+        infer_schema_length=0,
+        low_memory=True,
+        ignore_errors=True,
+    )
+    
+    print("\nStreaming filter...")
+    (
+        lazy_df
+        .filter(build_polars_filter(columns, first_name, last_name, city, state, different_phones))
+        .select(available_useful_cols + (polars_key_columns(lazy_df.collect_schema()) if key_columns else []))
+        .sink_csv(output_file)
+    )
+    
+    # The sink does not report row counts. Counting the input would mean a second
+    # full read of it, so the lazy engine reports total_rows as unavailable (None);
+    # the output is small and cheap to count.
+    filtered_rows = pl.scan_csv(output_file, infer_schema_length=0).select(pl.len()).collect().item()
+    
+    return {
+        'total_rows': None,
+        'filtered_rows': filtered_rows,
+        'chunks_processed': 0,
+        'category_counts': count_output_categories(output_file),
+        'input_bytes': get_file_size(input_file),
+    }
+
+
+def filter_nurses_pandas(
+    input_file: str,
+    output_file: str,
+    chunk_size: int,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    different_phones: Optional[bool] = False,
+    checkpoint_file: Optional[str] = None,
+    resume: bool = False,
+    metrics: PipelineMetrics = NULL_METRICS,
+    key_columns: bool = False,
+) -> dict:
+    """
+    Filter nurses from CSV using Pandas (fallback method).
+    
+    Args:
+        input_file: Path to input CSV file
+        output_file: Path to output CSV file
+        chunk_size: Number of rows to process at a time
+        first_name: Filter by provider first name (case-insensitive partial match)
+        last_name: Filter by provider last name (case-insensitive partial match)
+        city: Filter by city (case-insensitive partial match)
+        state: Filter by state code (exact match, case-insensitive)
+        checkpoint_file: Write a checkpoint after every chunk (see checkpoint.py)
+        resume: Continue from the checkpoint instead of starting over
+        metrics: Per-chunk stage timings (read, filter:*, project, write)
+        key_columns: Append the normalized match-key columns (MATCH_KEY_COLUMNS)
+    
+    Returns:
+        Dictionary with processing statistics
+    """
+    print(f"\nProcessing file: {input_file}")
+    print(f"File size: {format_size(get_file_size(input_file))}")
+    print(f"Output file: {output_file}")
+    print(f"Chunk size: {chunk_size:,} rows")
+    
+    # Build filter description
+    filters_applied = describe_filters(first_name, last_name, city, state, different_phones)
+    
+    if filters_applied:
+        print(f"Filters: {', '.join(filters_applied)}")
+    
+    settings, progress = restore_progress(
+        'pandas', input_file, output_file, chunk_size, filters_applied, checkpoint_file, resume, key_columns
+    )
+    chunk_num = progress['chunks']
+    total_rows = progress['total_rows']
+    filtered_rows = progress['filtered_rows']
+    category_counts = progress['category_counts']
+    first_chunk = progress['output_bytes'] == 0
+    
+    print("\nProcessing chunks...")
+    
+    # Process CSV in chunks using Pandas. Every column as text: dtypes
+    # guessed per chunk would write the same value differently from chunk to
+    # chunk ('8790790' vs '8790790.0')
+    records = progress['records']
+    # Read through our own handle: its offset is the input each chunk consumed
+    with open(input_file, 'rb') as source:
+        reader = pd.read_csv(
+            source, chunksize=chunk_size, dtype=str, on_bad_lines='warn', skiprows=skip_records(records)
+        )
+        offset = 0
+        while True:
+            metrics.start_chunk()
+            with metrics.stage('read'):
+                chunk, skipped = next_chunk_pandas(reader)
+            if chunk is None:
+                break
+            chunk_bytes = source.tell() - offset
+            offset += chunk_bytes
             
-            if state and FILTER_COLUMNS['state'] in df_filtered.columns:
-                df_filtered = df_filtered.filter(
-                    pl.col(FILTER_COLUMNS['state']).str.to_uppercase() == state.upper()
-                )
+            chunk_num += 1
+            total_rows += len(chunk)
+            records += len(chunk) + skipped
             
-            # Filter by different phone numbers
-            if different_phones:
-                if PHONE_MAILING_COLUMN in df_filtered.columns and PHONE_PRACTICE_COLUMN in df_filtered.columns:
-                    df_filtered = df_filtered.filter(
-                        (pl.col(PHONE_MAILING_COLUMN).is_not_null()) &
-                        (pl.col(PHONE_PRACTICE_COLUMN).is_not_null()) &
-                        (pl.col(PHONE_MAILING_COLUMN) != pl.col(PHONE_PRACTICE_COLUMN))
-                    )
+            # Filter for nurses and apply the additional name/city/state/phone filters
+            df_filtered = filter_chunk_pandas(chunk, first_name, last_name, city, state, different_phones, metrics)
             
             chunk_filtered = len(df_filtered)
             filtered_rows += chunk_filtered
+            with metrics.stage('stats'):
+                category_counts = merge_category_counts(
+                    category_counts, NURSE_CLASSIFIER.count_categories(df_filtered[NURSE_CATEGORIES_COLUMN])
+                )
             
             # Write to output file (only useful columns)
             if chunk_filtered > 0:
                 # Select only useful columns that exist in the dataframe
-                available_useful_cols = [col for col in USEFUL_COLUMNS if col in df_filtered.columns]
-                df_output = df_filtered.select(available_useful_cols)
-                
-                if first_chunk:
-                    df_output.write_csv(output_file)
-                    first_chunk = False
-                else:
-                    # Append to existing file
-                    with open(output_file, 'ab') as f:
-                        df_output.write_csv(f, include_header=False)
+                with metrics.stage('project'):
+                    available_useful_cols = [col for col in USEFUL_COLUMNS if col in df_filtered.columns]
+                    df_output = df_filtered[available_useful_cols]
+                    if key_columns:
+                        df_output = with_key_columns_pandas(df_output, df_filtered)
             
-            print(f"  Chunk {chunk_num}: {len(df):,} rows → {chunk_filtered:,} nurses (Total: {filtered_rows:,})")
+                with metrics.stage('write'):
+                    df_output.to_csv(
+                        output_file,
+                        mode='w' if first_chunk else 'a',
+                        header=first_chunk,
+                        index=False
+                    )
+                first_chunk = False
             
-        except StopIteration:
-            break
-        except Exception as e:
-            print(f"  Warning: Error processing chunk {chunk_num}: {e}")
-            continue
+            if checkpoint_file:
+                with metrics.stage('checkpoint'):
+                    save_checkpoint(checkpoint_file, input_file, settings, {
+                        'chunks': chunk_num,
+                        'total_rows': total_rows,
+                        'records': records,
+                        'filtered_rows': filtered_rows,
+                        'category_counts': category_counts,
+                        'output_bytes': sync_output(output_file),
+                    })
+            
+            metrics.end_chunk(len(chunk), chunk_filtered, chunk_bytes)
+            print(f"  Chunk {chunk_num}: {len(chunk):,} rows → {chunk_filtered:,} nurses (Total: {filtered_rows:,})")
+    
+    if checkpoint_file:
+        clear_checkpoint(checkpoint_file)
+    
+    return {
+        'total_rows': total_rows,
+        'filtered_rows': filtered_rows,
+        'chunks_processed': chunk_num,
+        'category_counts': category_counts
+    }
+
+
+def _filter_range_worker(task: dict) -> dict:
+    """
+    Process pool worker: filter one byte range of the input CSV with Pandas
+    and write the matching rows (without header) to its own part file.
+    """
+    total_rows = 0
+    filtered_rows = 0
+    category_counts = None
+    chunk_num = 0
+    
+    with open_csv_range(task['input_file'], task['header'], task['start'], task['end']) as stream:
+        with open(task['part_file'], 'w', encoding='utf-8', newline='') as part:
+            # dtype=str as in filter_nurses_pandas, so ranges write identical text
+            for chunk in pd.read_csv(stream, chunksize=task['chunk_size'], dtype=str, on_bad_lines='skip'):
+                chunk_num += 1
+                total_rows += len(chunk)
+                
+                df_filtered = filter_chunk_pandas(chunk, *task['filters'])
+                filtered_rows += len(df_filtered)
+                category_counts = merge_category_counts(
+                    category_counts, NURSE_CLASSIFIER.count_categories(df_filtered[NURSE_CATEGORIES_COLUMN])
+                )
+                
+                if len(df_filtered) > 0:
+                    df_output = df_filtered[task['columns']]
+                    if task['key_columns']:
+                        df_output = with_key_columns_pandas(df_output, df_filtered)
+                    df_output.to_csv(part, header=False, index=False)
+    
+    return {
+        'index': task['index'],
+        'input_bytes': task['end'] - task['start'],
+        'total_rows': total_rows,
+        'filtered_rows': filtered_rows,
+        'chunks_processed': chunk_num,
+        'category_counts': category_counts
+    }
+
+
+def filter_nurses_parallel(
+    input_file: str,
+    output_file: str,
+    chunk_size: int,
+    workers: int,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    different_phones: Optional[bool] = False,
+    key_columns: bool = False,
+) -> dict:
+    """
+    Filter nurses from CSV using a pool of Pandas worker processes.
+    
+    The input is split into newline-aligned byte ranges (quote-aware, so
+    embedded newlines are never split), each range is filtered by a worker
+    into its own part file, and the parts are concatenated in file order.
+    
+    Args:
+        input_file: Path to input CSV file
+        output_file: Path to output CSV file
+        chunk_size: Number of rows each worker processes at a time
+        workers: Number of worker processes
+        first_name: Filter by provider first name (case-insensitive partial match)
+        last_name: Filter by provider last name (case-insensitive partial match)
+        city: Filter by city (case-insensitive partial match)
+        state: Filter by state code (exact match, case-insensitive)
+        different_phones: Keep only rows whose mailing and practice phones differ
+        key_columns: Append the normalized match-key columns (MATCH_KEY_COLUMNS)
+    
+    Returns:
+        Dictionary with processing statistics
+    """
+    print(f"\nProcessing file: {input_file}")
+    print(f"File size: {format_size(get_file_size(input_file))}")
+    print(f"Output file: {output_file}")
+    print(f"Chunk size: {chunk_size:,} rows")
+    print(f"Workers: {workers}")
+    
+    filters_applied = describe_filters(first_name, last_name, city, state, different_phones)
+    if filters_applied:
+        print(f"Filters: {', '.join(filters_applied)}")
+    
+    # More ranges than workers keeps every core busy until the end
+    ranges = split_csv_ranges(input_file, workers * 4)
+    header, _ = read_header_bytes(input_file)
+    columns = [col for col in USEFUL_COLUMNS if col in read_csv_header(input_file)]
+    part_files = [f"{output_file}.part{i:04d}" for i in range(len(ranges))]
+    
+    print(f"\nProcessing {len(ranges)} byte ranges...")
+    
+    tasks = [
+        {
+            'index': i,
+            'input_file': input_file,
+            'header': header,
+            'start': start,
+            'end': end,
+            'part_file': part_files[i],
+            'chunk_size': chunk_size,
+            'columns': columns,
+            'key_columns': key_columns,
+            'filters': (first_name, last_name, city, state, different_phones),
+        }
+        for i, (start, end) in enumerate(ranges)
+    ]
+    
+    # Workers read their byte ranges; the header is read once here
+    input_bytes = len(header)
+    total_rows = 0
+    filtered_rows = 0
+    category_counts = None
+    chunk_num = 0
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_filter_range_worker, task) for task in tasks]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                input_bytes += result['input_bytes']
+                total_rows += result['total_rows']
+                filtered_rows += result['filtered_rows']
+                chunk_num += result['chunks_processed']
+                if result['category_counts']:
+                    category_counts = merge_category_counts(category_counts, result['category_counts'])
+                print(f"  Range {result['index'] + 1} ({done}/{len(tasks)} done): "
+                      f"{result['total_rows']:,} rows → {result['filtered_rows']:,} nurses (Total: {filtered_rows:,})")
+        
+        # Concatenate part files in file order under a single header
+        pd.DataFrame(columns=columns + (MATCH_KEY_COLUMNS if key_columns else [])).to_csv(output_file, index=False)
+        with open(output_file, 'ab') as out:
+            for part_file in part_files:
+                with open(part_file, 'rb') as part:
+                    shutil.copyfileobj(part, out)
+    finally:
+        for part_file in part_files:
+            if os.path.exists(part_file):
+                os.remove(part_file)
+    
+    return {
+        'total_rows': total_rows,
+        'filtered_rows': filtered_rows,
+        'chunks_processed': chunk_num,
+        'category_counts': category_counts,
+        'input_bytes': input_bytes,
+    }
+
+
+def filter_nurses_cached(
+    cache_dir: str,
+    output_file: str,
+    chunk_size: int,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    different_phones: Optional[bool] = False,
+    key_columns: bool = False,
+) -> dict:
+    """
+    Filter nurses from the Parquet cache built by ``convert``.
+    
+    Only ``USEFUL_COLUMNS`` are stored in the cache and it is partitioned by
+    practice-location state, so a ``state`` filter only reads that state's
+    partition. Rows are written in CSV order (by ``_source_row``), text
+    columns as stored and dates back in the CSV's MM/DD/YYYY format, so the
+    output matches the CSV engines.
+    
+    Args:
+        cache_dir: Parquet cache directory
+        output_file: Path to output CSV file
+        chunk_size: Number of rows to process at a time (Pandas only)
+        first_name: Filter by provider first name (case-insensitive partial match)
+        last_name: Filter by provider last name (case-insensitive partial match)
+        city: Filter by city (case-insensitive partial match)
+        state: Filter by state code (exact match, case-insensitive)
+        different_phones: Keep only rows whose mailing and practice phones differ
+        key_columns: Append the normalized match-key columns (MATCH_KEY_COLUMNS)
+    
+    Returns:
+        Dictionary with processing statistics
+    """
+    manifest = load_manifest(cache_dir)
+    states = [state] if state else None
+    partition_files = cache_partition_files(cache_dir, states)
+    columns = manifest['columns']
+    available_useful_cols = [col for col in USEFUL_COLUMNS if col in columns]
+    
+    print(f"\nProcessing Parquet cache: {cache_dir}")
+    print(f"Source: {manifest['source']} ({manifest['total_rows']:,} rows)")
+    print(f"Partitions: {len(partition_files)} of {len(manifest['partitions'])}")
+    print(f"Output file: {output_file}")
+    
+    filters_applied = describe_filters(first_name, last_name, city, state, different_phones)
+    if filters_applied:
+        print(f"Filters: {', '.join(filters_applied)}")
+    
+    scanned_paths = {os.path.join(cache_dir, p['path']) for p in manifest['partitions']}.intersection(partition_files)
+    total_rows = sum(
+        p['rows'] for p in manifest['partitions'] if os.path.join(cache_dir, p['path']) in scanned_paths
+    )
+    input_bytes = sum(get_file_size(path) for path in scanned_paths)
+    
+    if USE_POLARS:
+        print("\nStreaming filter...")
+        lazy_df = scan_cache_polars(cache_dir, states)
+        (
+            lazy_df
+            .filter(build_polars_filter(columns, first_name, last_name, city, state, different_phones))
+            .sort(SOURCE_ROW_COLUMN)
+            .select(available_useful_cols + (polars_key_columns(lazy_df.collect_schema()) if key_columns else []))
+            .sink_csv(output_file, date_format='%m/%d/%Y')
+        )
+        filtered_rows = pl.scan_csv(output_file, infer_schema_length=0).select(pl.len()).collect().item()
+        return {
+            'total_rows': total_rows,
+            'filtered_rows': filtered_rows,
+            'chunks_processed': 0,
+            'category_counts': count_output_categories(output_file),
+            'input_bytes': input_bytes,
+        }
+    
+    print("\nProcessing chunks...")
+    filtered_rows = 0
+    category_counts = None
+    first_chunk = True
+    chunk_num = 0
+    for chunk in iter_cache_chunks(cache_dir, states=states, chunk_size=chunk_size):
+        chunk_num += 1
+        df_filtered = filter_chunk_pandas(chunk, first_name, last_name, city, state, different_phones)
+        filtered_rows += len(df_filtered)
+        category_counts = merge_category_counts(
+            category_counts, NURSE_CLASSIFIER.count_categories(df_filtered[NURSE_CATEGORIES_COLUMN])
+        )
+        
+        if len(df_filtered) > 0:
+            df_output = df_filtered[available_useful_cols]
+            if key_columns:
+                df_output = with_key_columns_pandas(df_output, df_filtered)
+            df_output.to_csv(
+                output_file,
+                mode='w' if first_chunk else 'a',
+                header=first_chunk,
+                index=False
+            )
+            first_chunk = False
+        
+        print(f"  Chunk {chunk_num}: {len(chunk):,} rows → {len(df_filtered):,} nurses (Total: {filtered_rows:,})")
+    
+    return {
+        'total_rows': total_rows,
+        'filtered_rows': filtered_rows,
+        'chunks_processed': chunk_num,
+        'category_counts': category_counts,
+        'input_bytes': input_bytes,
+    }
+
+
+def _parse_nppes_date(column: str) -> "pl.Expr":
+    """Parse an NPPES MM/DD/YYYY column to a Polars date (blank/invalid -> null)."""
+    return pl.col(column).str.strptime(pl.Date, NPPES_DATE_FORMAT, strict=False)
+
+
+def init_incremental_state(output_file: str, state_file: str, source: str, filters: List[str]) -> dict:
+    """
+    Create the incremental state for an output written by a full run.
     
-    return {
-        'total_rows': total_rows,
-        'filtered_rows': filtered_rows,
-        'chunks_processed': chunk_num
-    }
+    The watermark is the newest ``Last Update Date`` in the output; rows of
+    the next dump/delta updated on or after it are upserted by the next
+    ``--incremental`` run.
+    """
+    if os.path.exists(output_file):
+        output = pl.read_csv(output_file, infer_schema_length=0, columns=['NPI', LAST_UPDATE_COLUMN])
+        npis = output['NPI'].drop_nulls().to_list()
+        watermark = output.select(_parse_nppes_date(LAST_UPDATE_COLUMN).max()).item()
+    else:
+        npis, watermark = [], None
+    return save_state(state_file, source, watermark, npis, filters)
 
 
-def filter_nurses_pandas(
+def filter_nurses_incremental(
     input_file: str,
     output_file: str,
-    chunk_size: int,
+    state_file: str,
     first_name: Optional[str] = None,
     last_name: Optional[str] = None,
     city: Optional[str] = None,
@@ -205,122 +1090,412 @@ def filter_nurses_pandas(
     different_phones: Optional[bool] = False,
 ) -> dict:
     """
-    Filter nurses from CSV using Pandas (fallback method).
+    Upsert rows updated since the state's watermark into an existing output.
+    
+    ``input_file`` can be a full NPPES dump or a weekly delta file. Only rows
+    whose ``Last Update Date``, ``NPI Deactivation Date`` or ``NPI
+    Reactivation Date`` is on or after the watermark are read. The watermark day itself is read again: records
+    dated that day can first appear in the next delta, and the upsert by NPI
+    is idempotent. Each of them replaces the output row with the same
+    NPI (updated rows keep their position, new nurses are appended); NPIs
+    that were deactivated, or no longer pass the filters, are removed.
     
     Args:
-        input_file: Path to input CSV file
-        output_file: Path to output CSV file
-        chunk_size: Number of rows to process at a time
+        input_file: Path to the full dump or delta CSV file
+        output_file: Existing output CSV file written by a previous run
+        state_file: Incremental state file (see incremental_state.py)
         first_name: Filter by provider first name (case-insensitive partial match)
         last_name: Filter by provider last name (case-insensitive partial match)
         city: Filter by city (case-insensitive partial match)
         state: Filter by state code (exact match, case-insensitive)
+        different_phones: Keep only rows whose mailing and practice phones differ
     
     Returns:
         Dictionary with processing statistics
     """
-    total_rows = 0
-    filtered_rows = 0
-    first_chunk = True
+    run_state = load_state(state_file)
+    watermark = get_watermark(run_state)
+    previous_npis = set(run_state['npis'])
     
     print(f"\nProcessing file: {input_file}")
     print(f"File size: {format_size(get_file_size(input_file))}")
-    print(f"Output file: {output_file}")
-    print(f"Chunk size: {chunk_size:,} rows")
-    
-    # Build filter description
-    filters_applied = []
-    if first_name:
-        filters_applied.append(f"First name contains '{first_name}'")
-    if last_name:
-        filters_applied.append(f"Last name contains '{last_name}'")
-    if city:
-        filters_applied.append(f"City contains '{city}'")
-    if state:
-        filters_applied.append(f"State = '{state}'")
-    if different_phones:
-        filters_applied.append("Mailing phone ≠ Practice location phone")
+    print(f"Output file: {output_file} (incremental upsert)")
+    print(f"Watermark: {watermark.isoformat() if watermark else 'none (processing every row)'}")
     
+    filters_applied = describe_filters(first_name, last_name, city, state, different_phones)
     if filters_applied:
         print(f"Filters: {', '.join(filters_applied)}")
     
-    print("\nProcessing chunks...")
+    columns = read_csv_header(input_file)
+    available_useful_cols = [col for col in USEFUL_COLUMNS if col in columns]
+    
+    updated_on = _parse_nppes_date(LAST_UPDATE_COLUMN) if LAST_UPDATE_COLUMN in columns else pl.lit(None, pl.Date)
+    if DEACTIVATION_DATE_COLUMN in columns:
+        deactivated_on = _parse_nppes_date(DEACTIVATION_DATE_COLUMN)
+    else:
+        deactivated_on = pl.lit(None, pl.Date)
+    if REACTIVATION_DATE_COLUMN in columns:
+        reactivated_on = _parse_nppes_date(REACTIVATION_DATE_COLUMN)
+    else:
+        reactivated_on = pl.lit(None, pl.Date)
     
-    # Process CSV in chunks using Pandas
+    changed = pl.scan_csv(input_file, infer_schema_length=0, low_memory=True, ignore_errors=True)
+    if watermark is not None:
+        changed = changed.filter(
+            (updated_on >= watermark) | (deactivated_on >= watermark) | (reactivated_on >= watermark)
+        )
+    
+    print("\nScanning rows updated since the watermark...")
+    changed = (
+        changed
+        .select(
+            *available_useful_cols,
+            build_polars_filter(columns, first_name, last_name, city, state, different_phones).alias('_keep'),
+            (deactivated_on.is_not_null() & (reactivated_on.is_null() | (reactivated_on < deactivated_on))).alias('_deactivated'),
+            pl.max_horizontal(updated_on, deactivated_on, reactivated_on).alias('_changed_on'),
+        )
+        .filter(pl.col('NPI').is_not_null())
+        .collect()
+        # A delta can list an NPI more than once; the last row wins
+        .unique(subset='NPI', keep='last', maintain_order=True)
+    )
+    
+    upserts = changed.filter(pl.col('_keep') & ~pl.col('_deactivated'))
+    upsert_npis = set(upserts['NPI'].to_list())
+    touched_npis = set(changed['NPI'].to_list())
+    deactivated_npis = set(changed.filter(pl.col('_deactivated'))['NPI'].to_list())
+    
+    existing = pl.read_csv(output_file, infer_schema_length=0).with_row_index('_pos')
+    output_columns = [col for col in existing.columns if col != '_pos']
+    existing_positions = existing.select('NPI', '_pos')
+    
+    upserts = (
+        upserts
+        .select([pl.col(col) if col in upserts.columns else pl.lit(None, pl.Utf8).alias(col) for col in output_columns])
+        .join(existing_positions, on='NPI', how='left')
+        .with_row_index('_new')
+        .with_columns(pl.col('_pos').fill_null(pl.col('_new') + existing.height).cast(existing['_pos'].dtype))
+        .drop('_new')
+    )
+    result = (
+        pl.concat([existing.filter(~pl.col('NPI').is_in(list(touched_npis))), upserts.select(existing.columns)])
+        .sort('_pos')
+        .drop('_pos')
+    )
+    
+    tmp_file = output_file + '.tmp'
+    result.write_csv(tmp_file)
+    os.replace(tmp_file, output_file)
+    
+    new_watermark = changed['_changed_on'].max()
+    if watermark is not None and (new_watermark is None or new_watermark < watermark):
+        new_watermark = watermark
+    save_state(state_file, input_file, new_watermark, result['NPI'].to_list(), filters_applied)
+    
+    inserted = len(upsert_npis - previous_npis)
+    updated = len(upsert_npis & previous_npis)
+    removed = len((touched_npis - upsert_npis) & previous_npis)
+    print(f"  Rows updated since watermark: {changed.height:,}")
+    print(f"  Inserted: {inserted:,} | Updated: {updated:,} | Removed: {removed:,} "
+          f"(deactivated: {len(deactivated_npis & previous_npis):,})")
+    print(f"  New watermark: {new_watermark.isoformat() if new_watermark else 'none'}")
+    
+    return {
+        'total_rows': changed.height,
+        'filtered_rows': result.height,
+        'chunks_processed': 0,
+        'category_counts': count_output_categories(output_file),
+        'input_bytes': get_file_size(input_file),
+    }
+
+
+def filter_nurses_fanout(
+    input_file: str,
+    filter_sets: List[FilterSet],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    metrics: PipelineMetrics = NULL_METRICS,
+) -> dict:
+    """
+    Write many filtered extracts (a ``--spec`` file) in a single pass.
+    
+    Each chunk is parsed and classified once; non-nurses are dropped, then the
+    masks of all filter sets are evaluated in one Polars query (shared
+    sub-expressions such as lower-cased city names are computed once) and
+    each row is appended to every extract it matches. An extract holds the
+    same rows, in the same order, as a single run with the same filters.
+    
+    Args:
+        input_file: Path to input CSV file
+        filter_sets: Extracts to write (see filter_spec.py)
+        chunk_size: Number of rows to process at a time
+        metrics: Per-chunk stage timings (read, taxonomy, route, write)
+    
+    Returns:
+        Dictionary with processing statistics; ``outputs`` holds the rows and
+        category counts of each extract
+    """
+    print(f"\nProcessing file: {input_file}")
+    print(f"File size: {format_size(get_file_size(input_file))}")
+    print(f"Chunk size: {chunk_size:,} rows")
+    print(f"Extracts: {len(filter_sets)}")
+    for filter_set in filter_sets:
+        filters_applied = filter_set.describe()
+        print(f"  {filter_set.name} → {filter_set.output_file}"
+              f" ({', '.join(filters_applied) if filters_applied else 'all nurses'})")
+    
+    for filter_set in filter_sets:
+        output_dir = os.path.dirname(filter_set.output_file)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+    
+    outputs = {
+        filter_set.name: {'output_file': filter_set.output_file, 'rows': 0, 'category_counts': None}
+        for filter_set in filter_sets
+    }
+    total_rows = 0
+    nurse_rows = 0
     chunk_num = 0
-    for chunk in pd.read_csv(input_file, chunksize=chunk_size, low_memory=False, on_bad_lines='skip'):
-        chunk_num += 1
-        total_rows += len(chunk)
-        
-        # Filter for nurses: check if ANY taxonomy code column contains a nurse code
-        # Filter for nurse taxonomy codes (using prefix matching)
-        # This allows matching all specializations (e.g., '163W' matches '163W00000X', '163WA0400X', etc.)
-        nurse_mask = pd.Series([False] * len(chunk), index=chunk.index)
-        for col in TAXONOMY_CODE_COLUMNS:
-            if col in chunk.columns:
-                for code_prefix in NURSE_TAXONOMY_CODES:
-                    nurse_mask |= chunk[col].astype(str).str.startswith(code_prefix, na=False)
-        
-        df_filtered = chunk[nurse_mask]
-        
-        # Apply additional filters
-        if first_name and FILTER_COLUMNS['first_name'] in df_filtered.columns:
-            df_filtered = df_filtered[
-                df_filtered[FILTER_COLUMNS['first_name']].str.lower().str.contains(first_name.lower(), na=False)
-            ]
-        
-        if last_name and FILTER_COLUMNS['last_name'] in df_filtered.columns:
-            df_filtered = df_filtered[
-                df_filtered[FILTER_COLUMNS['last_name']].str.lower().str.contains(last_name.lower(), na=False)
-            ]
-        
-        if city and FILTER_COLUMNS['city'] in df_filtered.columns:
-            df_filtered = df_filtered[
-                df_filtered[FILTER_COLUMNS['city']].str.lower().str.contains(city.lower(), na=False)
-            ]
+    available_useful_cols = None
+    
+    print("\nProcessing chunks...")
+    
+    reader = pl.read_csv_batched(
+        input_file,
+        batch_size=chunk_size,
+        infer_schema_length=0,  # every column as text, as in the input (leading zeros kept)
+        low_memory=True,
+        ignore_errors=True,
+    )
+    
+    while True:
+        metrics.start_chunk()
+        with metrics.stage('read'):
+            chunk = reader.next_batches(1)
+        if chunk is None or len(chunk) == 0:
+            break
         
-        if state and FILTER_COLUMNS['state'] in df_filtered.columns:
-            df_filtered = df_filtered[
-                df_filtered[FILTER_COLUMNS['state']].str.upper() == state.upper()
-            ]
+        df = chunk[0]
+        chunk_num += 1
+        total_rows += len(df)
         
-        # Filter by different phone numbers
-        if different_phones:
-            if PHONE_MAILING_COLUMN in df_filtered.columns and PHONE_PRACTICE_COLUMN in df_filtered.columns:
-                df_filtered = df_filtered[
-                    df_filtered[PHONE_MAILING_COLUMN].notna() &
-                    df_filtered[PHONE_PRACTICE_COLUMN].notna() &
-                    (df_filtered[PHONE_MAILING_COLUMN] != df_filtered[PHONE_PRACTICE_COLUMN])
-                ]
+        with metrics.stage('taxonomy'):
+            df = df.with_columns(
+                NURSE_CLASSIFIER.categories_polars([col for col in TAXONOMY_CODE_COLUMNS if col in df.columns])
+            )
+            if available_useful_cols is None:
+                available_useful_cols = [col for col in USEFUL_COLUMNS if col in df.columns]
+            # Every filter column is one of USEFUL_COLUMNS, so project before
+            # routing instead of filtering all ~330 columns once per set
+            nurses = (
+                df.filter(pl.col(NURSE_CATEGORIES_COLUMN) != 0)
+                .select(available_useful_cols + [NURSE_CATEGORIES_COLUMN])
+            )
+        nurse_rows += len(nurses)
         
-        chunk_filtered = len(df_filtered)
-        filtered_rows += chunk_filtered
+        # One boolean column per filter set, evaluated together
+        with metrics.stage('route'):
+            masks = nurses.lazy().select([
+                polars_filter_set_expr(nurses.columns, filter_set).alias(f'_set{i}')
+                for i, filter_set in enumerate(filter_sets)
+            ]).collect()
         
-        # Write to output file (only useful columns)
-        if chunk_filtered > 0:
-            # Select only useful columns that exist in the dataframe
-            available_useful_cols = [col for col in USEFUL_COLUMNS if col in df_filtered.columns]
-            df_output = df_filtered[available_useful_cols]
+        routed = 0
+        for i, filter_set in enumerate(filter_sets):
+            with metrics.stage('route'):
+                df_filtered = nurses.filter(masks[f'_set{i}'])
+            if len(df_filtered) == 0:
+                continue
+            routed += len(df_filtered)
             
-            df_output.to_csv(
-                output_file,
-                mode='w' if first_chunk else 'a',
-                header=first_chunk,
-                index=False
-            )
-            first_chunk = False
+            output = outputs[filter_set.name]
+            with metrics.stage('stats'):
+                output['category_counts'] = merge_category_counts(
+                    output['category_counts'],
+                    NURSE_CLASSIFIER.count_categories(df_filtered[NURSE_CATEGORIES_COLUMN].to_numpy())
+                )
+            with metrics.stage('write'):
+                df_output = df_filtered.drop(NURSE_CATEGORIES_COLUMN)
+                if output['rows'] == 0:
+                    df_output.write_csv(filter_set.output_file)
+                else:
+                    with open(filter_set.output_file, 'ab') as f:
+                        df_output.write_csv(f, include_header=False)
+            output['rows'] += len(df_filtered)
         
-        print(f"  Chunk {chunk_num}: {len(chunk):,} rows → {chunk_filtered:,} nurses (Total: {filtered_rows:,})")
+        metrics.end_chunk(len(df), routed)
+        print(f"  Chunk {chunk_num}: {len(df):,} rows → {len(nurses):,} nurses → {routed:,} extract rows")
+    
+    # Whole-file scan by the memory-mapped batched reader (no per-chunk offsets)
+    metrics.add_input_bytes(get_file_size(input_file))
+    
+    # Extracts without matches still get a header, so every output listed in
+    # the spec exists after the run
+    for filter_set in filter_sets:
+        if outputs[filter_set.name]['rows'] == 0:
+            with open(filter_set.output_file, 'w', encoding='utf-8', newline='') as f:
+                csv.writer(f, lineterminator='\n').writerow(available_useful_cols or USEFUL_COLUMNS)
     
     return {
         'total_rows': total_rows,
-        'filtered_rows': filtered_rows,
-        'chunks_processed': chunk_num
+        'filtered_rows': nurse_rows,
+        'chunks_processed': chunk_num,
+        'outputs': outputs,
     }
 
 
+def spec_main(args: argparse.Namespace) -> None:
+    """Run ``--spec``: validate the options, write every extract and print a summary."""
+    if not USE_POLARS:
+        print("Erro: --spec requer Polars. Instale com: pip install polars")
+        sys.exit(1)
+    if args.engine not in ('auto', 'polars') or args.workers > 1 or args.incremental or args.resume:
+        print("Erro: --spec só é suportado com --engine polars (sem --workers/--incremental/--resume)")
+        sys.exit(1)
+    if describe_filters(args.first_name, args.last_name, args.city, args.state, args.different_phones):
+        print("Erro: com --spec, defina os filtros no arquivo (use 'defaults' para os filtros comuns)")
+        sys.exit(1)
+    
+    try:
+        filter_sets = load_spec(args.spec)
+    except (OSError, FilterSpecError) as e:
+        print(f"Erro: spec inválido: {e}")
+        sys.exit(1)
+    
+    input_path = os.path.abspath(args.input_file)
+    if any(os.path.abspath(fs.output_file) == input_path for fs in filter_sets):
+        print("Erro: um dos arquivos de saída do spec é o próprio arquivo de entrada")
+        sys.exit(1)
+    
+    existing = [fs.output_file for fs in filter_sets if os.path.exists(fs.output_file)]
+    if existing:
+        response = input(f"Warning: {len(existing)} output file(s) already exist "
+                         f"({', '.join(existing[:3])}{', ...' if len(existing) > 3 else ''}). Overwrite? (y/n): ")
+        if response.lower() != 'y':
+            print("Aborted.")
+            sys.exit(0)
+    
+    metrics = PipelineMetrics.open(args.metrics, 'fanout', args.metrics_format)
+    try:
+        stats = filter_nurses_fanout(args.input_file, filter_sets, args.chunk_size, metrics)
+        
+        print("\n" + "="*60)
+        print("PROCESSING COMPLETE")
+        print("="*60)
+        print(f"Total rows processed: {stats['total_rows']:,}")
+        print(f"Nurses found: {stats['filtered_rows']:,}")
+        print(f"Chunks processed: {stats['chunks_processed']:,}")
+        print("\nExtracts:")
+        for name, output in stats['outputs'].items():
+            print(f"  {name:30s} {output['rows']:>10,}  {output['output_file']}")
+        if metrics.enabled:
+            print(f"\nMetrics ({metrics.format}) saved to: {args.metrics}")
+        print("="*60)
+    except KeyboardInterrupt:
+        print("\n\nProcessing interrupted by user.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"\nError: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        metrics.close()
+
+
+def convert_main(argv: List[str]) -> int:
+    """Entry point for the ``convert`` subcommand (CSV -> Parquet cache)."""
+    parser = argparse.ArgumentParser(
+        prog='process_nurses.py convert',
+        description='Convert the NPI CSV once into a Parquet cache partitioned by practice state. '
+                    'Later runs read it with --cache while it matches the CSV.',
+    )
+    parser.add_argument(
+        'input_file',
+        nargs='?',
+        default='data.csv',
+        help='Path to input CSV file (default: data.csv na raiz do projeto)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='Cache directory (default: <input>.parquet next to the CSV)'
+    )
+    args = parser.parse_args(argv)
+    
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if not os.path.isabs(args.input_file):
+        args.input_file = os.path.join(script_dir, args.input_file)
+    if not os.path.exists(args.input_file):
+        print(f"Erro: Arquivo '{args.input_file}' não encontrado.")
+        return 1
+    
+    cache_dir = args.cache_dir or get_cache_dir(args.input_file)
+    if find_fresh_cache(args.input_file, cache_dir):
+        print(f"Cache is already up to date: {cache_dir}")
+        return 0
+    
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("Erro: convert requer pyarrow. Instale com: pip install pyarrow")
+        return 1
+    
+    print(f"\nConverting: {args.input_file} ({format_size(get_file_size(args.input_file))})")
+    print(f"Cache directory: {cache_dir}\n")
+    manifest = convert_csv_to_parquet(args.input_file, cache_dir)
+    
+    cache_size = sum(
+        get_file_size(os.path.join(cache_dir, p['path'])) for p in manifest['partitions']
+    )
+    print("\n" + "="*60)
+    print("CONVERSION COMPLETE")
+    print("="*60)
+    print(f"Rows: {manifest['total_rows']:,}")
+    print(f"Columns: {len(manifest['columns'])}")
+    print(f"Partitions: {len(manifest['partitions'])}")
+    print(f"Cache size: {format_size(cache_size)}")
+    print("="*60)
+    return 0
+
+
+def run_pipeline(
+    args: argparse.Namespace,
+    pipeline: str,
+    cache_dir: Optional[str],
+    state_file: str,
+    checkpoint_file: str,
+    metrics: PipelineMetrics = NULL_METRICS,
+) -> dict:
+    """Run the engine chosen by main() with the command-line filters."""
+    filters = (args.first_name, args.last_name, args.city, args.state, args.different_phones)
+    key_columns = args.key_columns
+    if pipeline == 'incremental':
+        return filter_nurses_incremental(args.input_file, args.output_file, state_file, *filters)
+    if pipeline == 'cached':
+        return filter_nurses_cached(cache_dir, args.output_file, args.chunk_size, *filters, key_columns=key_columns)
+    if pipeline == 'parallel':
+        return filter_nurses_parallel(
+            args.input_file, args.output_file, args.chunk_size, args.workers, *filters, key_columns=key_columns
+        )
+    if pipeline == 'lazy':
+        return filter_nurses_lazy(args.input_file, args.output_file, *filters, key_columns=key_columns)
+    engine = filter_nurses_polars if pipeline == 'polars' else filter_nurses_pandas
+    return engine(
+        args.input_file,
+        args.output_file,
+        args.chunk_size,
+        *filters,
+        checkpoint_file=checkpoint_file,
+        resume=args.resume,
+        metrics=metrics,
+        key_columns=key_columns
+    )
+
+
 def main():
     """Main entry point for the script."""
+    if len(sys.argv) > 1 and sys.argv[1] == 'convert':
+        sys.exit(convert_main(sys.argv[2:]))
+    
     parser = argparse.ArgumentParser(
         description='Process large NPI CSV files to extract nurse records.',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -340,6 +1515,25 @@ Examples:
   
   # Use custom chunk size for better performance
   python process_nurses.py --output nurses.csv --chunk-size 250000
+  
+  # Lazy streaming engine (only parses the columns it needs)
+  python process_nurses.py --output nurses.csv --engine lazy
+  
+  # Split the file across 8 worker processes (Pandas per worker)
+  python process_nurses.py --output nurses.csv --workers 8
+  
+  # Convert data.csv once to a Parquet cache, then filter from it
+  python process_nurses.py convert data.csv
+  python process_nurses.py --output nurses.csv --cache
+  
+  # Continue an interrupted run from its last checkpoint
+  python process_nurses.py --output nurses.csv --resume
+  
+  # Incremental refresh: upsert only rows updated since the last run
+  python process_nurses.py weekly_delta.csv --output nurses.csv --incremental
+  
+  # Add the normalized match keys used by the compare scripts
+  python process_nurses.py --output nurses.csv --key-columns
 
 Nurse Taxonomy Codes Filtered:
   - 363L00000X: Nurse Practitioner
@@ -395,8 +1589,121 @@ Nurse Taxonomy Codes Filtered:
         help='Filter nurses where mailing phone number is different from practice location phone number'
     )
     
+    parser.add_argument(
+        '--engine',
+        choices=['auto', 'polars', 'lazy', 'pandas'],
+        default='auto',
+        help='Processing engine: auto (Polars if installed, else Pandas), polars (chunked), '
+             'lazy (Polars scan_csv with projection/predicate pushdown), pandas (default: auto)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes; values above 1 split the file into byte ranges '
+             'filtered in parallel with Pandas (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        help='Parquet cache directory built by "convert" (default: <input>.parquet)'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help='Read the Parquet cache built by "convert" instead of the CSV while it matches the CSV '
+             '(default: --no-cache, always parse the CSV with the chosen --engine)'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Upsert rows updated after the last run (Last Update Date watermark) into the '
+             'existing output by NPI; the input can be a full dump or a weekly delta. '
+             'The first run processes everything and creates the state file (requires Polars)'
+    )
+    
+    parser.add_argument(
+        '--state-file',
+        help='Incremental state file (default: <output>.state.json)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted polars/pandas run from its last checkpoint '
+             '(<output>.checkpoint.json) instead of starting over'
+    )
+    
+    parser.add_argument(
+        '--spec',
+        metavar='PATH',
+        help='JSON/YAML file listing named filter sets; one scan writes one extract per set '
+             '(see filter_spec.py). --output and the filter options are not used'
+    )
+    
+    parser.add_argument(
+        '--key-columns',
+        action='store_true',
+        help='Append normalized match-key columns (key_first_name, key_licenses, ...) that the '
+             'compare scripts use instead of normalizing names/licenses/phones again'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        metavar='PATH',
+        help='Write per-chunk stage timings, rows in/out, bytes read and peak RSS to PATH '
+             '(JSON lines, or Prometheus text for .prom/.txt files)'
+    )
+    
+    parser.add_argument(
+        '--metrics-format',
+        choices=METRICS_FORMATS,
+        help='Format of --metrics (default: from the file extension)'
+    )
+    
     args = parser.parse_args()
     
+    if args.resume and (args.workers > 1 or args.engine == 'lazy' or args.incremental):
+        print("Erro: --resume só é suportado com --engine polars ou pandas (sem --workers/--incremental)")
+        sys.exit(1)
+    
+    if args.incremental and not USE_POLARS:
+        print("Erro: --incremental requer Polars. Instale com: pip install polars")
+        sys.exit(1)
+    
+    if args.key_columns and (args.incremental or args.spec):
+        print("Erro: --key-columns não é suportado com --incremental/--spec")
+        sys.exit(1)
+    
+    if args.key_columns and pd is None:
+        print("Erro: --key-columns requer Pandas. Instale com: pip install pandas")
+        sys.exit(1)
+    
+    if args.cache and (args.resume or args.workers > 1 or args.engine != 'auto'):
+        print("Erro: --cache não pode ser combinado com --resume, --workers ou --engine")
+        sys.exit(1)
+    
+    if args.workers > 1:
+        if pd is None:
+            print("Erro: --workers requer Pandas. Instale com: pip install pandas")
+            sys.exit(1)
+        if args.engine not in ('auto', 'pandas'):
+            print("Erro: --workers só pode ser usado com --engine pandas (ou auto)")
+            sys.exit(1)
+    
+    if args.engine == 'auto':
+        args.engine = 'polars' if USE_POLARS else 'pandas'
+    if args.engine in ('polars', 'lazy') and not USE_POLARS:
+        print(f"Erro: engine '{args.engine}' requer Polars. Instale com: pip install polars")
+        sys.exit(1)
+    if args.engine == 'pandas' and pd is None:
+        print("Erro: engine 'pandas' requer Pandas. Instale com: pip install pandas")
+        sys.exit(1)
+    
     # Get the script directory (project root)
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -413,68 +1720,125 @@ Nurse Taxonomy Codes Filtered:
         print(f"  python process_nurses.py /caminho/para/arquivo.csv --output nurses.csv")
         sys.exit(1)
     
+    if args.spec:
+        spec_main(args)
+        return
+    
+    # Incremental runs upsert into the existing output instead of overwriting it
+    filters_applied = describe_filters(args.first_name, args.last_name, args.city, args.state, args.different_phones)
+    state_file = args.state_file or get_state_file(args.output_file)
+    run_state = None
+    if args.incremental and os.path.exists(args.output_file):
+        run_state = load_state(state_file)
+        if run_state is None:
+            print(f"No incremental state found ({state_file}); running a full pass first.")
+        elif run_state.get('filters') != filters_applied:
+            print("Erro: os filtros são diferentes dos usados no estado incremental "
+                  f"({', '.join(run_state.get('filters') or ['nenhum'])}).")
+            print("Rode sem --incremental (ou use outro --output) para reconstruir a saída.")
+            sys.exit(1)
+    
     # Check if output file already exists
-    if os.path.exists(args.output_file):
+    checkpoint_file = get_checkpoint_file(args.output_file)
+    if os.path.exists(args.output_file) and run_state is None and not args.resume:
         response = input(f"Warning: Output file '{args.output_file}' already exists. Overwrite? (y/n): ")
         if response.lower() != 'y':
             print("Aborted.")
             sys.exit(0)
     
+    # With --cache, read the Parquet cache while it matches the CSV
+    cache_dir = find_fresh_cache(args.input_file, args.cache_dir) if args.cache else None
+    if cache_dir is None and args.cache:
+        if os.path.exists(args.cache_dir or get_cache_dir(args.input_file)):
+            print("Parquet cache is stale (CSV changed); reading the CSV. Run 'convert' to refresh it.")
+        else:
+            print("No Parquet cache found; reading the CSV. Run 'convert' to build it.")
+    
+    if run_state is not None:
+        pipeline = 'incremental'
+    elif cache_dir:
+        pipeline = 'cached'
+    elif args.workers > 1:
+        pipeline = 'parallel'
+    else:
+        pipeline = args.engine
+    
+    # The polars/pandas engines time every chunk; the others are timed as a
+    # single 'run' stage
+    metrics = PipelineMetrics.open(args.metrics, pipeline, args.metrics_format)
+    chunked = pipeline in ('polars', 'pandas')
+    
     # Process the file
     try:
-        if USE_POLARS:
-            stats = filter_nurses_polars(
-                args.input_file,
-                args.output_file,
-                args.chunk_size,
-                args.first_name,
-                args.last_name,
-                args.city,
-                args.state,
-                args.different_phones
-            )
+        if chunked:
+            stats = run_pipeline(args, pipeline, cache_dir, state_file, checkpoint_file, metrics)
         else:
-            stats = filter_nurses_pandas(
-                args.input_file,
-                args.output_file,
-                args.chunk_size,
-                args.first_name,
-                args.last_name,
-                args.city,
-                args.state,
-                args.different_phones
-            )
+            metrics.start_chunk()
+            with metrics.stage('run'):
+                stats = run_pipeline(args, pipeline, cache_dir, state_file, checkpoint_file)
+            metrics.end_chunk(stats['total_rows'], stats['filtered_rows'], stats.get('input_bytes'))
         
         # Print summary
         print("\n" + "="*60)
         print("PROCESSING COMPLETE")
         print("="*60)
-        print(f"Total rows processed: {stats['total_rows']:,}")
+        if stats['total_rows'] is not None:
+            print(f"Total rows processed: {stats['total_rows']:,}")
+        else:
+            print("Total rows processed: n/a (not counted by the lazy engine)")
         print(f"Nurses found: {stats['filtered_rows']:,}")
-        print(f"Chunks processed: {stats['chunks_processed']:,}")
+        if stats['chunks_processed']:
+            print(f"Chunks processed: {stats['chunks_processed']:,}")
         
-        if stats['total_rows'] > 0:
+        if stats['total_rows'] and run_state is None:
             percentage = (stats['filtered_rows'] / stats['total_rows']) * 100
             print(f"Percentage: {percentage:.2f}%")
         
+        if stats.get('category_counts') and stats['filtered_rows'] > 0:
+            print("\nNurses by category (a nurse can be in several):")
+            for prefix, count in sorted(stats['category_counts'].items(), key=lambda item: item[1], reverse=True):
+                if count > 0:
+                    description = NURSE_TAXONOMY_DESCRIPTIONS.get(prefix, prefix)
+                    print(f"  {prefix} {description:45s} {count:>10,}")
+        
         if stats['filtered_rows'] > 0:
             print(f"\nOutput saved to: {args.output_file}")
             print(f"Output size: {format_size(get_file_size(args.output_file))}")
         else:
             print("\nNo matching records found.")
-            if os.path.exists(args.output_file):
+            if os.path.exists(args.output_file) and not args.incremental:
                 os.remove(args.output_file)
         
+        if args.incremental and run_state is None:
+            new_state = init_incremental_state(args.output_file, state_file, args.input_file, filters_applied)
+            print(f"Incremental state saved to: {state_file} (watermark: {new_state['watermark']})")
+        
+        if metrics.enabled:
+            summary = metrics.summary()
+            print(f"\nMetrics ({metrics.format}) saved to: {args.metrics}")
+            for name, seconds in sorted(summary['stages'].items(), key=lambda item: item[1], reverse=True):
+                print(f"  {name:25s} {seconds:10.3f}s")
+        
         print("="*60)
         
     except KeyboardInterrupt:
         print("\n\nProcessing interrupted by user.")
+        if os.path.exists(checkpoint_file):
+            print("Progress was checkpointed; rerun with --resume to continue.")
+        sys.exit(1)
+    except CheckpointMismatchError as e:
+        print(f"Erro: checkpoint inválido: {e}")
+        print("Rode sem --resume para começar do zero.")
         sys.exit(1)
     except Exception as e:
         print(f"\nError: {e}")
         import traceback
         traceback.print_exc()
+        if os.path.exists(checkpoint_file):
+            print("Progress was checkpointed; fix the problem and rerun with --resume to continue.")
         sys.exit(1)
+    finally:
+        metrics.close()
 
 
 if __name__ == '__main__':
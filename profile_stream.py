@@ -0,0 +1,270 @@
+"""
+Streaming reader for scraped-profile JSON files (phoenix/denver/nursys).
+
+The scraped files are either one JSON array of profiles or JSON Lines (one
+profile per line). Enriched profiles carry the whole People Data Labs
+payload (interests, education, experience, ...), which is most of the file
+and is never used for matching. ``iter_profiles`` parses one profile at a
+time and keeps only the requested fields, so peak memory follows the
+projected fields instead of the raw PDL blobs:
+
+    for profile in iter_profiles('denver.json', MATCH_FIELDS):
+        ...
+
+Fields are dotted paths. ``peopleDataLabs.phone_numbers`` keeps
+``profile['peopleDataLabs']`` (as a dict holding only ``phone_numbers``), so
+checks such as ``profile.get('peopleDataLabs') is not None`` still behave as
+on the full record. Values at the end of a path (e.g. the license lists)
+are kept whole.
+
+``ProfileWriter`` is the streaming counterpart used for the enriched
+output: one profile at a time, as a pretty-printed array or JSON Lines.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+# Fields used by the CMS matchers (compare_phoenix/denver_nurses.py, batch_matcher.py)
+MATCH_FIELDS = [
+    'id',
+    'name',
+    'firstName',
+    'lastName',
+    'city',
+    'state',
+    'profileUrl',
+    'nursys.licenses',
+    'peopleDataLabs.phone_numbers',
+    # Candidate scoring signals (candidate_scoring.py)
+    'peopleDataLabs.sex',
+    'peopleDataLabs.education',
+]
+
+# Fields used by compare_nursys.py
+NURSYS_FIELDS = [
+    'id',
+    'name',
+    'firstName',
+    'lastName',
+    'city',
+    'state',
+    'profileUrl',
+    'nursys.individuals',
+]
+
+# Largest People Data Labs subtrees, dropped from enriched output with drop_fields
+HEAVY_PDL_FIELDS = [
+    'peopleDataLabs.experience',
+    'peopleDataLabs.education',
+    'peopleDataLabs.skills',
+    'peopleDataLabs.interests',
+]
+
+# Enriched output formats: pretty-printed JSON array, or compact JSON Lines
+PROFILE_FORMATS = ('json', 'jsonl')
+
+READ_SIZE = 1 << 20  # 1 MB per read
+_WHITESPACE = ' \t\r\n'
+
+
+class ProfileStreamError(ValueError):
+    """The file is not a JSON array of profiles or JSON Lines."""
+    pass
+
+
+def _field_tree(fields: List[str]) -> Dict[str, Any]:
+    """['a', 'b.c'] -> {'a': None, 'b': {'c': None}} (None = keep the whole value)."""
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        parts = field.split('.')
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:  # a parent path is already kept whole
+                break
+            node = node.setdefault(part, child)
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _project(value: Any, tree: Dict[str, Any]) -> Any:
+    if not isinstance(value, dict):
+        return value
+    projected = {}
+    for key, subtree in tree.items():
+        if key in value:
+            projected[key] = value[key] if subtree is None else _project(value[key], subtree)
+    return projected
+
+
+def project_profile(profile: Dict, fields: List[str]) -> Dict:
+    """Copy of ``profile`` holding only ``fields`` (dotted paths)."""
+    return _project(profile, _field_tree(fields))
+
+
+def drop_fields(profile: Dict, fields: List[str]) -> Dict:
+    """
+    Copy of ``profile`` without ``fields`` (dotted paths); the dicts on the
+    way to a dropped field are copied, everything else is shared.
+    """
+    profile = dict(profile)
+    for field in fields:
+        parts = field.split('.')
+        node = profile
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                break
+            node[part] = child = dict(child)
+            node = child
+        else:
+            node.pop(parts[-1], None)
+    return profile
+
+
+def _iter_array(f, buffer: str) -> Iterator[Dict]:
+    """Decode the elements of a top-level JSON array one at a time."""
+    decoder = json.JSONDecoder()
+    pos = buffer.index('[') + 1
+    eof = False
+    expect_value = True
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ProfileStreamError("Unexpected end of file inside the JSON array")
+            chunk = f.read(READ_SIZE)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+
+        char = buffer[pos]
+        if char == ']':
+            return
+        if not expect_value:
+            if char != ',':
+                raise ProfileStreamError(f"Expected ',' or ']' between profiles, found {char!r}")
+            pos += 1
+            expect_value = True
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ProfileStreamError(f"Invalid JSON: {e}")
+            # The profile continues past the buffer: read at least as much again,
+            # so a huge profile is re-decoded a logarithmic number of times
+            chunk = f.read(max(READ_SIZE, len(buffer) - pos))
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+        yield value
+        pos = end
+        expect_value = False
+        # Drop decoded text, so the buffer only holds the pending profile
+        if pos > READ_SIZE:
+            buffer, pos = buffer[pos:], 0
+
+
+def _iter_lines(f) -> Iterator[Dict]:
+    """Decode JSON Lines: one profile per non-empty line."""
+    for line_number, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ProfileStreamError(f"Invalid JSON on line {line_number}: {e}")
+
+
+def iter_profiles(json_file: str, fields: Optional[List[str]] = None) -> Iterator[Dict]:
+    """
+    Yield the profiles of a JSON array or JSON Lines file one at a time.
+
+    Args:
+        json_file: Profiles file (``[{...}, ...]`` or one object per line)
+        fields: Dotted paths to keep (e.g. MATCH_FIELDS); None keeps whole profiles
+
+    Raises:
+        ProfileStreamError: if the file is not valid JSON/JSON Lines
+    """
+    tree = _field_tree(fields) if fields is not None else None
+    # utf-8-sig: skips a byte order mark left by some exporters
+    with open(json_file, 'r', encoding='utf-8-sig') as f:
+        head = f.read(READ_SIZE)
+        stripped = head.lstrip(_WHITESPACE)
+        if not stripped:
+            return
+        if stripped[0] == '[':
+            records = _iter_array(f, stripped)
+        else:
+            f.seek(0)
+            records = _iter_lines(f)
+        for record in records:
+            yield record if tree is None else _project(record, tree)
+
+
+def load_profiles(json_file: str, fields: Optional[List[str]] = None) -> List[Dict]:
+    """All profiles of a file, projected to ``fields`` while streaming."""
+    return list(iter_profiles(json_file, fields))
+
+
+class ProfileWriter:
+    """
+    Writes profiles one at a time, as a JSON array or as JSON Lines.
+
+    The ``json`` format is byte-identical to ``json.dump(profiles, f,
+    indent=2, ensure_ascii=False)``; ``jsonl`` writes one compact profile per
+    line, which is several times faster to write and to read back. The file
+    is written under a temporary name and renamed when the writer closes, so
+    an interrupted run never leaves a truncated file.
+
+        with ProfileWriter('enriched.jsonl', 'jsonl') as writer:
+            for profile in profiles:
+                writer.write(profile)
+    """
+
+    def __init__(self, path: str, fmt: str = 'json'):
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format '{fmt}' (use one of {', '.join(PROFILE_FORMATS)})")
+        self.path = path
+        self.format = fmt
+        self.count = 0
+        self._tmp_path = path + '.tmp'
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        if fmt == 'jsonl':
+            # Compact separators: the C encoder, no indentation whitespace
+            self._encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+        else:
+            self._encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+    def write(self, profile: Dict) -> None:
+        if self.format == 'jsonl':
+            self._file.write(self._encoder.encode(profile))
+            self._file.write('\n')
+        else:
+            # Each element of an indent=2 array is the indented object shifted by two spaces
+            self._file.write(',\n  ' if self.count else '[\n  ')
+            self._file.write(self._encoder.encode(profile).replace('\n', '\n  '))
+        self.count += 1
+
+    def close(self) -> None:
+        if self.format == 'json':
+            self._file.write('\n]' if self.count else '[]')
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard the partial output."""
+        self._file.close()
+        os.remove(self._tmp_path)
+
+    def __enter__(self) -> 'ProfileWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
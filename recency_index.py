@@ -0,0 +1,108 @@
+"""
+Day-number dates and a sorted recency index for "updated within N" filters.
+
+NPPES dates (``Last Update Date``, ``Provider Enumeration Date``) are parsed
+once, vectorized, into int32 day numbers (days since 1970-01-01; missing or
+invalid dates become ``MISSING_DAY``). ``RecencyIndex`` keeps the row
+positions sorted by day, so "updated within the last 3 months" is a binary
+search for the cutoff followed by a slice:
+
+    index = RecencyIndex.from_series(df['Last Update Date'])
+    rows = index.rows_after(window_cutoff('90d'))   # file order
+
+Windows are written as a number and a unit: ``90d``, ``6w``, ``3m``, ``1y``.
+"""
+
+import re
+from datetime import date, datetime
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from incremental_state import NPPES_DATE_FORMAT
+
+# Sorts before every real date, so it never passes a cutoff
+MISSING_DAY = np.iinfo(np.int32).min
+
+_EPOCH = date(1970, 1, 1)
+_WINDOW_PATTERN = re.compile(r'^\s*(\d+)\s*([dwmy])\s*$', re.IGNORECASE)
+_WINDOW_UNITS = {'d': 'days', 'w': 'weeks', 'm': 'months', 'y': 'years'}
+
+
+def day_number(value: Union[date, datetime]) -> int:
+    """Day number of a date (days since 1970-01-01)."""
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def to_day_numbers(series: pd.Series) -> np.ndarray:
+    """
+    Vectorized conversion of a date column to int32 day numbers.
+
+    Accepts parsed datetimes (the typed view cache) or MM/DD/YYYY strings
+    (a plain ``pd.read_csv``); missing or invalid values become MISSING_DAY.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series.astype('string').str.strip(), format=NPPES_DATE_FORMAT, errors='coerce')
+    days = series.to_numpy(dtype='datetime64[D]', na_value=np.datetime64('NaT'))
+    missing = np.isnat(days)
+    numbers = days.astype(np.int64)
+    numbers[missing] = MISSING_DAY
+    return numbers.astype(np.int32)
+
+
+def parse_window(window: str) -> relativedelta:
+    """
+    Parse a window like ``90d``, ``6w``, ``3m`` or ``1y``.
+
+    Raises:
+        ValueError: if the window is not a number followed by d/w/m/y
+    """
+    match = _WINDOW_PATTERN.match(str(window))
+    if not match:
+        raise ValueError(f"Invalid window '{window}' (use e.g. 90d, 6w, 3m, 1y)")
+    amount, unit = int(match.group(1)), match.group(2).lower()
+    return relativedelta(**{_WINDOW_UNITS[unit]: amount})
+
+
+def window_cutoff(window: str, today: Optional[date] = None) -> int:
+    """
+    Day number of the cutoff of a window: dates strictly after it are inside
+    ("updated in the last 3 months" = after today minus 3 months).
+    """
+    today = today or date.today()
+    return day_number(today - parse_window(window))
+
+
+class RecencyIndex:
+    """Row positions of a date column sorted by day, for binary-search cutoffs."""
+
+    def __init__(self, days: np.ndarray):
+        self.days = days
+        self._order = np.argsort(days, kind='stable')
+        self._sorted_days = days[self._order]
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> 'RecencyIndex':
+        return cls(to_day_numbers(series))
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def count_after(self, cutoff_day: int) -> int:
+        """Number of rows dated strictly after ``cutoff_day``."""
+        return len(self._sorted_days) - int(np.searchsorted(self._sorted_days, cutoff_day, side='right'))
+
+    def rows_after(self, cutoff_day: int) -> np.ndarray:
+        """Positions of the rows dated strictly after ``cutoff_day``, in file order."""
+        start = np.searchsorted(self._sorted_days, cutoff_day, side='right')
+        return np.sort(self._order[start:])
+
+    def mask_after(self, cutoff_day: int) -> np.ndarray:
+        """Boolean mask of the rows dated strictly after ``cutoff_day``."""
+        mask = np.zeros(len(self.days), dtype=bool)
+        mask[self._order[np.searchsorted(self._sorted_days, cutoff_day, side='right'):]] = True
+        return mask
@@ -0,0 +1,161 @@
+"""
+Taxonomy classifier: maps NPI taxonomy codes to a bitmask of nurse categories.
+
+Every prefix in ``NURSE_TAXONOMY_CODES`` gets one bit (``'163W'`` -> 1,
+``'164W'`` -> 2, ...). A row's ``nurse_categories`` value is the OR of the bits
+of all its 15 taxonomy codes, so
+
+    nurse_categories != 0           -> the provider is a nurse
+    nurse_categories & bit('363L')  -> the provider is a nurse practitioner
+
+Each distinct taxonomy code is classified only once (dictionary encoding in
+Pandas, a hash lookup on the code prefix in Polars) instead of running one
+``starts_with`` scan per column and prefix.
+"""
+
+import functools
+import operator
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config import NURSE_TAXONOMY_CODES, TAXONOMY_CODE_COLUMNS
+
+NURSE_CATEGORIES_COLUMN = 'nurse_categories'
+
+
+class TaxonomyClassifier:
+    """Classify taxonomy codes into a per-row category bitmask."""
+
+    def __init__(self, prefixes: Iterable[str] = NURSE_TAXONOMY_CODES):
+        self.prefixes = list(prefixes)
+        if len(self.prefixes) > 64:
+            raise ValueError("At most 64 taxonomy prefixes are supported")
+        self.bits = {prefix: 1 << i for i, prefix in enumerate(self.prefixes)}
+
+        if len(self.prefixes) <= 8:
+            self.dtype = np.uint8
+        elif len(self.prefixes) <= 16:
+            self.dtype = np.uint16
+        elif len(self.prefixes) <= 32:
+            self.dtype = np.uint32
+        else:
+            self.dtype = np.uint64
+
+        # Prefixes grouped by length, for the Polars prefix lookup
+        self._prefixes_by_length: Dict[int, Dict[str, int]] = {}
+        for prefix, bit in self.bits.items():
+            self._prefixes_by_length.setdefault(len(prefix), {})[prefix] = bit
+
+        # Memo of code -> bitmask, shared across chunks
+        self._code_cache: Dict[str, int] = {}
+
+    def classify(self, code) -> int:
+        """Return the category bitmask for a single taxonomy code."""
+        if code is None:
+            return 0
+        code = str(code)
+        mask = self._code_cache.get(code)
+        if mask is None:
+            mask = 0
+            for prefix, bit in self.bits.items():
+                if code.startswith(prefix):
+                    mask |= bit
+            self._code_cache[code] = mask
+        return mask
+
+    def categories_pandas(self, chunk, columns: List[str] = TAXONOMY_CODE_COLUMNS) -> "pd.Series":
+        """
+        Compute the ``nurse_categories`` bitmask for every row of a Pandas chunk.
+
+        Each column is factorized, the distinct codes are classified once and
+        the per-row masks are gathered with a NumPy take and OR-reduced.
+        """
+        import pandas as pd
+
+        result = np.zeros(len(chunk), dtype=self.dtype)
+        for col in columns:
+            if col not in chunk.columns:
+                continue
+            codes, uniques = pd.factorize(chunk[col])
+            if len(uniques) == 0:
+                continue
+            # Trailing 0 catches the -1 code that factorize uses for missing values
+            lookup = np.fromiter(
+                (self.classify(value) for value in uniques),
+                dtype=self.dtype,
+                count=len(uniques),
+            )
+            result |= np.append(lookup, self.dtype(0))[codes]
+        return pd.Series(result, index=chunk.index, name=NURSE_CATEGORIES_COLUMN)
+
+    def categories_polars(self, columns: List[str] = TAXONOMY_CODE_COLUMNS) -> "pl.Expr":
+        """
+        Polars expression computing ``nurse_categories`` from the given columns.
+
+        Columns missing from the frame must be left out of ``columns``. The
+        expression works on eager chunks and inside lazy queries.
+        """
+        import polars as pl
+
+        return_dtype = {
+            np.uint8: pl.UInt8, np.uint16: pl.UInt16, np.uint32: pl.UInt32, np.uint64: pl.UInt64,
+        }[self.dtype]
+
+        lookups = []
+        for col in columns:
+            code = pl.col(col).cast(pl.Utf8)
+            for length, mapping in self._prefixes_by_length.items():
+                lookups.append(
+                    code.str.slice(0, length)
+                    .replace_strict(mapping, default=0, return_dtype=return_dtype)
+                    .fill_null(0)
+                )
+
+        if not lookups:
+            return pl.lit(0, dtype=return_dtype).alias(NURSE_CATEGORIES_COLUMN)
+        return functools.reduce(operator.or_, lookups).alias(NURSE_CATEGORIES_COLUMN)
+
+    def categories_arrow(self, table, columns: List[str] = TAXONOMY_CODE_COLUMNS) -> "pa.Array":
+        """Compute ``nurse_categories`` for a PyArrow table (dictionary-encoded lookup)."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        result = np.zeros(table.num_rows, dtype=self.dtype)
+        for col in columns:
+            if col not in table.column_names:
+                continue
+            encoded = pc.dictionary_encode(table[col]).combine_chunks()
+            if len(encoded.dictionary) == 0:
+                continue
+            lookup = np.fromiter(
+                (self.classify(value) for value in encoded.dictionary.to_pylist()),
+                dtype=self.dtype,
+                count=len(encoded.dictionary),
+            )
+            # Null codes become index -1 -> the trailing 0
+            indices = encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+            result |= np.append(lookup, self.dtype(0))[indices]
+        return pa.array(result)
+
+    def count_categories(self, masks) -> Dict[str, int]:
+        """Count rows per category from an array/Series of bitmasks."""
+        masks = np.asarray(masks, dtype=self.dtype)
+        return {prefix: int(np.count_nonzero(masks & self.dtype(bit))) for prefix, bit in self.bits.items()}
+
+    def decode(self, mask: int) -> List[str]:
+        """Return the prefixes whose bits are set in ``mask``."""
+        return [prefix for prefix, bit in self.bits.items() if mask & bit]
+
+
+# Shared classifier for the configured nurse prefixes
+NURSE_CLASSIFIER = TaxonomyClassifier()
+
+
+def merge_category_counts(total: Optional[Dict[str, int]], counts: Dict[str, int]) -> Dict[str, int]:
+    """Add ``counts`` into ``total`` (which may be None) and return it."""
+    if total is None:
+        return dict(counts)
+    for prefix, count in counts.items():
+        total[prefix] = total.get(prefix, 0) + count
+    return total
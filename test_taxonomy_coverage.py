@@ -5,24 +5,43 @@ Shows how many more nurses we capture with the expanded codes.
 """
 
 import pandas as pd
-from config import NURSE_TAXONOMY_CODES, TAXONOMY_CODE_COLUMNS
+from config import NURSE_TAXONOMY_CODES, NURSE_TAXONOMY_DESCRIPTIONS, TAXONOMY_CODE_COLUMNS
+from parquet_cache import find_fresh_cache, iter_cache_chunks
+from taxonomy import NURSE_CLASSIFIER, NURSE_CATEGORIES_COLUMN, TaxonomyClassifier, merge_category_counts
 
 # Old codes (for comparison)
 OLD_CODES = ['363L00000X', '163W00000X', '164W00000X']
 
-def count_nurses_with_codes(chunk, codes, use_prefix=False):
-    """Count how many nurses match the given codes."""
-    nurse_mask = pd.Series([False] * len(chunk), index=chunk.index)
-    
-    for col in TAXONOMY_CODE_COLUMNS:
-        if col in chunk.columns:
-            for code in codes:
-                if use_prefix:
-                    nurse_mask |= chunk[col].astype(str).str.startswith(code, na=False)
-                else:
-                    nurse_mask |= (chunk[col] == code)
+# Full 10-character codes used as prefixes only match themselves (exact match)
+OLD_CLASSIFIER = TaxonomyClassifier(OLD_CODES)
+
+def nurse_categories(chunk, classifier=NURSE_CLASSIFIER):
+    """Per-row category bitmask (reuses the cached nurse_categories column)."""
+    if classifier is NURSE_CLASSIFIER and NURSE_CATEGORIES_COLUMN in chunk.columns:
+        return chunk[NURSE_CATEGORIES_COLUMN]
+    return classifier.categories_pandas(chunk)
+
+def count_nurses_with_codes(chunk, classifier):
+    """Count how many nurses match the classifier's codes."""
+    return int((nurse_categories(chunk, classifier) != 0).sum())
+
+def iter_taxonomy_chunks(csv_file, sample_chunks):
+    """Yield chunks for the analysis, from the Parquet cache when it is fresh."""
+    cache_dir = find_fresh_cache(csv_file)
+    if cache_dir:
+        # The cache only reads the 15 taxonomy columns, so analyze every record
+        yield from iter_cache_chunks(
+            cache_dir, columns=TAXONOMY_CODE_COLUMNS + [NURSE_CATEGORIES_COLUMN], chunk_size=100000,
+            file_order=False,
+        )
+        return
     
-    return nurse_mask.sum()
+    chunk_num = 0
+    for chunk in pd.read_csv(csv_file, chunksize=100000, low_memory=False):
+        chunk_num += 1
+        yield chunk
+        if chunk_num >= sample_chunks:
+            break
 
 def analyze_coverage(csv_file='data.csv', sample_chunks=20):
     """Analyze taxonomy code coverage."""
@@ -31,31 +50,34 @@ def analyze_coverage(csv_file='data.csv', sample_chunks=20):
     print("="*90 + "\n")
     
     print(f"Analisando arquivo: {csv_file}")
-    print(f"Chunks a processar: {sample_chunks} (até ~{sample_chunks * 100000:,} registros)\n")
+    if find_fresh_cache(csv_file):
+        print("Usando cache Parquet: todos os registros serão analisados\n")
+    else:
+        print(f"Chunks a processar: {sample_chunks} (até ~{sample_chunks * 100000:,} registros)\n")
     
     old_total = 0
     new_total = 0
     total_rows = 0
+    type_counts = None
     
     chunk_num = 0
-    for chunk in pd.read_csv(csv_file, chunksize=100000, low_memory=False):
+    for chunk in iter_taxonomy_chunks(csv_file, sample_chunks):
         chunk_num += 1
         total_rows += len(chunk)
         
         # Count with old codes (exact match)
-        old_count = count_nurses_with_codes(chunk, OLD_CODES, use_prefix=False)
+        old_count = count_nurses_with_codes(chunk, OLD_CLASSIFIER)
         old_total += old_count
         
-        # Count with new codes (prefix match)
-        new_count = count_nurses_with_codes(chunk, NURSE_TAXONOMY_CODES, use_prefix=True)
-        new_total += new_count
+        # Count with new codes (prefix match) and per-category breakdown,
+        # all from the same bitmask
+        categories = nurse_categories(chunk)
+        new_total += int((categories != 0).sum())
+        type_counts = merge_category_counts(type_counts, NURSE_CLASSIFIER.count_categories(categories))
         
         if chunk_num % 5 == 0:
             print(f"  Chunk {chunk_num}: {total_rows:,} rows processados | "
                   f"Old: {old_total:,} | New: {new_total:,} | Diff: +{new_total - old_total:,}")
-        
-        if chunk_num >= sample_chunks:
-            break
     
     print("\n" + "="*90)
     print("📈 RESULTADOS")
@@ -76,33 +98,11 @@ def analyze_coverage(csv_file='data.csv', sample_chunks=20):
     print()
     
     # Breakdown por tipo
-    print("📋 BREAKDOWN POR TIPO DE ENFERMEIRA:")
+    print("📋 BREAKDOWN POR TIPO DE ENFERMEIRA (uma enfermeira pode ter vários tipos):")
     print("-" * 90)
     
-    type_counts = {}
-    for code_prefix in NURSE_TAXONOMY_CODES:
-        count = 0
-        chunk_num = 0
-        for chunk in pd.read_csv(csv_file, chunksize=100000, low_memory=False):
-            chunk_num += 1
-            for col in TAXONOMY_CODE_COLUMNS:
-                if col in chunk.columns:
-                    count += chunk[col].astype(str).str.startswith(code_prefix, na=False).sum()
-            if chunk_num >= sample_chunks:
-                break
-        type_counts[code_prefix] = count
-    
-    # Map codes to descriptions
-    descriptions = {
-        '163W': 'Registered Nurse (RN)',
-        '164W': 'Licensed Practical Nurse (LPN)',
-        '164X': 'Licensed Vocational Nurse (LVN)',
-        '363L': 'Nurse Practitioner (NP/APRN)',
-        '364S': 'Clinical Nurse Specialist (CNS)',
-        '3675': 'Certified Registered Nurse Anesthetist (CRNA)',
-        '367A': 'Advanced Practice Midwife',
-        '367H': 'Certified Nurse Midwife (CNM)',
-    }
+    type_counts = type_counts or {code_prefix: 0 for code_prefix in NURSE_TAXONOMY_CODES}
+    descriptions = NURSE_TAXONOMY_DESCRIPTIONS
     
     for code_prefix in sorted(type_counts.keys(), key=lambda x: type_counts[x], reverse=True):
         count = type_counts[code_prefix]
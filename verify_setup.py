@@ -35,6 +35,16 @@ def check_pandas():
         print("❌ Pandas not installed (required)")
         return False
 
+def check_pyarrow():
+    """Check if PyArrow is installed (needed for the Parquet cache)."""
+    try:
+        import pyarrow
+        print(f"✅ PyArrow {pyarrow.__version__} (Parquet cache)")
+        return True
+    except ImportError:
+        print("⚠️  PyArrow not installed (optional - needed for 'process_nurses.py convert')")
+        return False
+
 def check_scripts():
     """Check if main scripts exist."""
     import os
@@ -68,6 +78,7 @@ def main():
     print("Checking dependencies...")
     polars_ok = check_polars()
     pandas_ok = check_pandas()
+    check_pyarrow()
     print()
     
     print("Checking project files...")
@@ -0,0 +1,213 @@
+"""
+Typed, memory-mapped columnar cache of a nurses CSV for view_nurses.py.
+
+``pd.read_csv(nurses.csv, low_memory=False)`` gives every column object
+dtype and reads phone numbers as floats, and a nationwide extract takes
+several GB of RAM. The viewer instead loads the extract with an explicit
+schema:
+
+- categorical: states, cities, credential, country, taxonomy and license
+  state codes
+- string: NPI, phones, postal codes, license numbers, names, addresses
+  (Arrow-backed, so no more float phone numbers)
+- date: enumeration/update/deactivation dates (MM/DD/YYYY parsed once;
+  unparseable values become missing)
+
+The typed table is stored next to the CSV as an uncompressed Arrow IPC file
+(nurses.csv -> nurses.arrow). It is memory-mapped on load, so string columns
+are read straight from the page cache instead of being parsed and copied.
+The file records the CSV's fingerprint and is rebuilt when the CSV changes.
+
+Without pyarrow the CSV is read with the same schema through Pandas (no
+cache).
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from config import (
+    FILTER_COLUMNS,
+    LICENSE_STATE_COLUMNS,
+    TAXONOMY_CODE_COLUMNS,
+    VIEW_CACHE_SUFFIX,
+)
+from incremental_state import NPPES_DATE_FORMAT
+from parquet_cache import compute_fingerprint
+
+VIEW_CACHE_VERSION = 1
+VIEW_CACHE_METADATA_KEY = b'nurses_view_cache'
+
+# Low-cardinality columns stored as categoricals (dictionary-encoded)
+CATEGORY_COLUMNS = set([
+    'Entity Type Code',
+    'Provider Name Prefix Text',
+    'Provider Name Suffix Text',
+    'Provider Credential Text',
+    'Provider Sex Code',
+    FILTER_COLUMNS['city'],
+    FILTER_COLUMNS['state'],
+    'Provider Business Practice Location Address Country Code (If outside U.S.)',
+    'Provider Business Mailing Address City Name',
+    'Provider Business Mailing Address State Name',
+    'Provider Business Mailing Address Country Code (If outside U.S.)',
+] + TAXONOMY_CODE_COLUMNS + LICENSE_STATE_COLUMNS)
+
+# MM/DD/YYYY columns parsed to dates; everything else is a string
+DATE_COLUMNS = {
+    'Provider Enumeration Date',
+    'Last Update Date',
+    'NPI Deactivation Date',
+    'NPI Reactivation Date',
+}
+
+
+def get_view_cache_file(csv_file: str) -> str:
+    """Default cache file for a nurses CSV (nurses.csv -> nurses.arrow)."""
+    return os.path.splitext(csv_file)[0] + VIEW_CACHE_SUFFIX
+
+
+def column_kind(column: str) -> str:
+    """Schema of a column: 'category', 'date' or 'string'."""
+    if column in CATEGORY_COLUMNS:
+        return 'category'
+    if column in DATE_COLUMNS:
+        return 'date'
+    return 'string'
+
+
+def read_nurses_csv(csv_file: str) -> pd.DataFrame:
+    """Read a nurses CSV with the typed schema using Pandas only."""
+    header = pd.read_csv(csv_file, nrows=0).columns
+    dtypes = {col: 'category' if column_kind(col) == 'category' else 'string' for col in header}
+    df = pd.read_csv(csv_file, dtype=dtypes, low_memory=False)
+    for col in header:
+        if column_kind(col) == 'date':
+            df[col] = pd.to_datetime(df[col], format=NPPES_DATE_FORMAT, errors='coerce')
+    return df
+
+
+def _read_cache_metadata(cache_file: str) -> Optional[Dict]:
+    """Metadata stored in the cache's schema, or None if it is unusable."""
+    if not HAS_PYARROW or not os.path.exists(cache_file):
+        return None
+    try:
+        with pa.memory_map(cache_file, 'r') as source:
+            schema = pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+    raw = (schema.metadata or {}).get(VIEW_CACHE_METADATA_KEY)
+    if raw is None:
+        return None
+    metadata = json.loads(raw)
+    if metadata.get('version') != VIEW_CACHE_VERSION:
+        return None
+    return metadata
+
+
+def is_view_cache_fresh(csv_file: str, cache_file: Optional[str] = None) -> bool:
+    """Check whether the cache exists and was built from the current CSV."""
+    metadata = _read_cache_metadata(cache_file or get_view_cache_file(csv_file))
+    if metadata is None or not os.path.exists(csv_file):
+        return False
+    return metadata['fingerprint'] == compute_fingerprint(csv_file)
+
+
+def read_typed_table(csv_file: str) -> "pa.Table":
+    """Parse a nurses CSV into an Arrow table with the typed schema."""
+    header = pd.read_csv(csv_file, nrows=0).columns
+    table = pa_csv.read_csv(
+        csv_file,
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: pa.string() for col in header},
+            strings_can_be_null=True,
+        ),
+    )
+
+    columns: List["pa.ChunkedArray"] = []
+    for name in table.column_names:
+        column = table.column(name)
+        kind = column_kind(name)
+        if kind == 'category':
+            column = column.dictionary_encode()
+        elif kind == 'date':
+            column = pc.strptime(
+                pc.utf8_trim_whitespace(column), format=NPPES_DATE_FORMAT, unit='s', error_is_null=True
+            ).cast(pa.date32())
+        else:
+            # 64-bit offsets: the layout Pandas' Arrow strings use, so loading needs no cast
+            column = column.cast(pa.large_string())
+        columns.append(column)
+    # One dictionary per column, so the Arrow file holds a single batch layout
+    return pa.table(columns, names=table.column_names).unify_dictionaries().combine_chunks()
+
+
+def build_view_cache(csv_file: str, cache_file: Optional[str] = None) -> str:
+    """
+    Write the typed Arrow cache for a nurses CSV (temporary file + rename).
+
+    Returns:
+        Path of the cache file
+    """
+    cache_file = cache_file or get_view_cache_file(csv_file)
+    table = read_typed_table(csv_file)
+    metadata = {
+        'version': VIEW_CACHE_VERSION,
+        'source': os.path.abspath(csv_file),
+        'fingerprint': compute_fingerprint(csv_file),
+    }
+    table = table.replace_schema_metadata({VIEW_CACHE_METADATA_KEY: json.dumps(metadata)})
+
+    tmp_file = cache_file + '.tmp'
+    with pa.OSFile(tmp_file, 'wb') as sink:
+        # Uncompressed, so the file can be memory-mapped without decoding
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_file, cache_file)
+    return cache_file
+
+
+def _to_pandas(table: "pa.Table") -> pd.DataFrame:
+    # Strings become ArrowDtype columns that point into the (memory-mapped)
+    # Arrow buffers instead of copies; date32 -> datetime64 instead of Python
+    # date objects; dictionary columns become Categoricals
+    return table.to_pandas(
+        date_as_object=False,
+        split_blocks=True,
+        types_mapper={pa.large_string(): pd.ArrowDtype(pa.large_string())}.get,
+    )
+
+
+def load_nurses(csv_file: str, use_cache: bool = True, cache_file: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load a nurses CSV with the typed schema.
+
+    With pyarrow and ``use_cache`` the Arrow cache is (re)built when missing
+    or stale and then memory-mapped. If the cache cannot be written (e.g. a
+    read-only directory), the typed table is used directly.
+    """
+    if not HAS_PYARROW:
+        return read_nurses_csv(csv_file)
+    if not use_cache:
+        return _to_pandas(read_typed_table(csv_file))
+
+    cache_file = cache_file or get_view_cache_file(csv_file)
+    if not is_view_cache_fresh(csv_file, cache_file):
+        try:
+            build_view_cache(csv_file, cache_file)
+        except OSError:
+            return _to_pandas(read_typed_table(csv_file))
+
+    source = pa.memory_map(cache_file, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return _to_pandas(table)
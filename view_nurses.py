@@ -6,11 +6,11 @@ Permite visualizar e filtrar o arquivo nurses.csv de forma bonita e interativa.
 
 import sys
 import os
-from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
+from datetime import date, timedelta
 
 # Try to import required libraries
 try:
+    import numpy as np
     import pandas as pd
 except ImportError:
     print("Erro: pandas não está instalado.")
@@ -25,6 +25,16 @@ except ImportError:
     print("\nContinuando com visualização básica...\n")
     tabulate = None
 
+from config import (
+    NURSE_TAXONOMY_DESCRIPTIONS,
+    RECENT_ENUMERATION_WINDOW,
+    RECENT_UPDATE_WINDOW,
+    TAXONOMY_CODE_COLUMNS,
+)
+from recency_index import RecencyIndex, parse_window, window_cutoff
+from taxonomy import NURSE_CLASSIFIER
+from view_cache import HAS_PYARROW, is_view_cache_fresh, load_nurses
+
 
 def clear_screen():
     """Limpa a tela do terminal."""
@@ -78,7 +88,7 @@ def format_phone(value):
 
 
 def display_results(df, page_size=20, page=1):
-    """Exibe os resultados de forma paginada e formatada."""
+    """Exibe os resultados de forma paginada e formatada (DataFrame ou FilteredView)."""
     if len(df) == 0:
         print("\n❌ Nenhum resultado encontrado com os filtros aplicados.\n")
         return
@@ -161,105 +171,225 @@ def get_filter_summary(filters):
     if filters.get('no_practice_address'):
         parts.append("Sem endereço de prática")
     if filters.get('recent_update'):
-        parts.append("Atualizado nos últimos 3 meses")
+        parts.append(f"Atualizado nos últimos {describe_window(filter_window(filters, 'recent_update'))}")
+    if filters.get('recent_enumeration'):
+        parts.append(f"Cadastrado nos últimos {describe_window(filter_window(filters, 'recent_enumeration'))}")
     
     return " | ".join(parts)
 
 
-def apply_filters(df, filters):
-    """Aplica os filtros ao DataFrame."""
-    filtered_df = df.copy()
+# Colunas usadas pelos filtros
+FIRST_NAME_COLUMN = 'Provider First Name'
+LAST_NAME_COLUMN = 'Provider Last Name (Legal Name)'
+CITY_COLUMN = 'Provider Business Practice Location Address City Name'
+STATE_COLUMN = 'Provider Business Practice Location Address State Name'
+LICENSE_COLUMNS = [f'Provider License Number_{i}' for i in range(1, 16)]
+PRACTICE_ADDRESS_COLUMN = 'Provider First Line Business Practice Location Address'
+MAILING_ADDRESS_COLUMN = 'Provider First Line Business Mailing Address'
+UPDATE_DATE_COLUMN = 'Last Update Date'
+ENUMERATION_DATE_COLUMN = 'Provider Enumeration Date'
+
+# Filtros de data recente: coluna e janela padrão (``True`` = janela padrão)
+RECENCY_FILTERS = {
+    'recent_update': (UPDATE_DATE_COLUMN, RECENT_UPDATE_WINDOW),
+    'recent_enumeration': (ENUMERATION_DATE_COLUMN, RECENT_ENUMERATION_WINDOW),
+}
+
+# Ordem em que os filtros ativos são combinados
+FILTER_ORDER = [
+    'first_name', 'last_name', 'city', 'state', 'license_number',
+    'different_addresses', 'no_practice_address', 'recent_update', 'recent_enumeration',
+]
+
+_WINDOW_UNIT_NAMES = {'d': ('dia', 'dias'), 'w': ('semana', 'semanas'), 'm': ('mês', 'meses'), 'y': ('ano', 'anos')}
+
+
+def filter_window(filters, name):
+    """Janela de um filtro de data recente (``True`` usa a janela padrão)."""
+    value = filters.get(name)
+    return RECENCY_FILTERS[name][1] if value is True else value
+
+
+def describe_window(window):
+    """Texto de uma janela: '3m' -> '3 meses', '90d' -> '90 dias'."""
+    window = window.strip().lower()
+    amount, unit = int(window[:-1]), window[-1]
+    singular, plural = _WINDOW_UNIT_NAMES[unit]
+    return f"{amount} {singular if amount == 1 else plural}"
+
+
+class FilteredView:
+    """
+    Resultado de um filtro: só as posições das linhas no DataFrame completo.
     
-    if filters.get('first_name'):
-        col = 'Provider First Name'
-        if col in filtered_df.columns:
-            filtered_df = filtered_df[
-                filtered_df[col].str.lower().str.contains(filters['first_name'].lower(), na=False)
-            ]
+    As linhas são materializadas apenas quando pedidas: ``iloc[início:fim]``
+    (a página exibida por display_results) ou ``frame()`` (estatísticas e
+    exportação).
+    """
     
-    if filters.get('last_name'):
-        col = 'Provider Last Name (Legal Name)'
-        if col in filtered_df.columns:
-            filtered_df = filtered_df[
-                filtered_df[col].str.lower().str.contains(filters['last_name'].lower(), na=False)
-            ]
+    def __init__(self, df, positions):
+        self.df = df
+        self.positions = positions
     
-    if filters.get('city'):
-        col = 'Provider Business Practice Location Address City Name'
-        if col in filtered_df.columns:
-            filtered_df = filtered_df[
-                filtered_df[col].str.lower().str.contains(filters['city'].lower(), na=False)
-            ]
+    def __len__(self):
+        return len(self.positions)
     
-    if filters.get('state'):
-        col = 'Provider Business Practice Location Address State Name'
-        if col in filtered_df.columns:
-            filtered_df = filtered_df[
-                filtered_df[col].str.upper() == filters['state'].upper()
-            ]
+    @property
+    def columns(self):
+        return self.df.columns
     
-    # Filter by license number (searches across all 15 license columns)
-    if filters.get('license_number'):
-        license_cols = [f'Provider License Number_{i}' for i in range(1, 16)]
-        license_mask = pd.Series([False] * len(filtered_df), index=filtered_df.index)
+    @property
+    def iloc(self):
+        return _PositionIndexer(self)
+    
+    def frame(self):
+        """As linhas filtradas como DataFrame."""
+        return self.df.iloc[self.positions]
+
+
+class _PositionIndexer:
+    """``view.iloc[...]``: seleciona por posição dentro do resultado filtrado."""
+    
+    def __init__(self, view):
+        self.view = view
+    
+    def __getitem__(self, key):
+        return self.view.df.iloc[self.view.positions[key]]
+
+
+class FilterEngine:
+    """
+    Filtros incrementais sobre o DataFrame completo, sem copiá-lo.
+    
+    Cada filtro ativo vira uma máscara booleana (NumPy) calculada sobre o
+    arquivo inteiro e guardada em cache por (filtro, valor); mudar um filtro
+    só recalcula a máscara dele, e as máscaras ativas são combinadas com AND.
+    As colunas de texto são fatoradas uma vez (valores distintos + códigos),
+    então um valor novo só é testado contra os valores distintos da coluna
+    (poucos milhares de cidades, por exemplo) e expandido pelos códigos.
+    """
+    
+    def __init__(self, df):
+        self.df = df
+        self._masks = {}
+        self._factorized = {}
+        self._recency = {}
+    
+    def _factorize(self, col):
+        """(códigos por linha, valores distintos) de uma coluna; -1 = vazio."""
+        if col not in self._factorized:
+            series = self.df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                uniques = pd.Series(series.cat.categories)
+            else:
+                codes, uniques = pd.factorize(series)
+                uniques = pd.Series(uniques)
+            self._factorized[col] = (codes, uniques)
+        return self._factorized[col]
+    
+    def recency_index(self, col):
+        """Índice de datas (dias int32 ordenados) de uma coluna, criado uma vez."""
+        if col not in self._recency:
+            self._recency[col] = RecencyIndex.from_series(self.df[col])
+        return self._recency[col]
+    
+    def _match_values(self, col, predicate, missing=False):
+        """Máscara das linhas cujo valor satisfaz ``predicate`` (testado uma vez por valor distinto)."""
+        codes, uniques = self._factorize(col)
+        hits = predicate(uniques).fillna(False).to_numpy(dtype=bool) if len(uniques) else np.zeros(0, dtype=bool)
+        # O último elemento atende ao código -1 (valor vazio)
+        return np.append(hits, missing)[codes]
+    
+    def _contains(self, col, value):
+        return self._match_values(col, lambda values: values.str.lower().str.contains(value.lower(), na=False))
+    
+    def _compute_mask(self, name, value):
+        """Máscara de um filtro, ou None se as colunas dele não existem."""
+        df = self.df
+        if name == 'first_name':
+            return self._contains(FIRST_NAME_COLUMN, value) if FIRST_NAME_COLUMN in df.columns else None
+        if name == 'last_name':
+            return self._contains(LAST_NAME_COLUMN, value) if LAST_NAME_COLUMN in df.columns else None
+        if name == 'city':
+            return self._contains(CITY_COLUMN, value) if CITY_COLUMN in df.columns else None
+        if name == 'state':
+            if STATE_COLUMN not in df.columns:
+                return None
+            return self._match_values(STATE_COLUMN, lambda values: values.str.upper() == value.upper())
         
-        for col in license_cols:
-            if col in filtered_df.columns:
-                # Convert to string and do partial match (case-insensitive)
-                license_mask |= filtered_df[col].astype(str).str.lower().str.contains(
-                    filters['license_number'].lower(), na=False, regex=False
-                )
+        # Filter by license number (searches across all 15 license columns)
+        if name == 'license_number':
+            mask = np.zeros(len(df), dtype=bool)
+            for col in LICENSE_COLUMNS:
+                if col in df.columns:
+                    mask |= self._match_values(
+                        col,
+                        lambda values: values.astype(str).str.lower().str.contains(value.lower(), regex=False),
+                    )
+            return mask
         
-        filtered_df = filtered_df[license_mask]
-    
-    # Filter by different addresses (practice vs mailing)
-    if filters.get('different_addresses'):
-        practice_addr = 'Provider First Line Business Practice Location Address'
-        mailing_addr = 'Provider First Line Business Mailing Address'
-        if practice_addr in filtered_df.columns and mailing_addr in filtered_df.columns:
-            # Compare addresses (normalize for comparison)
-            filtered_df = filtered_df[
-                filtered_df[practice_addr].notna() &
-                filtered_df[mailing_addr].notna() &
-                (filtered_df[practice_addr].astype(str).str.strip() != filtered_df[mailing_addr].astype(str).str.strip())
-            ]
-    
-    # Filter by no practice address (not working)
-    if filters.get('no_practice_address'):
-        practice_addr_col = 'Provider First Line Business Practice Location Address'
-        if practice_addr_col in filtered_df.columns:
-            filtered_df = filtered_df[
-                filtered_df[practice_addr_col].isna() | 
-                (filtered_df[practice_addr_col].astype(str).str.strip() == "")
-            ]
-    
-    # Filter by recent update (last 3 months) - for newly graduated/registered nurses
-    if filters.get('recent_update'):
-        update_col = 'Last Update Date'
-        if update_col in filtered_df.columns:
-            # Calculate date 3 months ago
-            three_months_ago = datetime.now() - relativedelta(months=3)
-            
-            # Convert date strings to datetime, handling MM/DD/YYYY format
-            def parse_date(date_str):
-                if pd.isna(date_str) or date_str == '':
-                    return None
-                try:
-                    # Try MM/DD/YYYY format
-                    return datetime.strptime(str(date_str).strip(), '%m/%d/%Y')
-                except (ValueError, TypeError):
-                    return None
-            
-            # Filter rows where update date is within last 3 months
-            filtered_df['_parsed_date'] = filtered_df[update_col].apply(parse_date)
-            filtered_df = filtered_df[
-                filtered_df['_parsed_date'].notna() &
-                (filtered_df['_parsed_date'] >= three_months_ago)
-            ]
-            # Remove temporary column
-            filtered_df = filtered_df.drop(columns=['_parsed_date'], errors='ignore')
-    
-    return filtered_df
+        # Filter by different addresses (practice vs mailing)
+        if name == 'different_addresses':
+            if PRACTICE_ADDRESS_COLUMN not in df.columns or MAILING_ADDRESS_COLUMN not in df.columns:
+                return None
+            practice = df[PRACTICE_ADDRESS_COLUMN]
+            mailing = df[MAILING_ADDRESS_COLUMN]
+            return (
+                practice.notna() & mailing.notna() &
+                (practice.astype(str).str.strip() != mailing.astype(str).str.strip())
+            ).to_numpy(dtype=bool)
+        
+        # Filter by no practice address (not working)
+        if name == 'no_practice_address':
+            if PRACTICE_ADDRESS_COLUMN not in df.columns:
+                return None
+            return self._match_values(
+                PRACTICE_ADDRESS_COLUMN, lambda values: values.astype(str).str.strip() == '', missing=True
+            )
+        
+        # Filter by recent update/enumeration: ``value`` is the cutoff day
+        # number; dates after it are found by binary search in the index
+        if name in RECENCY_FILTERS:
+            col = RECENCY_FILTERS[name][0]
+            if col not in df.columns:
+                return None
+            return self.recency_index(col).mask_after(value)
+        
+        raise ValueError(f"Filtro desconhecido: {name}")
+    
+    def mask(self, name, value):
+        """Máscara (em cache) de um filtro com um valor."""
+        key = (name, value)
+        if key not in self._masks:
+            self._masks[key] = self._compute_mask(name, value)
+        return self._masks[key]
+    
+    def filter(self, filters):
+        """Aplica os filtros ativos e retorna um FilteredView (sem copiar linhas)."""
+        masks = []
+        for name in FILTER_ORDER:
+            value = filters.get(name)
+            if not value:
+                continue
+            if name in RECENCY_FILTERS:
+                value = window_cutoff(filter_window(filters, name))
+            mask = self.mask(name, value)
+            if mask is not None:
+                masks.append(mask)
+        
+        if not masks:
+            positions = np.arange(len(self.df))
+        elif len(masks) == 1:
+            positions = np.flatnonzero(masks[0])
+        else:
+            positions = np.flatnonzero(np.logical_and.reduce(masks))
+        return FilteredView(self.df, positions)
+
+
+def apply_filters(df, filters):
+    """Aplica os filtros ao DataFrame."""
+    return FilterEngine(df).filter(filters).frame()
 
 
 def show_statistics(df):
@@ -278,20 +408,14 @@ def show_statistics(df):
             if pd.notna(state):
                 print(f"  {state}: {count:,}")
     
-    # Estatísticas por código de taxonomia
-    taxonomy_col = 'Healthcare Provider Taxonomy Code_1'
-    if taxonomy_col in df.columns:
+    # Estatísticas por categoria de taxonomia (todas as 15 colunas)
+    if any(col in df.columns for col in TAXONOMY_CODE_COLUMNS):
         print("\n🏥 Tipos de Enfermeiras:")
-        taxonomy_map = {
-            '363L00000X': 'Nurse Practitioner (NP)',
-            '163W00000X': 'Registered Nurse (RN)',
-            '164W00000X': 'Licensed Practical Nurse (LPN)'
-        }
-        for code, name in taxonomy_map.items():
-            count = (df[taxonomy_col] == code).sum()
+        category_counts = NURSE_CLASSIFIER.count_categories(NURSE_CLASSIFIER.categories_pandas(df))
+        for code, count in sorted(category_counts.items(), key=lambda item: item[1], reverse=True):
             if count > 0:
                 percentage = (count / len(df)) * 100
-                print(f"  {name}: {count:,} ({percentage:.1f}%)")
+                print(f"  {NURSE_TAXONOMY_DESCRIPTIONS.get(code, code)}: {count:,} ({percentage:.1f}%)")
     
     print("="*60 + "\n")
 
@@ -299,7 +423,8 @@ def show_statistics(df):
 def export_filtered(df, filename="filtered_results.csv"):
     """Exporta resultados filtrados para um arquivo."""
     try:
-        df.to_csv(filename, index=False)
+        # Parsed dates are written back in the CSV's MM/DD/YYYY format
+        df.to_csv(filename, index=False, date_format='%m/%d/%Y')
         print(f"\n✅ Resultados exportados para: {filename}")
         print(f"   Total de registros: {len(df):,}\n")
         return True
@@ -314,15 +439,19 @@ def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     default_file = os.path.join(script_dir, 'nurses.csv')
     
+    # --no-cache reads the CSV without writing the typed Arrow cache
+    args = [arg for arg in sys.argv[1:] if arg != '--no-cache']
+    use_cache = '--no-cache' not in sys.argv[1:]
+    
     # Check if file exists
-    if len(sys.argv) > 1:
-        csv_file = sys.argv[1]
+    if args:
+        csv_file = args[0]
     else:
         csv_file = default_file
     
     if not os.path.exists(csv_file):
         print(f"❌ Erro: Arquivo '{csv_file}' não encontrado.")
-        print(f"\nUso: python view_nurses.py [caminho_para_nurses.csv]")
+        print(f"\nUso: python view_nurses.py [caminho_para_nurses.csv] [--no-cache]")
         print(f"Padrão: {default_file}")
         sys.exit(1)
     
@@ -330,7 +459,9 @@ def main():
     print(f"📁 Arquivo: {os.path.basename(csv_file)}")
     
     try:
-        df = pd.read_csv(csv_file, low_memory=False)
+        if use_cache and HAS_PYARROW and not is_view_cache_fresh(csv_file):
+            print("⚙️  Criando cache tipado (nurses.arrow) - só na primeira vez...")
+        df = load_nurses(csv_file, use_cache=use_cache)
         print(f"✅ {len(df):,} registros carregados!\n")
     except Exception as e:
         print(f"❌ Erro ao carregar arquivo: {e}")
@@ -345,11 +476,13 @@ def main():
         'license_number': None,
         'different_addresses': False,
         'no_practice_address': False,
-        'recent_update': False
+        'recent_update': False,
+        'recent_enumeration': False
     }
     
     current_page = 1
-    filtered_df = df.copy()
+    engine = FilterEngine(df)
+    filtered_df = engine.filter(filters)
     
     while True:
         clear_screen()
@@ -373,7 +506,8 @@ def main():
         print(" 10) Busca rápida (nome completo)")
         print(" 11) Filtrar: endereços diferentes (practice ≠ mailing)")
         print(" 12) Filtrar: sem endereço de prática (não está trabalhando)")
-        print(" 13) Filtrar: atualizado nos últimos 3 meses (recém-formados/cadastrados)")
+        print(" 13) Filtrar: atualizado recentemente (padrão: últimos 3 meses)")
+        print(" 14) Filtrar: NPI cadastrado recentemente (recém-formados)")
         print("  0) Sair")
         print("="*60)
         
@@ -406,31 +540,31 @@ def main():
         elif choice == '2':
             first_name = input("\nDigite o nome (ou Enter para limpar): ").strip()
             filters['first_name'] = first_name if first_name else None
-            filtered_df = apply_filters(df, filters)
+            filtered_df = engine.filter(filters)
             current_page = 1
         
         elif choice == '3':
             last_name = input("\nDigite o sobrenome (ou Enter para limpar): ").strip()
             filters['last_name'] = last_name if last_name else None
-            filtered_df = apply_filters(df, filters)
+            filtered_df = engine.filter(filters)
             current_page = 1
         
         elif choice == '4':
             city = input("\nDigite a cidade (ou Enter para limpar): ").strip()
             filters['city'] = city if city else None
-            filtered_df = apply_filters(df, filters)
+            filtered_df = engine.filter(filters)
             current_page = 1
         
         elif choice == '5':
             state = input("\nDigite o código do estado (ex: CA, NY) ou Enter para limpar: ").strip()
             filters['state'] = state if state else None
-            filtered_df = apply_filters(df, filters)
+            filtered_df = engine.filter(filters)
             current_page = 1
         
         elif choice == '6':
             license_num = input("\nDigite o número de licença (ou Enter para limpar): ").strip()
             filters['license_number'] = license_num if license_num else None
-            filtered_df = apply_filters(df, filters)
+            filtered_df = engine.filter(filters)
             current_page = 1
         
         elif choice == '7':
@@ -442,9 +576,10 @@ def main():
                 'license_number': None,
                 'different_addresses': False,
                 'no_practice_address': False,
-                'recent_update': False
+                'recent_update': False,
+                'recent_enumeration': False
             }
-            filtered_df = df.copy()
+            filtered_df = engine.filter(filters)
             current_page = 1
             print("\n✅ Filtros limpos!")
             input("Pressione Enter para continuar...")
@@ -452,7 +587,7 @@ def main():
         elif choice == '8':
             clear_screen()
             if len(filtered_df) > 0:
-                show_statistics(filtered_df)
+                show_statistics(filtered_df.frame())
             else:
                 print("\n❌ Nenhum resultado para mostrar estatísticas.\n")
             input("Pressione Enter para continuar...")
@@ -464,7 +599,7 @@ def main():
                     filename = "filtered_results.csv"
                 if not filename.endswith('.csv'):
                     filename += '.csv'
-                export_filtered(filtered_df, filename)
+                export_filtered(filtered_df.frame(), filename)
                 input("Pressione Enter para continuar...")
             else:
                 print("\n❌ Nenhum resultado para exportar.\n")
@@ -478,12 +613,12 @@ def main():
             if search_term:
                 quick_filters = filters.copy()
                 quick_filters['first_name'] = search_term
-                quick_df = apply_filters(df, quick_filters)
+                quick_df = engine.filter(quick_filters)
                 
                 if len(quick_df) == 0:
                     quick_filters['first_name'] = None
                     quick_filters['last_name'] = search_term
-                    quick_df = apply_filters(df, quick_filters)
+                    quick_df = engine.filter(quick_filters)
                 
                 display_results(quick_df, page_size=20, page=1)
             input("\nPressione Enter para continuar...")
@@ -492,7 +627,7 @@ def main():
             filters['different_addresses'] = not filters.get('different_addresses', False)
             status = "ATIVADO" if filters['different_addresses'] else "DESATIVADO"
             print(f"\n✅ Filtro de endereços diferentes {status}")
-            filtered_df = apply_filters(df, filters)
+            filtered_df = engine.filter(filters)
             current_page = 1
             input("Pressione Enter para continuar...")
         
@@ -500,17 +635,32 @@ def main():
             filters['no_practice_address'] = not filters.get('no_practice_address', False)
             status = "ATIVADO" if filters['no_practice_address'] else "DESATIVADO"
             print(f"\n✅ Filtro de sem endereço de prática {status}")
-            filtered_df = apply_filters(df, filters)
+            filtered_df = engine.filter(filters)
             current_page = 1
             input("Pressione Enter para continuar...")
         
-        elif choice == '13':
-            filters['recent_update'] = not filters.get('recent_update', False)
-            status = "ATIVADO" if filters['recent_update'] else "DESATIVADO"
-            three_months_ago = datetime.now() - relativedelta(months=3)
-            print(f"\n✅ Filtro de atualização recente (últimos 3 meses) {status}")
-            print(f"   Data de corte: {three_months_ago.strftime('%d/%m/%Y')}")
-            filtered_df = apply_filters(df, filters)
+        elif choice in ('13', '14'):
+            name = 'recent_update' if choice == '13' else 'recent_enumeration'
+            label = "atualização recente" if choice == '13' else "cadastro recente"
+            if filters.get(name):
+                filters[name] = False
+                print(f"\n✅ Filtro de {label} DESATIVADO")
+            else:
+                default_window = RECENCY_FILTERS[name][1]
+                window = input(
+                    f"\nJanela (ex: 90d, 6w, 3m, 1y) ou Enter para {default_window}: "
+                ).strip() or default_window
+                try:
+                    parse_window(window)
+                except ValueError:
+                    print(f"\n❌ Erro: janela inválida '{window}'")
+                    input("Pressione Enter para continuar...")
+                    continue
+                filters[name] = window
+                cutoff = date.today() - parse_window(window)
+                print(f"\n✅ Filtro de {label} (últimos {describe_window(window)}) ATIVADO")
+                print(f"   Data de corte: {cutoff.strftime('%d/%m/%Y')}")
+            filtered_df = engine.filter(filters)
             current_page = 1
             input("Pressione Enter para continuar...")
         